@@ -12,6 +12,7 @@ class AsyncLoopThread:
     API:
         - start(): Start the thread and event loop.
         - await run(coro): Submit a coroutine to run in the loop.
+        - run_sync(coro, timeout): Same, blocking the calling thread.
         - await stop(): Stop the event loop and join the thread.
     """
     def __init__(self):
@@ -60,6 +61,13 @@ class AsyncLoopThread:
         fut = self._submit_coroutine(coro)
         return await asyncio.wrap_future(fut)
 
+    def run_sync(self, coro, timeout=None):
+        """
+        Submit a coroutine and block until it finishes, for callers that
+        cannot await, e.g. a QApplication.aboutToQuit handler.
+        """
+        return self._submit_coroutine(coro).result(timeout)
+
     async def stop(self):
         """
         Stop the event loop and wait for the thread to exit.
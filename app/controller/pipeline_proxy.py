@@ -0,0 +1,296 @@
+import asyncio
+import inspect
+import itertools
+import logging
+import multiprocessing
+import pickle
+import threading
+from functools import partial
+from vpipe.core.bus import VpBusMessage
+from vpipe.core.capsule import VpCapsule, VpState
+from .async_loop_thread import AsyncLoopThread
+
+logger = logging.getLogger(__name__)
+
+
+class PipelineProxy(VpCapsule):
+    """
+    Stands in a composite for a pipeline that runs on another event loop.
+    `set_prop`, `set_props` and state changes are forwarded to the remote
+    pipeline, and the messages it posts on its bus are re-posted on this
+    capsule's bus, on the loop that drives the proxy.
+
+    The remote pipeline is built with `factory(**callbacks)`.
+    """
+    def __init__(self, name, factory, callbacks=None):
+        super().__init__(name)
+        self.factory = factory
+        self.callbacks = callbacks or {}
+        self._outer_loop = None
+
+    async def _call(self, method, *args):
+        raise NotImplementedError
+
+    async def _request(self, method, *args):
+        self._outer_loop = asyncio.get_running_loop()
+        return await self._call(method, *args)
+
+    async def set_prop(self, prop, value):
+        await self._request("set_prop", prop, value)
+
+    async def set_props(self, props):
+        return await self._request("set_props", props)
+
+    async def change_state(self, transition):
+        _, new_state = transition.to_states()
+        if not await self._request("set_state", new_state):
+            return False
+        return await super().change_state(transition)
+
+    async def _activate_ports(self, activate):
+        # The remote pipeline activates its own ports
+        pass
+
+    def _forward_message(self, message):
+        # Called from the remote side; drop messages until the proxy is driven
+        loop = self._outer_loop
+        if loop is None:
+            return
+        try:
+            loop.call_soon_threadsafe(self.post_message, message)
+        except RuntimeError:
+            pass  # loop closed
+
+    async def reload_service_settings(self, settings):
+        # Same process, the ServiceManager is shared
+        pass
+
+    async def close(self):
+        pass
+
+
+class ThreadPipelineProxy(PipelineProxy):
+    """Runs the pipeline on its own AsyncLoopThread."""
+    def __init__(self, name, factory, callbacks=None):
+        super().__init__(name, factory, callbacks)
+        self.pipeline = factory(**self.callbacks)
+        self.pipeline.bus.add_watch(self._on_message)
+        self._loop = AsyncLoopThread()
+        self._loop.start()
+        self._closed = False
+
+    async def _on_message(self, message):
+        self._forward_message(message)
+
+    async def _call(self, method, *args):
+        return await self._loop.run(getattr(self.pipeline, method)(*args))
+
+    async def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        await self._loop.run(self._shutdown())
+        await self._loop.stop()
+
+    async def _shutdown(self):
+        await self.pipeline.set_state(VpState.NULL)
+        # The pool keeps idle services per loop, this one is going away
+        await _clear_service_pool()
+
+
+def _picklable(obj):
+    try:
+        pickle.dumps(obj)
+        return True
+    except Exception:
+        return False
+
+
+def _reload_service_settings(settings):
+    from services.service_manager import ServiceManager
+    ServiceManager().reload_settings(settings)
+
+
+async def _clear_service_pool():
+    from services.service_manager import ServiceManager
+    # Nothing was pooled where no ServiceManager was set up
+    if ServiceManager in ServiceManager._instances:
+        await ServiceManager().pool.clear()
+
+
+def _worker_main(conn, factory, callback_names, initializer, initargs):
+    if initializer is not None:
+        initializer(*initargs)
+    asyncio.run(_worker_serve(conn, factory, callback_names))
+
+
+async def _worker_serve(conn, factory, callback_names):
+    loop = asyncio.get_running_loop()
+    send_lock = threading.Lock()
+
+    def send(message):
+        with send_lock:
+            conn.send(message)
+
+    def forward_callback(name, *args):
+        send(("callback", name, args))
+
+    pipeline = factory(**{name: partial(forward_callback, name) for name in callback_names})
+
+    async def forward_message(message):
+        source = getattr(message.source, "path", message.source)
+        if _picklable(message.payload):
+            send(("bus", message.msg_type, message.payload, source, message.timestamp))
+
+    pipeline.bus.add_watch(forward_message)
+
+    async def handle(request_id, method, args):
+        try:
+            match method:
+                case "set_state" | "set_prop" | "set_props":
+                    result = await getattr(pipeline, method)(*args)
+                case "call":
+                    fn, *fn_args = args
+                    result = fn(*fn_args)
+                    if inspect.isawaitable(result):
+                        result = await result
+                case _:
+                    raise ValueError(f"Unknown request: {method}")
+            reply = ("reply", request_id, True, result if _picklable(result) else None)
+        except Exception as e:
+            reply = ("reply", request_id, False, e if _picklable(e) else RuntimeError(repr(e)))
+        try:
+            send(reply)
+        except (OSError, ValueError):
+            pass  # parent went away
+
+    tasks = set()
+    while True:
+        try:
+            request = await loop.run_in_executor(None, conn.recv)
+        except (EOFError, OSError):
+            break
+        if request[0] == "close":
+            break
+        task = asyncio.create_task(handle(*request))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+
+    await pipeline.set_state(VpState.NULL)
+    await _clear_service_pool()
+    conn.close()
+
+
+class ProcessPipelineProxy(PipelineProxy):
+    """
+    Runs the pipeline in a worker process. `factory` must be picklable
+    (e.g. a partial of the pipeline class); callbacks stay in this process
+    and are called from a reader thread with the arguments the worker sends.
+    `initializer(*initargs)` runs in the worker before the pipeline is
+    built, to set up logging and the ServiceManager there.
+    """
+    def __init__(self, name, factory, callbacks=None, initializer=None, initargs=()):
+        super().__init__(name, factory, callbacks)
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, factory, list(self.callbacks), initializer, initargs),
+            name=f"pipeline-{name}",
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+        self._send_lock = threading.Lock()
+        self._ids = itertools.count()
+        self._pending = {}
+        self._reader = threading.Thread(target=self._read_loop, name=f"{name}-reader", daemon=True)
+        self._reader.start()
+
+    def _send(self, message):
+        with self._send_lock:
+            self._conn.send(message)
+
+    async def _call(self, method, *args):
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._send((request_id, method, args))
+            return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def call(self, fn, *args):
+        """Run the picklable `fn(*args)` in the worker process and return its result."""
+        return await self._request("call", fn, *args)
+
+    async def reload_service_settings(self, settings):
+        # The worker has its own ServiceManager
+        await self.call(_reload_service_settings, settings)
+
+    def _read_loop(self):
+        while True:
+            try:
+                message = self._conn.recv()
+            except (EOFError, OSError):
+                break
+            match message:
+                case ("reply", request_id, ok, value):
+                    self._settle(self._pending.get(request_id), ok, value)
+                case ("callback", name, args):
+                    try:
+                        self.callbacks[name](*args)
+                    except Exception:
+                        logger.exception(f"[{self.name}] Callback {name} failed")
+                case ("bus", msg_type, payload, source, timestamp):
+                    self._forward_message(VpBusMessage(msg_type, payload, source, timestamp))
+
+        error = ConnectionError(f"Pipeline worker {self.name} exited")
+        for future in list(self._pending.values()):
+            self._settle(future, False, error)
+
+    def _settle(self, future, ok, value):
+        if future is None:
+            return
+        try:
+            future.get_loop().call_soon_threadsafe(self._resolve, future, ok, value)
+        except RuntimeError:
+            pass  # loop closed
+
+    @staticmethod
+    def _resolve(future, ok, value):
+        if future.done():
+            return
+        if ok:
+            future.set_result(value)
+        else:
+            future.set_exception(value)
+
+    async def close(self, timeout=5.0):
+        try:
+            self._send(("close",))
+        except (OSError, ValueError):
+            pass
+        await asyncio.to_thread(self._process.join, timeout)
+        if self._process.is_alive():
+            self._process.terminate()
+        self._conn.close()
+
+
+def make_stream_wrapper(isolation, initializer=None, initargs=()):
+    """
+    Returns the DualStreamPipeline `stream_wrapper` for an isolation mode:
+    "none" keeps both streams on the caller's loop, "thread" gives each its
+    own loop thread, "process" its own worker process.
+    """
+    match isolation:
+        case "none":
+            return None
+        case "thread":
+            return ThreadPipelineProxy
+        case "process":
+            return partial(ProcessPipelineProxy, initializer=initializer, initargs=initargs)
+        case _:
+            raise ValueError(f"Unknown isolation mode: {isolation}")
@@ -4,9 +4,9 @@ from PySide6.QtCore import QObject, Signal, Property, Slot
 from qasync import asyncSlot
 from vpipe.core.capsule import VpState
 from ..controller.async_loop_thread import AsyncLoopThread
-from pipelines.downstream_pipeline import DownStreamPipeline
-from pipelines.selftalk_pipeline import SelfTalkPipeline
 from pipelines.dualstream_pipeline import DualStreamPipeline
+from .pipeline_proxy import PipelineProxy
+from services.service_manager import ServiceManager
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,7 +29,7 @@ class SpeechTranslatorPipeline(QObject):
     errorChanged = Signal(str)
     rmsChanged = Signal(str, float)  # stream, rms
 
-    def __init__(self, conversation_model, setting_model, parent=None):
+    def __init__(self, conversation_model, setting_model, parent=None, stream_wrapper=None):
         super().__init__(parent)
 
         self.conversation_model = conversation_model
@@ -47,7 +47,9 @@ class SpeechTranslatorPipeline(QObject):
             name=".",
             script_writer_callback=self._on_script,
             translated_script_writer_callback=self._on_translated,
-            rms_callback=self._on_rms
+            rms_callback=self._on_rms,
+            stream_wrapper=stream_wrapper,
+            transcript_dir=self._transcript_dir()
         )
         
         # Initial states
@@ -56,12 +58,18 @@ class SpeechTranslatorPipeline(QObject):
         self._error_message = ""
 
         # UI state
-        self._current_you_index = None
+        self._current_you_id = None
 
     def _on_rms(self, stream, rms):
+        # Readings arrive at the meter rate (20 Hz), skip those the UI can not show
+        rms = round(rms, 3)
         if stream == "upstream":
+            if rms == self._rms_upstream:
+                return
             self._rms_upstream = rms
         elif stream == "downstream":
+            if rms == self._rms_downstream:
+                return
             self._rms_downstream = rms
         self.rmsChanged.emit(stream, rms)
 
@@ -110,6 +118,12 @@ class SpeechTranslatorPipeline(QObject):
     def yourLanguage(self):
         return self.setting_model.get("conference.your_lang")
 
+    def _transcript_dir(self):
+        try:
+            return self.setting_model.get("conference.transcript_dir") or None
+        except KeyError:  # settings saved before transcripts existed
+            return None
+
     @Property('QVariantList', notify=rmsChanged)
     def rms(self):
         return [
@@ -120,13 +134,13 @@ class SpeechTranslatorPipeline(QObject):
     # --- Script Callbacks ---
     def _on_script(self, speaker, text, is_final):
         logger.debug(f"Script received: speaker={speaker}, is_final={is_final}, text={text}")
-        if self._current_you_index is not None:
-            self.conversation_model.update(self._current_you_index, speaker, text)
+        if self._current_you_id is not None:
+            self.conversation_model.update(self._current_you_id, speaker, text)
             if is_final:
-                self._current_you_index = None
+                self._current_you_id = None
         else:
-            self.conversation_model.append(speaker, text)
-            self._current_you_index = None if is_final else self.conversation_model.rowCount() - 1
+            row_id = self.conversation_model.append(speaker, text)
+            self._current_you_id = None if is_final else row_id
 
     def _on_translated(self, speaker, text):
         logger.debug(f"Translated script: speaker={speaker}, text={text}")
@@ -172,6 +186,23 @@ class SpeechTranslatorPipeline(QObject):
             self._set_app_state(AppState.STOPPED)
             logger.exception("Failed to stop pipeline.")
 
+    @Slot()
+    def shutdown(self, timeout=10.0):
+        """Stop the pipeline, close its stream proxies and pooled services before the app quits."""
+        try:
+            self._loop.run_sync(self._shutdown(), timeout)
+        except Exception:
+            logger.exception("Failed to shut the pipeline down cleanly.")
+
+    async def _shutdown(self):
+        await self._pipeline.set_state(VpState.NULL)
+        # Isolated streams own a loop thread or worker process, with its own pool
+        for stream in (self._pipeline.upstream, self._pipeline.downstream):
+            if isinstance(stream, PipelineProxy):
+                await stream.close()
+        # Idle pooled services keep their connections and the reaper task
+        await ServiceManager().pool.clear()
+
     # --- Change Language ---
     @asyncSlot(str)
     async def set_other_language(self, lang):
@@ -179,8 +210,10 @@ class SpeechTranslatorPipeline(QObject):
         self._set_error("")
         self._set_action_state(ActionState.CHANGING_LANGUAGE)
         try:
-            await self._loop.run(self._pipeline.downstream.set_prop("src-lang", lang))
-            await self._loop.run(self._pipeline.upstream.set_prop("dest-lang", lang))
+            await self._loop.run(self._pipeline.set_props({
+                "downstream/src-lang": lang,
+                "upstream/dest-lang": lang,
+            }))
         except Exception as e:
             self._set_error(f"Language Change Error: {e}")
             logger.exception("Failed to change other language.")
@@ -192,8 +225,10 @@ class SpeechTranslatorPipeline(QObject):
         self._set_error("")
         self._set_action_state(ActionState.CHANGING_LANGUAGE)
         try:
-            await self._loop.run(self._pipeline.downstream.set_prop("dest-lang", lang))
-            await self._loop.run(self._pipeline.upstream.set_prop("src-lang", lang))
+            await self._loop.run(self._pipeline.set_props({
+                "downstream/dest-lang": lang,
+                "upstream/src-lang": lang,
+            }))
         except Exception as e:
             self._set_error(f"Language Change Error: {e}")
             logger.exception("Failed to change your language.")
@@ -202,13 +237,30 @@ class SpeechTranslatorPipeline(QObject):
     # --- Adjust Volume ---
     @asyncSlot(float)
     async def set_original_volume(self, volume):
-        await self._loop.run(self._pipeline.downstream.set_prop("src-volume", volume))
-        await self._loop.run(self._pipeline.upstream.set_prop("src-volume", volume))
+        await self._loop.run(self._pipeline.set_props({
+            "downstream/src-volume": volume,
+            "upstream/src-volume": volume,
+        }))
 
     @asyncSlot(float)
     async def set_translated_volume(self, volume):
-        await self._loop.run(self._pipeline.downstream.set_prop("tts-volume", volume))
-        await self._loop.run(self._pipeline.upstream.set_prop("tts-volume", volume))
+        await self._loop.run(self._pipeline.set_props({
+            "downstream/tts-volume": volume,
+            "upstream/tts-volume": volume,
+        }))
+
+    # --- Service settings ---
+    @asyncSlot(object)
+    async def reload_service_settings(self, settings):
+        # Streams isolated in worker processes have their own ServiceManager
+        for stream in (self._pipeline.upstream, self._pipeline.downstream):
+            if isinstance(stream, PipelineProxy):
+                await self._loop.run(stream.reload_service_settings(settings))
+        # Running services whose settings changed are swapped in place
+        await self._loop.run(self._pipeline.set_props({
+            "upstream/service-reload": True,
+            "downstream/service-reload": True,
+        }))
 
     # --- Helper ---
     def _code_to_lang(self, code):
@@ -239,6 +291,14 @@ class SpeechTranslatorPipeline(QObject):
             case _:
                 raise ValueError(f"Unknown stream: {stream}")
             
+    @asyncSlot(object)
+    async def set_tran_speculative(self, enable: bool):
+        # Translate stable interim prefixes ahead of the final transcript
+        await self._loop.run(self._pipeline.set_props({
+            "upstream/tran-speculative": enable,
+            "downstream/tran-speculative": enable,
+        }))
+
     @asyncSlot()
     async def set_input_device(self, device: str):
         self._set_action_state(ActionState.CHANGING_AUDIO_DEVICE)
@@ -299,20 +359,37 @@ class SpeechTranslatorPipeline(QObject):
             
     @asyncSlot(str, object)
     async def _initialize_pipeline_from_settings(self):
-        await self.set_your_language(self.setting_model.get("conference.your_lang"))
-        await self.set_other_language(self.setting_model.get("conference.other_lang"))
-        await self.set_original_volume(self.setting_model.get("conference.volume.original"))
-        await self.set_translated_volume(self.setting_model.get("conference.volume.translated"))
-        await self.set_asr_enable("downstream", self.setting_model.get("conference.downstream.asr_enable"))
-        await self.set_tts_enable("downstream", self.setting_model.get("conference.downstream.tts_enable"))
-        await self.set_asr_enable("upstream", self.setting_model.get("conference.upstream.asr_enable"))
-        await self.set_tts_enable("upstream", self.setting_model.get("conference.upstream.tts_enable"))
-        await self.set_input_device(self.setting_model.get("conference.input_device"))
-        await self.set_output_device(self.setting_model.get("conference.output_device"))
-        await self.set_input_audio_mute(self.setting_model.get("conference.input_mute"))
-        await self.set_output_audio_mute(self.setting_model.get("conference.output_mute"))
-        await self.set_tts_speed("downstream", self.setting_model.get("conference.downstream.tts_speed"))
-        await self.set_tts_speed("upstream", self.setting_model.get("conference.upstream.tts_speed"))
+        # One loop hop for the whole settings delta; restarts it causes
+        # (ASR language, audio devices) are merged by set_props
+        get = self.setting_model.get
+        your_lang = get("conference.your_lang")
+        other_lang = get("conference.other_lang")
+        props = {
+            "downstream/src-lang": other_lang,
+            "downstream/dest-lang": your_lang,
+            "upstream/src-lang": your_lang,
+            "upstream/dest-lang": other_lang,
+        }
+        for stream in ("downstream", "upstream"):
+            props.update({
+                f"{stream}/src-volume": get("conference.volume.original"),
+                f"{stream}/tts-volume": get("conference.volume.translated"),
+                f"{stream}/asr-enable": get(f"conference.{stream}.asr_enable"),
+                f"{stream}/tts-enable": get(f"conference.{stream}.tts_enable"),
+                f"{stream}/tts-speed": get(f"conference.{stream}.tts_speed"),
+                f"{stream}/tran-speculative": bool(get("conference.tran_speculative")),
+            })
+        props.update({
+            "upstream/input-device": get("conference.input_device"),
+            "upstream/input-mute": get("conference.input_mute"),
+            "downstream/output-device": get("conference.output_device"),
+            "downstream/output-mute": get("conference.output_mute"),
+        })
+        timings = await self._loop.run(self._pipeline.set_props(props))
+        slowest = sorted(timings.items(), key=lambda item: item[1], reverse=True)[:3]
+        logger.info("Applied %d settings in %.1f ms, slowest: %s", len(props),
+                    sum(timings.values()) * 1000,
+                    ", ".join(f"{prop} {elapsed * 1000:.1f} ms" for prop, elapsed in slowest))
 
     @asyncSlot(str, object)
     async def _on_setting_changed(self, path, value):
@@ -336,6 +413,8 @@ class SpeechTranslatorPipeline(QObject):
                 await self.set_asr_enable("upstream", value)
             case "conference.upstream.tts_enable":
                 await self.set_tts_enable("upstream", value)
+            case "conference.tran_speculative":
+                await self.set_tran_speculative(value)
             # Audio device settings
             case "conference.input_device":
                 await self.set_input_device(value)
@@ -1,38 +1,42 @@
-from PySide6.QtCore import QObject, Signal, Slot, Property, QTimer
-from vpipe.utils.audio_devices import list_input_devices, list_output_devices
+from PySide6.QtCore import QObject, Signal, Slot, Property, Qt
+from vpipe.utils.audio_devices import device_registry
 
 class AudioDeviceManager(QObject):
     devicesChanged = Signal()
+    _registryChanged = Signal()
 
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, registry=None, watch_interval=2.0):
         super().__init__(parent)
         self._input_devices = []
         self._output_devices = []
-        self.refresh()
-        # self._timer = QTimer(self)
-        # self._timer.timeout.connect(self._auto_refresh)
-        # self._timer.start(1000)
+        self._registry = registry or device_registry()
+        # The registry notifies from its watcher thread, update on ours
+        self._registryChanged.connect(self._update, Qt.QueuedConnection)
+        self._registry.subscribe(self._on_registry_changed)
+        self._update()
+        if watch_interval:
+            self._registry.start_watcher(watch_interval)
+
+    def _on_registry_changed(self, registry):
+        self._registryChanged.emit()
 
     @Slot()
     def refresh(self):
+        if not self._registry.refresh():
+            self._update()
+
+    @Slot()
+    def _update(self):
         self._input_devices = [
             {"name": name, "index": idx}
-            for idx, name in list_input_devices()
+            for idx, name in self._registry.inputs()
         ]
         self._output_devices = [
             {"name": name, "index": idx}
-            for idx, name in list_output_devices()
+            for idx, name in self._registry.outputs()
         ]
         self.devicesChanged.emit()
 
-    def _auto_refresh(self):
-        old_inputs = set(d['name'] for d in self._input_devices)
-        old_outputs = set(d['name'] for d in self._output_devices)
-        new_inputs = set(name for idx, name in list_input_devices())
-        new_outputs = set(name for idx, name in list_output_devices())
-        if old_inputs != new_inputs or old_outputs != new_outputs:
-            self.refresh()
-
     @Property('QVariant', notify=devicesChanged)
     def inputDevices(self):
         return self._input_devices
@@ -1,21 +1,58 @@
-from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt
+import threading
+from PySide6.QtCore import QAbstractListModel, QModelIndex, Qt, Signal, Slot, Property
+from app.models.conversation_store import ConversationStore
+
 
 class ConversationModel(QAbstractListModel):
+    """
+    Keeps the last `max_rows` rows live; older rows are spilled to a
+    ConversationStore and brought back on demand with `loadOlder`.
+
+    `append` and `update` may be called from any thread. Changes are
+    queued and applied on the model's thread in one batch per event loop
+    turn: one insert for all new rows, and dataChanged naming only the
+    roles that changed. Rows are addressed by the stable id `append`
+    returns, not by their position in the window.
+
+    While the view is scrolled back (`following` is False) nothing is
+    spilled: the window grows past `max_rows` so rows the user is reading,
+    including those `loadOlder` brought back, stay put. Spilling catches
+    up once the view follows the end again.
+    """
     SpeakerRole = Qt.UserRole + 1
     TextRole = Qt.UserRole + 2
 
-    def __init__(self, parent=None):
+    _flushRequested = Signal()
+    hasOlderChanged = Signal()
+    loadingOlderChanged = Signal()
+    followingChanged = Signal()
+
+    def __init__(self, parent=None, max_rows=500, store=None):
         super().__init__(parent)
-        self._data = [{"speaker": "System", "text": "Hello!"}]
+        self.max_rows = max_rows
+        self._store = store or ConversationStore()
+        self._rows = []
+        self._next_id = 0
+        self._pending = []
+        self._updates = {}
+        self._stored = set()   # ids of rows in the window the store already holds as-is
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+        self._loading_older = False
+        self._following = True
+        self._flushRequested.connect(self.flush, Qt.QueuedConnection)
+
+        self.append("System", "Hello!")
+        self.flush()
 
     def rowCount(self, parent=QModelIndex()):
-        return len(self._data)
+        return len(self._rows)
 
     def data(self, index, role):
         if not index.isValid():
             return None
         row = index.row()
-        item = self._data[row]
+        item = self._rows[row]
         if role == self.SpeakerRole:
             return item["speaker"]
         if role == self.TextRole:
@@ -29,13 +66,124 @@ class ConversationModel(QAbstractListModel):
         }
 
     def append(self, speaker, text):
-        self.beginInsertRows(QModelIndex(), len(self._data), len(self._data))
-        self._data.append({"speaker": speaker, "text": text})
-        self.endInsertRows()
-
-    def update(self, index, speaker, text):
-        if 0 <= index < len(self._data):
-            self._data[index] = {"speaker": speaker, "text": text}
-            top_left = self.index(index, 0)
-            bottom_right = self.index(index, 0)
-            self.dataChanged.emit(top_left, bottom_right, self.roleNames().keys())
+        """Queue a new row. Returns its id."""
+        with self._lock:
+            row_id = self._next_id
+            self._next_id += 1
+            self._pending.append({"id": row_id, "speaker": speaker, "text": text})
+            self._schedule_flush()
+        return row_id
+
+    def update(self, row_id, speaker, text):
+        with self._lock:
+            for row in reversed(self._pending):
+                if row["id"] == row_id:
+                    row.update(speaker=speaker, text=text)
+                    return
+            self._updates[row_id] = (speaker, text)
+            self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self._flushRequested.emit()
+
+    @Slot()
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+            updates, self._updates = self._updates, {}
+            self._flush_scheduled = False
+
+        if updates:
+            self._apply_updates(updates)
+        if pending:
+            first = len(self._rows)
+            self.beginInsertRows(QModelIndex(), first, first + len(pending) - 1)
+            self._rows.extend(pending)
+            self.endInsertRows()
+        self._spill()
+
+    def _apply_updates(self, updates):
+        first_id = self._rows[0]["id"] if self._rows else self._next_id
+        spilled = []
+        for row_id, (speaker, text) in updates.items():
+            if row_id < first_id:
+                # Row already left the window, rewrite it in the store
+                spilled.append({"id": row_id, "speaker": speaker, "text": text})
+                continue
+            row = row_id - first_id
+            if row >= len(self._rows):
+                continue
+            item = self._rows[row]
+            roles = []
+            if item["speaker"] != speaker:
+                roles.append(self.SpeakerRole)
+            if item["text"] != text:
+                roles.append(self.TextRole)
+            if roles:
+                item.update(speaker=speaker, text=text)
+                self._stored.discard(row_id)
+                index = self.index(row, 0)
+                self.dataChanged.emit(index, index, roles)
+        if spilled:
+            self._store.append(spilled)
+
+    def _spill(self):
+        excess = len(self._rows) - self.max_rows
+        if excess <= 0 or not self._following:
+            return
+        evicted = self._rows[:excess]
+        self.beginRemoveRows(QModelIndex(), 0, excess - 1)
+        # Rows brought back by loadOlder are already on disk, write only new or edited ones
+        unsaved = [row for row in evicted if row["id"] not in self._stored]
+        if unsaved:
+            self._store.append(unsaved)
+        self._stored.difference_update(row["id"] for row in evicted)
+        del self._rows[:excess]
+        self.endRemoveRows()
+        self.hasOlderChanged.emit()
+
+    @Property(bool, notify=hasOlderChanged)
+    def hasOlder(self):
+        first_id = self._rows[0]["id"] if self._rows else self._next_id
+        return bool(self._store.ids_before(first_id, 1))
+
+    @Property(bool, notify=loadingOlderChanged)
+    def loadingOlder(self):
+        return self._loading_older
+
+    @Property(bool, notify=followingChanged)
+    def following(self):
+        return self._following
+
+    @Slot(bool)
+    def setFollowing(self, following):
+        """The view is (True) or is no longer (False) scrolled to the end."""
+        if following == self._following:
+            return
+        self._following = following
+        self.followingChanged.emit()
+        if following:
+            self._spill()
+
+    @Slot(int, result=int)
+    def loadOlder(self, count):
+        """Prepend up to `count` spilled rows. Returns the number loaded."""
+        first_id = self._rows[0]["id"] if self._rows else self._next_id
+        rows = self._store.read(self._store.ids_before(first_id, count))
+        if not rows:
+            return 0
+        self.setFollowing(False)
+        self._loading_older = True
+        self.loadingOlderChanged.emit()
+        try:
+            self.beginInsertRows(QModelIndex(), 0, len(rows) - 1)
+            self._rows[:0] = rows
+            self._stored.update(row["id"] for row in rows)
+            self.endInsertRows()
+        finally:
+            self._loading_older = False
+            self.loadingOlderChanged.emit()
+        self.hasOlderChanged.emit()
+        return len(rows)
@@ -0,0 +1,45 @@
+import bisect
+import json
+import tempfile
+
+
+class ConversationStore:
+    """
+    Append-only JSON-lines file for conversation rows spilled out of the
+    live window. An in-memory index maps each row id to the offset of its
+    latest record, so rewriting a row appends a new record instead of
+    editing the file. Without a path the store is an anonymous temp file
+    that disappears when closed.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self._file = open(path, "a+b") if path else tempfile.TemporaryFile()
+        self._offsets = {}   # id -> offset of latest record
+        self._ids = []       # sorted ids in the store
+
+    def __len__(self):
+        return len(self._ids)
+
+    def append(self, rows):
+        self._file.seek(0, 2)
+        for row in rows:
+            offset = self._file.tell()
+            self._file.write(json.dumps(row, ensure_ascii=False).encode("utf-8") + b"\n")
+            if row["id"] not in self._offsets:
+                bisect.insort(self._ids, row["id"])
+            self._offsets[row["id"]] = offset
+        self._file.flush()
+
+    def ids_before(self, row_id, count):
+        end = bisect.bisect_left(self._ids, row_id)
+        return self._ids[max(0, end - count):end]
+
+    def read(self, ids):
+        rows = []
+        for row_id in ids:
+            self._file.seek(self._offsets[row_id])
+            rows.append(json.loads(self._file.readline()))
+        return rows
+
+    def close(self):
+        self._file.close()
@@ -1,21 +1,31 @@
 from PySide6.QtCore import QObject, Slot as pyqtSlot, Signal as pyqtSignal, Property as pyqtProperty
 import yaml
 import os
+from services.service_registry import ServiceRegistry
+from app.utils.persistence import DebouncedYamlWriter
 
 class ServiceSettingModel(QObject):
     serviceChanged = pyqtSignal(str, str)  # module, service_id
     fieldChanged = pyqtSignal(str, str, str)  # module, key, value
+    settingsApplied = pyqtSignal()  # edits are done, e.g. the settings dialog closed
 
-    def __init__(self, config_path, settings_path, parent=None):
+    def __init__(self, config_path, settings_path, parent=None, registry=None):
         super().__init__(parent)
         self.config_path = config_path
+        self.registry = registry  # e.g. the ServiceManager's, so both read one cache
         self.settings_path = settings_path
+        self._writer = DebouncedYamlWriter(settings_path)
+        self._unapplied = False
         self._load_config()
         self._load_settings()
 
     def _load_config(self):
-        with open(self.config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+        if self.registry is None:
+            self.registry = ServiceRegistry(self.config_path)
+
+    @property
+    def config(self):
+        return self.registry.config
 
     def _load_settings(self):
         if os.path.exists(self.settings_path):
@@ -39,7 +49,7 @@ class ServiceSettingModel(QObject):
 
     @pyqtSlot(str, result='QVariant')
     def getServiceList(self, module):
-        return self.config.get(module, [])
+        return self.registry.service_list(module)
 
     @pyqtSlot(str, result=str)
     def getSelectedService(self, module):
@@ -47,15 +57,7 @@ class ServiceSettingModel(QObject):
 
     @pyqtSlot(str, str, result='QVariant')
     def getServiceFields(self, module, service_id):
-        for s in self.config.get(module, []):
-            if s['id'] == service_id:
-                schema_path = s['schema']
-                break
-        else:
-            return []
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema = yaml.safe_load(f)
-        return schema.get('fields', [])
+        return self.registry.fields(module, service_id)
 
     @pyqtSlot(str, str, result=str)
     def getFieldValue(self, module, key):
@@ -65,12 +67,8 @@ class ServiceSettingModel(QObject):
         if val is not None and val != '':
             return val
         # If not found, get default from schema
-        service_id = selected
-        schema_fields = self.getServiceFields(module, service_id)
-        for field in schema_fields:
-            if field.get('key') == key:
-                return str(field.get('default', ''))
-        return ''
+        entry = self.registry.get(module, selected)
+        return entry.defaults.get(key, '') if entry else ''
 
     @pyqtSlot(str, str)
     def setSelectedService(self, module, service_id):
@@ -82,6 +80,7 @@ class ServiceSettingModel(QObject):
         else:
             self.settings[module]['selected'] = service_id
         self._save_settings()
+        self._unapplied = True
         self.serviceChanged.emit(module, service_id)
 
     @pyqtSlot(str, str, str)
@@ -96,8 +95,18 @@ class ServiceSettingModel(QObject):
             return
         self.settings[module]['settings'][selected][key] = value
         self._save_settings()
+        self._unapplied = True
         self.fieldChanged.emit(module, key, value)
 
+    @pyqtSlot()
+    def apply(self):
+        """Emit settingsApplied if anything changed since the last apply."""
+        if self._unapplied:
+            self._unapplied = False
+            self.settingsApplied.emit()
+
     def _save_settings(self):
-        with open(self.settings_path, 'w', encoding='utf-8') as f:
-            yaml.safe_dump(self.settings, f, allow_unicode=True)
+        self._writer.schedule(self.settings)
+
+    def flush(self):
+        self._writer.flush()
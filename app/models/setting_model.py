@@ -1,6 +1,8 @@
 from PySide6.QtCore import QObject, Signal, Slot
+import copy
 import yaml
 import os
+from app.utils.persistence import DebouncedYamlWriter
 
 """
 Not using singleton allows for greater flexibility, easier dependency management,
@@ -13,6 +15,7 @@ class SettingModel(QObject):
     def __init__(self, filepath="setting.yaml"):
         super().__init__()
         self._filepath = filepath
+        self._writer = DebouncedYamlWriter(filepath)
         self._data = {}
 
         self._default_data = {
@@ -36,7 +39,8 @@ class SettingModel(QObject):
                 "input_device": None,
                 "output_device": None,
                 "input_mute": False,
-                "output_mute": False
+                "output_mute": False,
+                "tran_speculative": False
             },
             "directalk": {
                 "src_lang": "en",
@@ -52,12 +56,26 @@ class SettingModel(QObject):
         if os.path.exists(self._filepath):
             with open(self._filepath, "r", encoding="utf-8") as f:
                 self._data = yaml.safe_load(f)
+            # Settings saved by an older version lack keys added since
+            self._fill_defaults(self._data, self._default_data)
         else:
             self._data = self._default_data.copy()
 
+    @staticmethod
+    def _fill_defaults(data, defaults):
+        for key, value in defaults.items():
+            if key not in data:
+                data[key] = copy.deepcopy(value)
+            elif isinstance(value, dict) and isinstance(data[key], dict):
+                SettingModel._fill_defaults(data[key], value)
+
     def save(self):
-        with open(self._filepath, "w", encoding="utf-8") as f:
-            yaml.safe_dump(self._data, f, allow_unicode=True)
+        """Write the current data now."""
+        self._writer.schedule(self._data)
+        self._writer.flush()
+
+    def flush(self):
+        self._writer.flush()
 
     @Slot(str, result='QVariant')
     def get(self, path: str):
@@ -78,7 +96,7 @@ class SettingModel(QObject):
         if d[key] != value:
             d[key] = value
             self.valueChanged.emit(path, value)
-            self.save() # todo: adjust save policy
+            self._writer.schedule(self._data)
 
     def get_all(self):
         return self._data
@@ -60,11 +60,25 @@ Rectangle {
 
         ScrollBar.vertical: ScrollBar {
             policy: ScrollBar.AsNeeded
+            onPressedChanged: if (!pressed) conversationModel.setFollowing(listView.atYEnd)
         }
 
+        // Follow new rows only while the view is at the end; the model
+        // stops spilling while the user reads older rows
         onCountChanged: {
-            if (count > 0)
+            if (count > 0 && conversationModel.following && !conversationModel.loadingOlder)
                 listView.positionViewAtEnd()
         }
+
+        onMovementEnded: conversationModel.setFollowing(atYEnd)
+
+        // Older rows are spilled out of the model, fetch them when scrolled to the top
+        onAtYBeginningChanged: {
+            if (atYBeginning && conversationModel.hasOlder) {
+                var loaded = conversationModel.loadOlder(50)
+                if (loaded > 0)
+                    listView.positionViewAtIndex(loaded, ListView.Beginning)
+            }
+        }
     }
 }
@@ -8,7 +8,7 @@ Dialog {
     modal: true
     standardButtons: Dialog.Ok
     width: 400
-    height: 500
+    height: 560
     x: (parent ? parent.width : Screen.width) / 2 - width / 2
     y: (parent ? parent.height : Screen.height) / 2 - height / 2
     z: 100
@@ -211,6 +211,23 @@ Dialog {
             }
         }
 
+        Text {
+            text: "Translation"
+            font.pixelSize: 13
+            Layout.fillWidth: true
+            horizontalAlignment: Text.AlignLeft
+            padding: 4
+            topPadding: 8
+        }
+        CheckBox {
+            text: "Speculative translation (start on stable partial transcripts)"
+            checked: settingModel.get("conference.tran_speculative") || false
+            onToggled: {
+                if (settingModel.set)
+                    settingModel.set("conference.tran_speculative", checked)
+            }
+        }
+
         Item {
             Layout.fillHeight: true
         }
@@ -24,6 +24,9 @@ Dialog {
 
     onModuleChanged: updateFields()
 
+    // Running streams swap services once per edit session, not per keystroke
+    onClosed: serviceSettingModel.apply()
+
     Component.onCompleted: {
         serviceSettingModel.serviceChanged.connect(updateFields)
         serviceSettingModel.fieldChanged.connect(updateFields)
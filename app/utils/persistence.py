@@ -0,0 +1,91 @@
+import atexit
+import copy
+import logging
+import os
+import tempfile
+import threading
+import time
+import weakref
+import yaml
+
+logger = logging.getLogger(__name__)
+
+_writers = weakref.WeakSet()
+
+
+class DebouncedYamlWriter:
+    """
+    Coalesces saves of one YAML file. `schedule` snapshots the data and
+    returns immediately; a background timer writes the latest snapshot once
+    no change came in for `delay` seconds, or, with `max_wait`, at most
+    `max_wait` seconds after the first unsaved change, so a steady stream
+    of edits (a slider drag) is still saved. Writes go to a temp file
+    in the same directory and are renamed over the target, so readers never
+    see a partial file. Pending data is flushed at interpreter exit.
+    """
+    def __init__(self, path, delay=0.5, max_wait=5.0):
+        self.path = path
+        self.delay = delay
+        self.max_wait = max_wait
+        self.writes = 0
+        self._pending = None
+        self._pending_since = None
+        self._timer = None
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        _writers.add(self)
+
+    def schedule(self, data):
+        snapshot = copy.deepcopy(data)
+        with self._lock:
+            now = time.monotonic()
+            if self._pending is None:
+                self._pending_since = now
+            self._pending = snapshot
+            delay = self.delay
+            if self.max_wait is not None:
+                delay = max(0.0, min(delay, self._pending_since + self.max_wait - now))
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = threading.Timer(delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Write pending data now, on the calling thread."""
+        with self._write_lock:
+            with self._lock:
+                data, self._pending = self._pending, None
+                self._pending_since = None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+            if data is not None:
+                self._write(data)
+
+    def _write(self, data):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", suffix=".yaml", dir=directory)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                yaml.safe_dump(data, f, allow_unicode=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            self.writes += 1
+        except Exception as e:
+            logger.error(f"Failed to save {self.path}: {e}")
+            if tmp_path:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+
+
+def flush_all():
+    for writer in list(_writers):
+        writer.flush()
+
+
+atexit.register(flush_all)
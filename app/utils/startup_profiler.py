@@ -0,0 +1,122 @@
+"""
+Startup profiler behind `--profile-startup`.
+
+`enable()` installs a meta path finder that times every module import
+(inclusive and self time, like `python -X importtime`), `phase(name)`
+times a block of init work, and `report()` summarizes both together with
+the time from `enable()` to the first `mark`. Without `enable()` the
+functions are no-ops, so call sites can stay in place.
+"""
+import importlib.abc
+import sys
+import time
+from contextlib import contextmanager
+
+_enabled = False
+_start = None
+_imports = {}   # module name -> [inclusive seconds, self seconds]
+_stack = []     # [name, started, child seconds] of imports in progress
+_phases = []    # (name, seconds)
+_marks = []     # (name, seconds since enable)
+
+
+class _TimedLoader:
+    def __init__(self, loader):
+        self._loader = loader
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        entry = [module.__name__, time.perf_counter(), 0.0]
+        _stack.append(entry)
+        try:
+            self._loader.exec_module(module)
+        finally:
+            _stack.pop()
+            elapsed = time.perf_counter() - entry[1]
+            if _stack:
+                _stack[-1][2] += elapsed
+            _imports[entry[0]] = [elapsed, elapsed - entry[2]]
+
+
+class _TimingFinder(importlib.abc.MetaPathFinder):
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                    spec.loader = _TimedLoader(spec.loader)
+                return spec
+        return None
+
+
+_finder = _TimingFinder()
+
+
+def enable():
+    global _enabled, _start
+    if _enabled:
+        return
+    _enabled = True
+    _start = time.perf_counter()
+    sys.meta_path.insert(0, _finder)
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if _finder in sys.meta_path:
+        sys.meta_path.remove(_finder)
+
+
+def is_enabled():
+    return _enabled
+
+
+@contextmanager
+def phase(name):
+    if not _enabled:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _phases.append((name, time.perf_counter() - started))
+
+
+def mark(name):
+    """Record a milestone, e.g. the first rendered frame."""
+    if _enabled:
+        _marks.append((name, time.perf_counter() - _start))
+
+
+def report(top=15):
+    """
+    Returns the report text: phases, marks, the slowest imports by self
+    time, and import time rolled up per top-level package.
+    """
+    lines = ["Startup profile"]
+    for name, elapsed in _phases:
+        lines.append(f"  phase  {name:<40} {elapsed * 1000:9.1f} ms")
+    for name, since_start in _marks:
+        lines.append(f"  mark   {name:<40} {since_start * 1000:9.1f} ms after start")
+
+    packages = {}
+    for name, (_, self_time) in _imports.items():
+        root = name.partition(".")[0]
+        packages[root] = packages.get(root, 0.0) + self_time
+    lines.append(f"  imports: {len(_imports)} modules, {sum(packages.values()) * 1000:.1f} ms")
+    for root, total in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]:
+        lines.append(f"    package {root:<38} {total * 1000:9.1f} ms")
+    slowest = sorted(_imports.items(), key=lambda item: item[1][1], reverse=True)[:top]
+    for name, (inclusive, self_time) in slowest:
+        lines.append(f"    module  {name:<38} {self_time * 1000:9.1f} ms self"
+                     f" {inclusive * 1000:9.1f} ms total")
+    return "\n".join(lines)
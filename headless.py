@@ -0,0 +1,348 @@
+"""
+Headless runner: builds a pipeline from `pipelines/` and runs it on a plain
+asyncio loop, without Qt or audio devices. Transcripts, translations,
+selected bus messages and periodic perf stats are written to stdout as
+JSON lines; logs go to stderr.
+
+    python headless.py --pipeline upstream --source file:samples/en.wav --sink null
+    python headless.py --pipeline dualstream --source tone:440 --duration 30
+    python headless.py --config run.yaml --stats-interval 5
+
+Options can come from a YAML file (`--config`), whose keys are the long
+option names with dashes or underscores; command line options override it.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from functools import partial
+from pathlib import Path
+import yaml
+
+from vpipe.core.capsule import VpState
+from vpipe.core.pipeline import VpPipeline
+from vpipe.capsules.audio.file_source import VpFileSource
+from vpipe.capsules.audio.tone_source import VpToneSource, VpSilenceSource
+from vpipe.capsules.audio.null_sink import VpNullSink, VpWavSink
+from services.service_manager import ServiceManager
+
+logger = logging.getLogger("headless")
+
+DEFAULTS = {
+    "pipeline": "upstream",
+    "source": "silence",
+    "source_duration": None,
+    "realtime": True,
+    "sink": "null",
+    "src_lang": None,
+    "dest_lang": None,
+    "props": {},
+    "duration": None,
+    "drain": 3.0,
+    "stats_interval": 2.0,
+    "bus": [],
+    "services_config": "services/services_config.yaml",
+    "service_settings": "service_setting.yaml",
+    "log_level": "WARNING",
+    "transcript_dir": None,
+    "speculative": False,
+}
+
+
+class JsonLinesWriter:
+    """Writes one JSON object per line; safe to call from any thread."""
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def emit(self, msg_type, **fields):
+        record = {"type": msg_type, "t": round(time.monotonic() - self.started, 3), **fields}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+
+
+def make_source(spec, duration=None, name="src", realtime=True):
+    """`tone[:freq[:amplitude]]`, `silence`, `file:<path>` or a path."""
+    kind, _, arg = spec.partition(":")
+    match kind:
+        case "tone":
+            freq, _, amplitude = arg.partition(":")
+            return VpToneSource(name=name, frequency=float(freq or 440),
+                                amplitude=float(amplitude or 0.5), duration=duration, realtime=realtime)
+        case "silence":
+            return VpSilenceSource(name=name, duration=duration, realtime=realtime)
+        case "file":
+            return VpFileSource(arg, name=name, realtime=realtime)
+        case _:
+            if Path(spec).is_file():
+                return VpFileSource(spec, name=name, realtime=realtime)
+            raise ValueError(f"Unknown source: {spec}")
+
+
+def make_sink(spec, name="sink", suffix=None):
+    """`null` or `wav:<path>`; `suffix` is added to the file name (one file per stream)."""
+    kind, _, arg = spec.partition(":")
+    match kind:
+        case "null":
+            return VpNullSink(name=name)
+        case "wav":
+            path = Path(arg)
+            if suffix:
+                path = path.with_name(f"{path.stem}-{suffix}{path.suffix}")
+            return VpWavSink(path, name=name)
+        case _:
+            raise ValueError(f"Unknown sink: {spec}")
+
+
+class TranslatorHarness(VpPipeline):
+    """
+    (source) → [translator composite] → (sink), for the composites in
+    pipelines/ that have no source or sink of their own.
+    """
+    def __init__(self, name, translator, source, sink, script_writer_callback, translated_script_writer_callback):
+        super().__init__(name)
+        from pipelines.upstream_pipeline import ScriptWriter, TranslatedScriptWriter
+        self.source, self.sink = source, sink
+        script_writer = ScriptWriter(handler=script_writer_callback)
+        translated_script_writer = TranslatedScriptWriter(handler=translated_script_writer_callback)
+
+        source >> translator >> sink
+        translator.get_output("asr_script") >> script_writer
+        translator.get_output("tran_script") >> translated_script_writer
+        self.adds(source, translator, sink, script_writer, translated_script_writer)
+
+    async def set_prop(self, prop, value):
+        await self.get_capsule("translator").set_prop(prop, value)
+
+
+class HeadlessRun:
+    def __init__(self, opts, writer=None):
+        self.opts = opts
+        self.writer = writer or JsonLinesWriter()
+        self.sources = []
+        self.sinks = []
+        self.bus_counts = {}
+
+    # --- Building ---
+    def _source(self, name="src"):
+        source = make_source(self.opts["source"], self.opts["source_duration"], name=name,
+                             realtime=self.opts["realtime"])
+        self.sources.append(source)
+        return source
+
+    def _sink(self, name="sink", suffix=None):
+        sink = make_sink(self.opts["sink"], name=name, suffix=suffix)
+        self.sinks.append(sink)
+        return sink
+
+    def _on_script(self, stream, text, is_final):
+        self.writer.emit("transcript", stream=stream, text=text, final=is_final)
+
+    def _on_translated(self, stream, text):
+        self.writer.emit("translation", stream=stream, text=text)
+
+    def _stream_callbacks(self, stream):
+        return {
+            "script_writer_callback": partial(self._on_script, stream),
+            "translated_script_writer_callback": partial(self._on_translated, stream),
+        }
+
+    def build(self):
+        name = self.opts["pipeline"]
+        match name:
+            case "upstream":
+                from pipelines.upstream_pipeline import UpStreamPipeline
+                return UpStreamPipeline(name="upstream", source=self._source(), sink=self._sink(),
+                                        transcript_dir=self.opts["transcript_dir"],
+                                        **self._stream_callbacks("upstream"))
+            case "downstream":
+                from pipelines.downstream_pipeline import DownStreamPipeline
+                return DownStreamPipeline(name="downstream", source=self._source(), sink=self._sink(),
+                                          transcript_dir=self.opts["transcript_dir"],
+                                          **self._stream_callbacks("downstream"))
+            case "selftalk":
+                from pipelines.selftalk_pipeline import SelfTalkPipeline
+                return SelfTalkPipeline(name="selftalk", source=self._source(), sink=self._sink(),
+                                        **self._stream_callbacks("selftalk"))
+            case "dualstream":
+                from pipelines.dualstream_pipeline import DualStreamPipeline
+
+                def with_headless_io(stream, factory, callbacks):
+                    return factory(source=self._source(), sink=self._sink(name=f"sink-{stream}", suffix=stream),
+                                   **callbacks)
+
+                streams = {"You": "upstream", "Other": "downstream"}
+                return DualStreamPipeline(
+                    name="dualstream",
+                    script_writer_callback=lambda speaker, text, is_final:
+                        self._on_script(streams[speaker], text, is_final),
+                    translated_script_writer_callback=lambda speaker, text:
+                        self._on_translated(streams[speaker], text),
+                    stream_wrapper=with_headless_io,
+                    transcript_dir=self.opts["transcript_dir"],
+                )
+            case "speech-translator" | "augmented":
+                if name == "speech-translator":
+                    from pipelines.speech_translator import SpeechTranslator as translator_cls
+                else:
+                    from pipelines.augmented_speech_translator import AugmentedSpeechTranslator as translator_cls
+                return TranslatorHarness(name, translator_cls(name="translator"),
+                                         self._source(), self._sink(), **self._stream_callbacks(name))
+            case _:
+                raise ValueError(f"Unknown pipeline: {name}")
+
+    def initial_props(self):
+        src, dest = self.opts["src_lang"], self.opts["dest_lang"]
+        props = {}
+        if self.opts["pipeline"] == "dualstream":
+            # src/dest are the upstream direction, downstream is the reverse
+            if src:
+                props.update({"upstream/src-lang": src, "downstream/dest-lang": src})
+            if dest:
+                props.update({"upstream/dest-lang": dest, "downstream/src-lang": dest})
+        else:
+            if src:
+                props["src-lang"] = src
+            if dest:
+                props["dest-lang"] = dest
+        if self.opts["speculative"]:
+            if self.opts["pipeline"] == "dualstream":
+                props.update({"upstream/tran-speculative": True, "downstream/tran-speculative": True})
+            else:
+                props["tran-speculative"] = True
+        props.update(self.opts["props"] or {})
+        return props
+
+    # --- Running ---
+    async def _on_message(self, message):
+        self.bus_counts[message.msg_type] = self.bus_counts.get(message.msg_type, 0) + 1
+        if message.msg_type in self.opts["bus"]:
+            source = getattr(message.source, "path", message.source)
+            self.writer.emit("bus", msg_type=message.msg_type, source=source, payload=message.payload)
+
+    async def _report_stats(self):
+        interval = self.opts["stats_interval"]
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.writer.emit("stats", **self.stats(lag=loop.time() - started - interval))
+
+    def stats(self, lag=None):
+        stats = {
+            "cpu_s": round(time.process_time(), 3),
+            "sinks": {str(sink.filepath) if isinstance(sink, VpWavSink) else sink.name:
+                      {"blocks": sink.blocks, "frames": sink.frames} for sink in self.sinks},
+            "overflows": sum(source.overflows for source in self.sources),
+            "bus": dict(self.bus_counts),
+            "services": ServiceManager().stats_snapshot(),
+        }
+        if lag is not None:
+            stats["loop_lag_ms"] = round(max(lag, 0.0) * 1000, 1)
+        return stats
+
+    async def _wait_sources(self):
+        # Never returns while any source is endless
+        while not all(getattr(source, "finished", False) for source in self.sources):
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(self.opts["drain"])
+
+    async def run(self):
+        pipeline = self.build()
+        pipeline.bus.add_watch(self._on_message)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # e.g. Windows, or not on the main thread
+
+        props = self.initial_props()
+        if props:
+            timings = await pipeline.set_props(props)
+            self.writer.emit("props", applied_ms={k: round(v * 1000, 2) for k, v in timings.items()})
+
+        self.writer.emit("start", pipeline=self.opts["pipeline"])
+        if not await pipeline.set_state(VpState.RUNNING):
+            raise RuntimeError("Pipeline failed to start")
+
+        waits = [asyncio.create_task(stop.wait()), asyncio.create_task(self._wait_sources())]
+        if self.opts["duration"]:
+            waits.append(asyncio.create_task(asyncio.sleep(self.opts["duration"])))
+        stats_task = asyncio.create_task(self._report_stats()) if self.opts["stats_interval"] else None
+        try:
+            await asyncio.wait(waits, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in waits + [stats_task]:
+                if task:
+                    task.cancel()
+            await pipeline.set_state(VpState.NULL)
+            # Sinks close in a background task on deactivation, finish them now
+            for sink in self.sinks:
+                await sink.close()
+            await ServiceManager().pool.clear()
+            self.writer.emit("summary", **self.stats())
+
+
+def parse_options(argv=None):
+    parser = argparse.ArgumentParser(description="Run a pipeline without the UI, JSON lines on stdout.")
+    parser.add_argument("--config", help="YAML file with any of the options below")
+    parser.add_argument("--pipeline",
+                        help="upstream, downstream, selftalk, dualstream, speech-translator or augmented")
+    parser.add_argument("--source", help="tone[:freq[:amplitude]], silence, file:<path> or a path")
+    parser.add_argument("--source-duration", type=float, help="Seconds of tone or silence (default: endless)")
+    parser.add_argument("--no-realtime", dest="realtime", action="store_false", default=None,
+                        help="Read the source as fast as the pipeline takes it instead of in real time")
+    parser.add_argument("--sink", help="null or wav:<path>")
+    parser.add_argument("--src-lang")
+    parser.add_argument("--dest-lang")
+    parser.add_argument("--prop", action="append", dest="prop_list", metavar="KEY=VALUE",
+                        help="Extra pipeline property, repeatable; values are parsed as YAML")
+    parser.add_argument("--duration", type=float, help="Stop after this many seconds")
+    parser.add_argument("--drain", type=float, help="Seconds to keep running after the sources end")
+    parser.add_argument("--stats-interval", type=float, help="Seconds between stats lines, 0 to disable")
+    parser.add_argument("--bus", action="append", metavar="MSG_TYPE",
+                        help="Also print bus messages of this type, repeatable")
+    parser.add_argument("--services-config")
+    parser.add_argument("--service-settings")
+    parser.add_argument("--log-level")
+    parser.add_argument("--transcript-dir", help="Record ASR and translation results to this directory")
+    parser.add_argument("--speculative", action="store_true", default=None,
+                        help="Translate stable interim transcripts before the final one")
+    args = parser.parse_args(argv)
+
+    opts = dict(DEFAULTS)
+    if args.config:
+        with open(args.config, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        opts.update({key.replace("-", "_"): value for key, value in config.items()})
+    for key, value in vars(args).items():
+        if key not in ("config", "prop_list") and value is not None:
+            opts[key] = value
+    if args.prop_list:
+        opts["props"] = dict(opts["props"] or {})
+        for item in args.prop_list:
+            key, _, value = item.partition("=")
+            opts["props"][key] = yaml.safe_load(value)
+    return opts
+
+
+def main(argv=None):
+    opts = parse_options(argv)
+    logging.basicConfig(stream=sys.stderr, level=opts["log_level"].upper(),
+                        format="[%(asctime)s] [%(levelname)-7s] [%(name)s]: %(message)s")
+    ServiceManager(config_path=opts["services_config"], settings_path=opts["service_settings"])
+    asyncio.run(HeadlessRun(opts).run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,11 @@
-import os
 import sys
+from app.utils import startup_profiler
+if "--profile-startup" in sys.argv:
+    # Before the imports below, so they show up in the report
+    startup_profiler.enable()
+
+import os
+import argparse
 import asyncio
 import logging
 import logging.config
@@ -15,7 +21,10 @@ from app.models.service_setting_model import ServiceSettingModel
 from app.controller.speech_translator_pipeline import SpeechTranslatorPipeline
 from app.utils.qml_utils import init_engine, set_window_title
 from app.models.audio_device_manager import AudioDeviceManager
+from app.utils.persistence import flush_all
+from app.controller.pipeline_proxy import make_stream_wrapper
 from services.service_manager import ServiceManager
+from vpipe.utils import cache_resampler
 
 os.environ["QT_QUICK_CONTROLS_STYLE"] = "Fusion"
 
@@ -27,41 +36,80 @@ def init_logging():
     logging.config.dictConfig(config)
 
 
-async def main():
-    init_logging()
+def init_services():
     ServiceManager(config_path='services/services_config.yaml',
                    settings_path='service_setting.yaml')
 
-    app = QApplication(sys.argv)
-    loop = QEventLoop(app)
-    asyncio.set_event_loop(loop)
 
-    audio_device_manager = AudioDeviceManager()
-    conversation_model = ConversationModel()
-    setting_model = SettingModel('setting.yaml')
-    setting_model.load()
+def init_pipeline_worker():
+    # Runs in each pipeline worker process with --isolation process
+    init_logging()
+    init_services()
+
 
-    pipeline = SpeechTranslatorPipeline(
-        conversation_model=conversation_model,
-        setting_model=setting_model
-    )
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--isolation", choices=["none", "thread", "process"], default="none",
+                        help="Run upstream and downstream on the shared loop (none), "
+                             "one loop thread each (thread), or one worker process each (process)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Log import and init time per module once the first frame is shown")
+    # Leave the rest to Qt
+    return parser.parse_known_args()
 
-    service_setting_model = ServiceSettingModel(
-        str(Path(__file__).resolve().parent / "services" / "services_config.yaml"),
-        str(Path(__file__).resolve().parent / "service_setting.yaml")
-    )
 
-    service_setting_model.serviceChanged.connect(lambda *_: ServiceManager().reload_settings())
-    service_setting_model.fieldChanged.connect(lambda *_: ServiceManager().reload_settings())
+async def main():
+    args, qt_args = parse_args()
+    with startup_profiler.phase("logging"):
+        init_logging()
+    with startup_profiler.phase("services"):
+        init_services()
+    # Compile the resampler kernels while the UI loads
+    cache_resampler.warmup(wait=False)
+
+    with startup_profiler.phase("qt application"):
+        app = QApplication(sys.argv[:1] + qt_args)
+        loop = QEventLoop(app)
+        asyncio.set_event_loop(loop)
+
+    with startup_profiler.phase("models"):
+        audio_device_manager = AudioDeviceManager()
+        conversation_model = ConversationModel()
+        setting_model = SettingModel('setting.yaml')
+        setting_model.load()
+
+    with startup_profiler.phase("pipeline controller"):
+        pipeline = SpeechTranslatorPipeline(
+            conversation_model=conversation_model,
+            setting_model=setting_model,
+            stream_wrapper=make_stream_wrapper(args.isolation, initializer=init_pipeline_worker)
+        )
+
+    with startup_profiler.phase("service settings"):
+        service_setting_model = ServiceSettingModel(
+            str(Path(__file__).resolve().parent / "services" / "services_config.yaml"),
+            str(Path(__file__).resolve().parent / "service_setting.yaml"),
+            registry=ServiceManager().registry,
+        )
+
+    # Settings are saved in the background, hand the in-memory copy over
+    def reload_service_settings(*_):
+        ServiceManager().reload_settings(service_setting_model.settings)
+        pipeline.reload_service_settings(service_setting_model.settings)
+
+    service_setting_model.settingsApplied.connect(reload_service_settings)
+    app.aboutToQuit.connect(flush_all)
+    app.aboutToQuit.connect(pipeline.shutdown)
 
     qml_path = Path(__file__).resolve().parent / "app" / "qml" / "main.qml"
-    qml_engine = init_engine(qml_path, {
-        "pipeline": pipeline,
-        "conversationModel": conversation_model,
-        "settingModel": setting_model,
-        "audioDeviceManager": audio_device_manager,
-        "serviceSettingModel": service_setting_model
-    })
+    with startup_profiler.phase("qml"):
+        qml_engine = init_engine(qml_path, {
+            "pipeline": pipeline,
+            "conversationModel": conversation_model,
+            "settingModel": setting_model,
+            "audioDeviceManager": audio_device_manager,
+            "serviceSettingModel": service_setting_model
+        })
 
     if not qml_engine.rootObjects():
         print("Failed to load QML file.")
@@ -70,6 +118,13 @@ async def main():
     root = qml_engine.rootObjects()[0]
     set_window_title(root, "Speech Translator (Self Talk mode for development)")
 
+    if startup_profiler.is_enabled() and hasattr(root, "frameSwapped"):
+        def on_first_frame():
+            root.frameSwapped.disconnect(on_first_frame)
+            startup_profiler.mark("first frame")
+            logging.getLogger("startup").info(startup_profiler.report())
+        root.frameSwapped.connect(on_first_frame)
+
     with loop:
         loop.run_forever()
 
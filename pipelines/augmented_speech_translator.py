@@ -52,7 +52,7 @@ class AugmentedSpeechTranslator(VpComposite):
 
     async def set_prop(self, prop, value):
         match prop:
-            case 'src-lang' | 'dest-lang' | 'asr-enable':
+            case 'src-lang' | 'dest-lang' | 'asr-enable' | 'tran-speculative' | 'service-reload':
                 await self.get_capsule("st").set_prop(prop, value)
             case 'tts-enable':
                 # immediately mute the TTS output if disabled
@@ -68,5 +68,5 @@ class AugmentedSpeechTranslator(VpComposite):
                 audio_queue_player = self.get_capsule("audio-queue-player")
                 await audio_queue_player.set_prop("speed", value)
             case _:
-                raise ValueError(f"Unknown property: {prop}")
+                await super().set_prop(prop, value)
             
\ No newline at end of file
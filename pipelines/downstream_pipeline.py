@@ -8,7 +8,8 @@ from vpipe.capsules.audio.speaker_sink import VpSpeakerSink
 from vpipe.capsules.audio.virtual_speaker_src import VpVirtualSpeakerSrc
 from vpipe.capsules.audio.volume import VpVolume
 from pipelines.augmented_speech_translator import AugmentedSpeechTranslator
-from vpipe.capsules.audio.rms_transform import VpRmsTransform
+from vpipe.capsules.audio.level_meter import VpLevelMeter
+from vpipe.capsules.text.transcript_recorder import VpTranscriptRecorder
 
 
 class ScriptWriter(VpBaseTransform):
@@ -37,28 +38,38 @@ class TranslatedScriptWriter(VpBaseTransform):
 class DownStreamPipeline(VpPipeline):
     """
     (virtual speaker source) → [augmented speech translator] → (speaker sink)
+
+    `source` and `sink` replace the virtual speaker and the speaker, e.g. to run headless.
+    With `transcript_dir`, ASR and translation results are recorded there.
     """
     def __init__(self,
                  name="downstream-pipeline",
                  script_writer_callback=None,
                  translated_script_writer_callback=None,
-                 rms_callback=lambda data: None):
+                 rms_callback=lambda data: None,
+                 source=None,
+                 sink=None,
+                 transcript_dir=None):
         
         super().__init__(name)
+        self.source = source
+        self.sink = sink
+        self.transcript_dir = transcript_dir
         self.script_writer_callback = script_writer_callback
         self.translated_script_writer_callback = translated_script_writer_callback
         self.rms_callback = rms_callback
         self.build()
 
     def build(self):
-        src = VpVirtualSpeakerSrc(name="virtual-speaker-src")
+        src = self.source or VpVirtualSpeakerSrc(name="virtual-speaker-src")
         q1 = VpQueue(name='q1', maxsize=2, leaky=DrainPolicy.DOWNSTREAM)
-        sink = VpSpeakerSink(name="speaker-sink")
+        sink = self.sink or VpSpeakerSink(name="speaker-sink")
+        self.source, self.sink = src, sink
         volume = VpVolume(name="volume-control")
         
         translator = AugmentedSpeechTranslator(name="ast",
                                                src_lang='en', dest_lang='vi')
-        rms_transform = VpRmsTransform(name="rms-transform")
+        rms_transform = VpLevelMeter(name="rms-transform")
 
         src >> translator >> volume >> q1 >> sink
         src >> rms_transform
@@ -71,7 +82,13 @@ class DownStreamPipeline(VpPipeline):
         
         translator.get_output("asr_script") >> script_writer
         translator.get_output("tran_script") >> translated_script_writer
-        async def on_rms_callback(name, data): self.rms_callback(data)
+        if self.transcript_dir:
+            recorder = VpTranscriptRecorder(name="transcript-recorder", directory=self.transcript_dir,
+                                            prefix="downstream")
+            translator.get_output("asr_script") >> recorder.get_input("asr")
+            translator.get_output("tran_script") >> recorder.get_input("tran")
+            self.add(recorder)
+        async def on_rms_callback(name, data): self.rms_callback(data["rms"])
         rms_transform.out.set_chain_callback(on_rms_callback)
 
         self.adds(
@@ -87,13 +104,13 @@ class DownStreamPipeline(VpPipeline):
     
     async def set_prop(self, prop, value):
         match prop:
-            case 'src-lang' | 'dest-lang' | 'src-volume' | 'tts-volume' | 'asr-enable' | 'tts-enable' | 'tts-speed':
+            case 'src-lang' | 'dest-lang' | 'src-volume' | 'tts-volume' | 'asr-enable' | 'tts-enable' | 'tts-speed' \
+                | 'tran-speculative' | 'service-reload':
                 await self.get_capsule("ast").set_prop(prop, value)
             case 'output-device':
-                sink = self.get_capsule("speaker-sink")
-                await sink.set_prop("device", value)
+                await self.sink.set_prop("device", value)
             case 'output-mute':
                 volume = self.get_capsule("volume-control")
                 await volume.set_prop("mute", value)
             case _:
-                raise ValueError(f"Unknown property: {prop}")
\ No newline at end of file
+                await super().set_prop(prop, value)
\ No newline at end of file
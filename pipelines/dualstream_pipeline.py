@@ -6,30 +6,61 @@ from pipelines.upstream_pipeline import UpStreamPipeline
 
 
 class DualStreamPipeline(VpPipeline):
+    """
+    Runs the upstream and downstream pipelines side by side.
+
+    `stream_wrapper(name, factory, callbacks)`, when given, builds the
+    capsule that stands for each stream from a picklable factory of the
+    stream pipeline and its callbacks, e.g. a proxy that runs the stream
+    on its own loop thread or process (see app.controller.pipeline_proxy).
+    `transcript_dir` is passed on to both streams.
+    """
     def __init__(self, name="dual-stream-pipeline", 
                  script_writer_callback=None,
                  translated_script_writer_callback=None,
-                 rms_callback=None):
+                 rms_callback=None,
+                 stream_wrapper=None,
+                 transcript_dir=None):
         super().__init__(name)
         self.scr_writter = script_writer_callback or (lambda *args: None)
         self.translated_scr_writter = translated_script_writer_callback or (lambda *args: None)
         self.rms_callback = rms_callback or (lambda stream, rms: None)
+        self.stream_wrapper = stream_wrapper
+        self.transcript_dir = transcript_dir
 
-        self._downstream = DownStreamPipeline(
-            name="downstream",
-            script_writer_callback=partial(self.scr_writter, "Other"),
-            translated_script_writer_callback=partial(self.translated_scr_writter, "Other"),
-            rms_callback=partial(self.rms_callback, "downstream")
-        )
-        self._upstream = UpStreamPipeline(
-            name="upstream",
-            script_writer_callback=partial(self.scr_writter, "You"),
-            translated_script_writer_callback=partial(self.translated_scr_writter, "You"),
-            rms_callback=partial(self.rms_callback, "upstream")
-        )
+        self._downstream = self._build_stream(DownStreamPipeline, "downstream", "Other")
+        self._upstream = self._build_stream(UpStreamPipeline, "upstream", "You")
 
         self.adds(self._upstream, self._downstream)
 
+    def _build_stream(self, pipeline_cls, name, speaker):
+        factory = partial(pipeline_cls, name=name, transcript_dir=self.transcript_dir)
+        callbacks = {
+            "script_writer_callback": partial(self.scr_writter, speaker),
+            "translated_script_writer_callback": partial(self.translated_scr_writter, speaker),
+            "rms_callback": partial(self.rms_callback, name),
+        }
+        if self.stream_wrapper is None:
+            return factory(**callbacks)
+        return self.stream_wrapper(name, factory, callbacks)
+
+    async def set_props(self, props):
+        # One batch per stream, both streams at once
+        per_stream = {}
+        for prop, value in props.items():
+            stream, _, stream_prop = prop.partition("/")
+            per_stream.setdefault(stream, {})[stream_prop] = value
+        if not set(per_stream) <= {"upstream", "downstream"}:
+            return await super().set_props(props)
+
+        results = await asyncio.gather(*(
+            self.get_capsule(stream).set_props(stream_props)
+            for stream, stream_props in per_stream.items()
+        ))
+        return {f"{stream}/{prop}": elapsed
+                for stream, timings in zip(per_stream, results)
+                for prop, elapsed in timings.items()}
+
     @property
     def upstream(self):
         return self._upstream
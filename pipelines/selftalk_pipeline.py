@@ -39,16 +39,21 @@ class SelfTalkPipeline(VpPipeline):
     def __init__(self,
                  name="downstream-pipeline",
                  script_writer_callback=None,
-                 translated_script_writer_callback=None):
+                 translated_script_writer_callback=None,
+                 source=None,
+                 sink=None):
         
         super().__init__(name)
+        self.source = source
+        self.sink = sink
         self.script_writer_callback = script_writer_callback
         self.translated_script_writer_callback = translated_script_writer_callback
         self.build()
 
     def build(self):
-        src = VpMicSource()
-        sink = VpSpeakerSink(name="speaker-sink")
+        src = self.source or VpMicSource()
+        sink = self.sink or VpSpeakerSink(name="speaker-sink")
+        self.source, self.sink = src, sink
         translator = AugmentedSpeechTranslator(name="ast",
                                                src_lang='en', dest_lang='vi')
         src >> translator >> sink
@@ -70,7 +75,7 @@ class SelfTalkPipeline(VpPipeline):
     
     async def set_prop(self, prop, value):
         match prop:
-            case 'src-lang' | 'dest-lang' | 'src-volume' | 'tts-volume':
+            case 'src-lang' | 'dest-lang' | 'src-volume' | 'tts-volume' | 'service-reload':
                 await self.get_capsule("ast").set_prop(prop, value)
             case _:
-                raise ValueError(f"Unknown property: {prop}")
\ No newline at end of file
+                await super().set_prop(prop, value)
\ No newline at end of file
@@ -1,11 +1,12 @@
+from functools import partial
 from vpipe.core.composite import VpComposite
-from vpipe.core.queue import VpQueue, DrainPolicy
+from vpipe.core.queue import VpQueue, DrainPolicy, coalesce_audio, coalesce_text
 from vpipe.core.capsule import VpState
 from vpipe.core.transform import VpBaseTransform
 from vpipe.capsules.services.asr import ASRTransform
 from vpipe.capsules.services.tts import TTSTransform
 from vpipe.capsules.services.tran import TranslationTransform
-from services.service_manager import ServiceManager
+from services.service_manager import PooledServiceProvider
 
 
 class TextCompleteFilter(VpBaseTransform):
@@ -20,6 +21,7 @@ class SpeechTranslator(VpComposite):
     Pipeline:
         (in) → q1 → asr_transform → q2 → tran_transform → q3 → tts_transform → (out) 
                                   → (asr_script)        → (tran_script)
+                                  → tran_transform/interim (speculative translation)
     """
 
     def __init__(self, name=None,
@@ -32,40 +34,25 @@ class SpeechTranslator(VpComposite):
         self.build()
 
     def build(self):
-        def asr_service_factory(lang='en'):
-            sm = ServiceManager()
-            sel_id = sm.get_selected_service_id('ASR')
-            service_cls = sm.get_service_class('ASR', sel_id)
-            settings = sm.get_service_settings('ASR', sel_id)
-            return service_cls(lang=lang, settings=settings)
-
-        def tts_service_factory():
-            sm = ServiceManager()
-            sel_id = sm.get_selected_service_id('TTS')
-            service_cls = sm.get_service_class('TTS', sel_id)
-            settings = sm.get_service_settings('TTS', sel_id)
-            return service_cls(settings=settings)
-
-        def tran_service_factory():
-            sm = ServiceManager()
-            sel_id = sm.get_selected_service_id('TRA')
-            service_cls = sm.get_service_class('TRA', sel_id)
-            settings = sm.get_service_settings('TRA', sel_id)
-            return service_cls(settings=settings)
-        
+        # Services come from the ServiceManager pool, so released services
+        # stay connected across Stop/Start and language switches
         # ASR
-        q1 = VpQueue(name='q1', maxsize=10, leaky=DrainPolicy.DOWNSTREAM)
-        asr_transform = ASRTransform('asr', service_factory=asr_service_factory, lang=self._src_lang)
+        # Blocks that waited too long for ASR are sent merged, sentences
+        # that waited for translation are translated together (see _set_q2_coalesce)
+        q1 = VpQueue(name='q1', maxsize=10, leaky=DrainPolicy.DOWNSTREAM,
+                     max_latency_ms=500, coalesce=coalesce_audio)
+        asr_transform = ASRTransform('asr', service_provider=PooledServiceProvider('ASR'),
+                                     lang=self._src_lang)
         text_complete_filter = TextCompleteFilter()
 
         # Translation
-        q2 = VpQueue(name='q2', maxsize=10, leaky=DrainPolicy.DOWNSTREAM)
-        tran_transform = TranslationTransform('tran', service_factory=tran_service_factory,
+        q2 = VpQueue(name='q2', maxsize=10, leaky=DrainPolicy.DOWNSTREAM, max_latency_ms=2000)
+        tran_transform = TranslationTransform('tran', service_provider=PooledServiceProvider('TRA'),
                                               src=self._src_lang, dest=self._dest_lang)
 
         # TTS
         q3 = VpQueue(name='q3', maxsize=10, leaky=DrainPolicy.DOWNSTREAM)
-        tts_transform = TTSTransform('tts', service_factory=tts_service_factory,
+        tts_transform = TTSTransform('tts', service_provider=PooledServiceProvider('TTS'),
                                      lang=self._dest_lang)
 
         # Add capsules
@@ -75,7 +62,9 @@ class SpeechTranslator(VpComposite):
             q3, tts_transform
         )
 
-        # Connect capsules
+        # Connect capsules. The interim tap is linked first so a final is
+        # offered to the speculation cache before q2 can hand it to resolve()
+        asr_transform >> tran_transform.get_input("interim")
         q1 >> asr_transform >> text_complete_filter >> q2 >> tran_transform >> q3 >> tts_transform
 
         # Expose inputs and outputs
@@ -83,6 +72,13 @@ class SpeechTranslator(VpComposite):
         self.expose_output("out", tts_transform.get_output("out"))
         self.expose_output("asr_script", asr_transform.get_output("out"))
         self.expose_output("tran_script", tran_transform.get_output("out"))
+        self._set_q2_coalesce()
+
+    def _set_q2_coalesce(self):
+        # Late finals are always merged, never dropped. With speculation on
+        # a merged request misses the per-sentence cache and is translated anew
+        q2 = self.get_capsule("q2")
+        q2.coalesce = partial(coalesce_text, lang=self._src_lang)
 
     async def set_prop(self, prop, value):
         match prop:
@@ -96,11 +92,19 @@ class SpeechTranslator(VpComposite):
             case "tts-enable":
                 tts = self.get_capsule("tts")
                 await tts.set_prop("enable", value)
+            case "tran-speculative":
+                tran = self.get_capsule("tran")
+                await tran.set_prop("speculative", value)
+            case "service-reload":
+                # Swap services whose settings changed, without stopping the audio
+                for name in ("asr", "tran", "tts"):
+                    await self.get_capsule(name).set_prop("service-reload", value)
             case _:
-                raise ValueError(f"Unknown property: {prop}")
+                await super().set_prop(prop, value)
 
     async def _set_src_lang(self, src_lang):
         self._src_lang = src_lang
+        self._set_q2_coalesce()
         
         # ASR
         asr = self.get_capsule("asr")
@@ -0,0 +1,383 @@
+"""
+`build_failover`
+Pairs the selected service with a secondary one from the same module.
+Configured per module in service_setting.yaml:
+
+    TRA:
+      selected: google
+      failover:
+        secondary: local_nllb
+        mode: hedge          # failover (default) | hedge (TRA only)
+        p95_ms: 1500         # switch when the primary's rolling p95 exceeds this
+        error_rate: 0.3      # ... or when its rolling error rate exceeds this
+        min_calls: 5         # calls in the window before the thresholds apply
+        cooldown_s: 30       # time on the secondary before the primary is retried
+
+Translation and TTS keep both services connected and route each call
+through a circuit breaker. ASR streams on one connection at a time; its
+"calls" are utterances, timed from the first audio sent after a final to
+the next final, and it fails over on errors or when those cross the
+thresholds.
+"""
+import asyncio
+import logging
+import time
+from services.instrumentation import ServiceStats
+from vpipe.capsules.services.asr import ASRServiceInterface
+from vpipe.capsules.services.tran import TranslatorServiceInterface
+from vpipe.capsules.services.tts import TTSServiceInterface
+
+logger = logging.getLogger(__name__)
+
+
+class FailoverPolicy:
+    def __init__(self, mode="failover", p95_ms=None, error_rate=0.5, min_calls=5,
+                 window=20, cooldown_s=30.0, hedge_delay_ms=0.0):
+        self.mode = mode
+        self.p95_ms = p95_ms
+        self.error_rate = error_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.cooldown_s = cooldown_s
+        self.hedge_delay_ms = hedge_delay_ms
+
+    @classmethod
+    def from_settings(cls, settings):
+        def num(key, default, cast=float):
+            value = settings.get(key)
+            return default if value in (None, '') else cast(value)
+        return cls(
+            mode=settings.get("mode") or "failover",
+            p95_ms=num("p95_ms", None),
+            error_rate=num("error_rate", 0.5),
+            min_calls=num("min_calls", 5, int),
+            window=num("window", 20, int),
+            cooldown_s=num("cooldown_s", 30.0),
+            hedge_delay_ms=num("hedge_delay_ms", 0.0),
+        )
+
+    def unhealthy(self, stats):
+        if len(stats.outcomes) < self.min_calls:
+            return False
+        if self.error_rate is not None and stats.error_rate() > self.error_rate:
+            return True
+        p95 = stats.latency(95)
+        return self.p95_ms is not None and p95 is not None and p95 * 1000 > self.p95_ms
+
+
+class CircuitBreaker:
+    """
+    Closed: calls go to the primary. Open: calls go to the secondary until
+    the cooldown ends, then the primary gets a trial call (half-open) that
+    either closes the breaker or opens it for another cooldown.
+    """
+    def __init__(self, name, policy):
+        self.name = name
+        self.policy = policy
+        self.stats = ServiceStats(name, window=policy.window)
+        self.open_until = None
+
+    @property
+    def is_open(self):
+        return self.open_until is not None
+
+    def use_primary(self):
+        return self.open_until is None or time.monotonic() >= self.open_until
+
+    def trip(self, reason):
+        self.open_until = time.monotonic() + self.policy.cooldown_s
+        logger.warning(f"{self.name}: switching to secondary ({reason})")
+
+    def record(self, ok, elapsed):
+        if ok:
+            self.stats.record_call(elapsed)
+        else:
+            self.stats.record_error()
+
+        if self.open_until is not None:
+            p95_ms = self.policy.p95_ms
+            if ok and (p95_ms is None or elapsed * 1000 <= p95_ms):
+                self.open_until = None
+                self.stats = ServiceStats(self.name, window=self.policy.window)
+                logger.info(f"{self.name}: primary recovered, switching back")
+            else:
+                self.trip("trial call failed")
+        elif self.policy.unhealthy(self.stats):
+            self.trip(f"p95={self.stats.latency(95)}, error_rate={self.stats.error_rate():.2f}")
+
+
+class _CallFailover:
+    """ Failover for request/response services (translation, TTS). """
+    def __init__(self, primary, secondary, policy, name):
+        self.primary = primary
+        self.secondary = secondary
+        self.policy = policy
+        self.breaker = CircuitBreaker(name, policy)
+        self._started = []
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name == "primary":
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+
+    @property
+    def stats(self):
+        active = self.secondary if self.breaker.is_open else self.primary
+        return getattr(active, "stats", None)
+
+    async def start(self):
+        for service in (self.primary, self.secondary):
+            try:
+                await service.start()
+                self._started.append(service)
+            except Exception as e:
+                logger.warning(f"{self.breaker.name}: {service.__class__.__name__} failed to start: {e}")
+        if not self._started:
+            raise RuntimeError(f"{self.breaker.name}: neither primary nor secondary service started")
+        if self.primary not in self._started:
+            self.breaker.trip("primary failed to start")
+
+    async def stop(self):
+        started, self._started = self._started, []
+        for service in started:
+            await service.stop()
+
+    async def pause(self):
+        await self._each("pause")
+
+    async def resume(self):
+        await self._each("resume")
+
+    async def keepalive(self):
+        await self._each("keepalive")
+
+    async def _each(self, method):
+        for service in self._started:
+            try:
+                await getattr(service, method)()
+            except (AttributeError, NotImplementedError):
+                pass
+
+    async def _call_primary(self, call):
+        t0 = time.perf_counter()
+        try:
+            result = await call
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"{self.breaker.name}: primary call failed: {e}")
+            result = None
+        self.breaker.record(result is not None, time.perf_counter() - t0)
+        return result
+
+    async def _dispatch(self, call):
+        if self.primary in self._started and \
+                (self.breaker.use_primary() or self.secondary not in self._started):
+            result = await self._call_primary(call(self.primary))
+            if result is not None or self.secondary not in self._started:
+                return result
+        return await call(self.secondary)
+
+
+class FailoverTranslatorService(_CallFailover, TranslatorServiceInterface):
+    def __init__(self, primary, secondary, policy, name="TRA"):
+        super().__init__(primary, secondary, policy, name)
+
+    async def translate(self, text, src, dest):
+        call = lambda service: service.translate(text, src=src, dest=dest)
+        if self.policy.mode == "hedge" and len(self._started) == 2 and self.breaker.use_primary():
+            return await self._hedged(call)
+        return await self._dispatch(call)
+
+    async def _hedged(self, call):
+        primary = asyncio.create_task(self._call_primary(call(self.primary)))
+        secondary = asyncio.create_task(self._delayed(call(self.secondary)))
+        pending = {primary, secondary}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None and task.result() is not None:
+                        return task.result()
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _delayed(self, call):
+        if self.policy.hedge_delay_ms > 0:
+            try:
+                await asyncio.sleep(self.policy.hedge_delay_ms / 1000)
+            except asyncio.CancelledError:
+                call.close()
+                raise
+        return await call
+
+
+class FailoverTTSService(_CallFailover, TTSServiceInterface):
+    def __init__(self, primary, secondary, policy, name="TTS"):
+        super().__init__(primary, secondary, policy, name)
+
+    async def synthesize(self, text, lang):
+        return await self._dispatch(lambda service: service.synthesize(text, lang))
+
+
+class FailoverASRService(ASRServiceInterface):
+    """
+    Streams to one service at a time. A failing start, send or result
+    stream, or a primary the policy finds unhealthy, moves the stream to
+    the secondary; after the cooldown a fresh primary is started in the
+    background and takes over once connected. `health` holds the active
+    service's utterance latencies and errors, fresh for every service.
+    `create_primary` and `create_secondary` take the language.
+    """
+    def __init__(self, create_primary, create_secondary, policy, lang='en', name="ASR"):
+        self.create_primary = create_primary
+        self.create_secondary = create_secondary
+        self.policy = policy
+        self.lang = lang
+        self.name = name
+        self.active = None
+        self.on_primary = False
+        self._failed_at = None
+        self._queue = asyncio.Queue()
+        self._pump = None
+        self._retry = None
+        self.health = ServiceStats(name, window=policy.window)
+        self._utterance_since = None  # first send after the last final
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in ("active", "health"):
+            raise AttributeError(name)
+        return getattr(self.active, name)
+
+    @property
+    def stats(self):
+        return getattr(self.active, "stats", None)
+
+    async def start(self):
+        try:
+            await self._activate(self.create_primary(self.lang), primary=True)
+        except Exception as e:
+            logger.warning(f"{self.name}: primary failed to start: {e}")
+            await self._activate(self.create_secondary(self.lang), primary=False)
+
+    async def stop(self):
+        for task in (self._retry, self._pump):
+            if task:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        self._retry = self._pump = None
+        if self.active:
+            active, self.active = self.active, None
+            await active.stop()
+
+    async def _activate(self, service, primary):
+        await service.start()
+        old, self.active, self.on_primary = self.active, service, primary
+        self.health = ServiceStats(self.name, window=self.policy.window)
+        self._utterance_since = None
+        self._failed_at = None if primary else (self._failed_at or time.monotonic())
+        if self._pump:
+            self._pump.cancel()
+        self._pump = asyncio.create_task(self._forward(service))
+        if old:
+            try:
+                await old.stop()
+            except Exception as e:
+                logger.debug(f"{self.name}: failed to stop {old.__class__.__name__}: {e}")
+
+    async def _forward(self, service):
+        try:
+            async for result in service.results():
+                if result[1] and self._utterance_since is not None:
+                    self.health.record_call(time.monotonic() - self._utterance_since)
+                    self._utterance_since = None
+                await self._queue.put(result)
+                if self._check_health(service):
+                    asyncio.create_task(self._fail(service))
+                    return
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.warning(f"{self.name}: result stream failed: {e}")
+            self.health.record_error(e)
+            asyncio.create_task(self._fail(service))
+
+    def _check_health(self, service):
+        if service is not self.active or not self.on_primary:
+            return False
+        if not self.policy.unhealthy(self.health):
+            return False
+        logger.warning(f"{self.name}: primary unhealthy (p95={self.health.latency(95)}, "
+                       f"error_rate={self.health.error_rate():.2f})")
+        return True
+
+    async def _fail(self, service):
+        if service is not self.active:
+            return
+        if self.on_primary:
+            logger.warning(f"{self.name}: switching to secondary")
+            self._failed_at = time.monotonic()
+            await self._activate(self.create_secondary(self.lang), primary=False)
+
+    def _maybe_retry_primary(self):
+        if self.on_primary or self._failed_at is None or (self._retry and not self._retry.done()):
+            return
+        if time.monotonic() - self._failed_at >= self.policy.cooldown_s:
+            self._retry = asyncio.create_task(self._retry_primary())
+
+    async def _retry_primary(self):
+        try:
+            await self._activate(self.create_primary(self.lang), primary=True)
+            logger.info(f"{self.name}: primary recovered, switching back")
+        except Exception as e:
+            logger.warning(f"{self.name}: primary still failing: {e}")
+            self._failed_at = time.monotonic()
+
+    async def send(self, buf):
+        self._maybe_retry_primary()
+        service = self.active
+        try:
+            await service.send(buf)
+        except Exception as e:
+            logger.warning(f"{self.name}: send failed: {e}")
+            self.health.record_error(e)
+            await self._fail(service)
+            return
+        if self._utterance_since is None:
+            self._utterance_since = time.monotonic()
+
+    async def results(self):
+        while True:
+            yield await self._queue.get()
+
+    async def switch_lang(self, lang):
+        await self.active.switch_lang(lang)
+        self.lang = lang
+
+    async def pause(self):
+        await self.active.pause()
+
+    async def resume(self):
+        self._utterance_since = None
+        await self.active.resume()
+
+    async def keepalive(self):
+        await self.active.keepalive()
+
+    def clear_results(self):
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        if self.active is not None:
+            self.active.clear_results()
+
+
+def build_failover(module, create, primary_id, secondary_id, lang, policy):
+    """`create(service_id, lang)` builds an unstarted service of `module`."""
+    if module == 'ASR':
+        return FailoverASRService(lambda lang: create(primary_id, lang),
+                                  lambda lang: create(secondary_id, lang),
+                                  policy, lang=lang or 'en')
+    wrapper = {'TRA': FailoverTranslatorService, 'TTS': FailoverTTSService}[module]
+    return wrapper(create(primary_id, lang), create(secondary_id, lang), policy, name=module)
@@ -0,0 +1,218 @@
+"""
+`instrument`
+Wraps a service instance so every call is timed into a `ServiceStats`.
+Streaming ASR has no calls as such: sends are only counted, and a call is
+the round trip from the first audio sent to the next result, or a
+start/switch_lang.
+Stats are shared by all instances of the same (module, service id), so the
+rolling window survives reconnects and pooled instances.
+"""
+import asyncio
+import time
+from collections import deque
+from vpipe.capsules.services.asr import ASRServiceInterface
+from vpipe.capsules.services.tran import TranslatorServiceInterface
+from vpipe.capsules.services.tts import TTSServiceInterface
+
+
+def _percentile(values, p):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def _nbytes(data):
+    if data is None:
+        return 0
+    if isinstance(data, str):
+        return len(data.encode("utf-8"))
+    return getattr(data, "nbytes", None) or len(data)
+
+
+class ServiceStats:
+    def __init__(self, name, window=256):
+        self.name = name
+        self.connects = 0
+        self.connect_time = None
+        self.calls = 0
+        self.sends = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.latencies = deque(maxlen=window)      # seconds, successful calls
+        self.outcomes = deque(maxlen=window)       # True for success
+        self.final_delays = deque(maxlen=window)   # ASR: first audio after a final -> next final
+
+    def record_connect(self, elapsed):
+        self.connects += 1
+        self.connect_time = elapsed
+
+    def record_call(self, elapsed, sent=0, received=0):
+        self.calls += 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+        self.latencies.append(elapsed)
+        self.outcomes.append(True)
+
+    def record_send(self, sent):
+        self.sends += 1
+        self.bytes_sent += sent
+
+    def record_error(self, exc=None, call=True):
+        if isinstance(exc, TimeoutError):
+            self.timeouts += 1
+        else:
+            self.errors += 1
+        if call:
+            self.calls += 1
+            self.outcomes.append(False)
+
+    def latency(self, p):
+        return _percentile(self.latencies, p)
+
+    def error_rate(self):
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def snapshot(self):
+        ms = lambda v: None if v is None else round(v * 1000, 1)
+        snap = {
+            "service": self.name,
+            "connects": self.connects,
+            "connect_ms": ms(self.connect_time),
+            "calls": self.calls,
+            "sends": self.sends,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "error_rate": round(self.error_rate(), 3),
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+        }
+        for p in (50, 90, 95, 99):
+            snap[f"p{p}_ms"] = ms(self.latency(p))
+        if self.final_delays:
+            snap["final_delay_p50_ms"] = ms(_percentile(self.final_delays, 50))
+            snap["final_delay_p95_ms"] = ms(_percentile(self.final_delays, 95))
+        return snap
+
+
+class _Instrumented:
+    def __init__(self, inner, stats):
+        self.inner = inner
+        self.stats = stats
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+    async def start(self):
+        t0 = time.perf_counter()
+        await self.inner.start()
+        self.stats.record_connect(time.perf_counter() - t0)
+
+    async def stop(self):
+        await self.inner.stop()
+
+    async def _timed(self, call, sent, is_error=lambda result: False):
+        t0 = time.perf_counter()
+        try:
+            result = await call
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.stats.record_error(e)
+            raise
+        if is_error(result):
+            self.stats.record_error()
+        else:
+            self.stats.record_call(time.perf_counter() - t0, sent, _nbytes(result))
+        return result
+
+
+class InstrumentedASRService(_Instrumented, ASRServiceInterface):
+    def __init__(self, inner, stats):
+        super().__init__(inner, stats)
+        self._waiting_since = None     # first send not yet answered by a result
+        self._utterance_since = None   # first send after the last final
+
+    async def send(self, buf):
+        try:
+            await self.inner.send(buf)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Counted, but a send is not a call: it stays out of the error rate
+            self.stats.record_error(e, call=False)
+            raise
+        now = time.perf_counter()
+        if self._waiting_since is None:
+            self._waiting_since = now
+        if self._utterance_since is None:
+            self._utterance_since = now
+        self.stats.record_send(_nbytes(buf))
+
+    async def results(self):
+        try:
+            async for text, is_final in self.inner.results():
+                now = time.perf_counter()
+                if self._waiting_since is not None:
+                    self.stats.record_call(now - self._waiting_since, received=_nbytes(text))
+                    self._waiting_since = None
+                else:
+                    self.stats.bytes_received += _nbytes(text)
+                # Audio streams without gaps, so time the whole utterance,
+                # not the last block before the final
+                if is_final and self._utterance_since is not None:
+                    self.stats.final_delays.append(now - self._utterance_since)
+                    self._utterance_since = None
+                yield text, is_final
+        except (asyncio.CancelledError, GeneratorExit):
+            raise
+        except Exception as e:
+            self.stats.record_error(e)
+            raise
+
+    async def switch_lang(self, lang):
+        await self._timed(self.inner.switch_lang(lang), 0)
+
+    async def pause(self):
+        await self.inner.pause()
+
+    async def resume(self):
+        # Sends before the pause that got no answer are not a round trip
+        self._waiting_since = None
+        self._utterance_since = None
+        await self.inner.resume()
+
+    async def keepalive(self):
+        await self.inner.keepalive()
+
+    def clear_results(self):
+        self.inner.clear_results()
+
+
+class InstrumentedTranslatorService(_Instrumented, TranslatorServiceInterface):
+    async def translate(self, text, src, dest):
+        # Services report failures by returning None
+        return await self._timed(self.inner.translate(text, src=src, dest=dest), _nbytes(text),
+                                 is_error=lambda result: result is None)
+
+
+class InstrumentedTTSService(_Instrumented, TTSServiceInterface):
+    async def synthesize(self, text, lang):
+        return await self._timed(self.inner.synthesize(text, lang), _nbytes(text))
+
+
+WRAPPERS = {
+    'ASR': InstrumentedASRService,
+    'TRA': InstrumentedTranslatorService,
+    'TTS': InstrumentedTTSService,
+}
+
+
+def instrument(module, instance, stats):
+    if isinstance(instance, _Instrumented):
+        return instance
+    return WRAPPERS[module](instance, stats)
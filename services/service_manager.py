@@ -3,8 +3,14 @@
 For simplicity, all settings are stored as string values.
 The application must handle conversion to the appropriate types.
 """
+import copy
+import json
 import yaml
-import importlib
+from services.service_pool import ServicePool
+from services.service_registry import ServiceRegistry
+from services.instrumentation import ServiceStats, instrument
+from services.failover import FailoverPolicy, build_failover
+from vpipe.capsules.services.provider import ServiceProvider
 
 class SingletonMeta(type):
     _instances = {}
@@ -15,38 +21,27 @@ class SingletonMeta(type):
 
 class ServiceManager(metaclass=SingletonMeta):
     def __init__(self, config_path, settings_path):
-        self.config = self._load_yaml(config_path)
+        self.registry = ServiceRegistry(config_path, config=self._load_yaml(config_path))
         self.settings_path = settings_path
         self.settings = self._load_yaml(settings_path)
         self.instances = {}
+        self.pool = ServicePool()
+        self.stats = {}
+
+    @property
+    def config(self):
+        return self.registry.config
 
     def _load_yaml(self, path):
         with open(path, 'r', encoding='utf-8') as f:
             return yaml.safe_load(f)
 
     def get_service_class(self, module, service_id):
-        for service in self.config[module]:
-            if service['id'] == service_id:
-                module_name, class_name = service['class'].rsplit('.', 1)
-                return getattr(importlib.import_module(module_name), class_name)
-        raise ValueError(f"Service {service_id} not found in {module}")
+        return self.registry.get_class(module, service_id)
 
     def get_service_settings(self, module, service_id):
         settings = self.settings.get(module, {}).get('settings', {}).get(service_id, {})
-        service = next((s for s in self.config.get(module, []) if s['id'] == service_id), None)
-        if not service:
-            return settings
-        schema_path = service.get('schema')
-        with open(schema_path, 'r', encoding='utf-8') as f:
-            schema = yaml.safe_load(f)
-            
-        fields = schema.get('fields', [])
-        result = dict(settings) if settings else {}
-        for field in fields:
-            key = field.get('key')
-            if key and (key not in result or result[key] == ''):
-                result[key] = str(field.get('default', ''))
-        return result
+        return self.registry.merged_settings(module, service_id, settings)
 
     def get_selected_service_id(self, module):
         return self.settings[module]['selected']
@@ -63,5 +58,96 @@ class ServiceManager(metaclass=SingletonMeta):
         self.instances[module] = instance
         return instance
 
-    def reload_settings(self):
-        self.settings = self._load_yaml(self.settings_path)
+    def create_service(self, module, service_id, lang=None, settings=None):
+        service_cls = self.get_service_class(module, service_id)
+        if settings is None:
+            settings = self.get_service_settings(module, service_id)
+        if module == 'ASR':
+            instance = service_cls(lang=lang or 'en', settings=settings)
+        else:
+            instance = service_cls(settings=settings)
+        return instrument(module, instance, self.get_service_stats(module, service_id))
+
+    def get_service_stats(self, module, service_id):
+        key = f"{module}/{service_id}"
+        if key not in self.stats:
+            self.stats[key] = ServiceStats(key)
+        return self.stats[key]
+
+    def stats_snapshot(self):
+        """Timing stats of every service created so far, keyed by 'module/service_id'."""
+        return {key: stats.snapshot() for key, stats in self.stats.items()}
+
+    def get_failover_settings(self, module):
+        """The module's `failover` section, or None when there is no usable secondary."""
+        failover = self.settings.get(module, {}).get('failover') or {}
+        secondary = failover.get('secondary')
+        if not secondary or secondary == self.get_selected_service_id(module):
+            return None
+        return failover
+
+    def service_key(self, module, lang=None):
+        """Pool key of the service `acquire_service` hands out with the current settings."""
+        service_id = self.get_selected_service_id(module)
+        key = (module, service_id, lang,
+               json.dumps(self.get_service_settings(module, service_id), sort_keys=True))
+        failover = self.get_failover_settings(module)
+        if failover is not None:
+            key += (json.dumps(failover, sort_keys=True),
+                    json.dumps(self.get_service_settings(module, failover['secondary']), sort_keys=True))
+        return key
+
+    async def acquire_service(self, module, lang=None):
+        """
+        Return a started instance of the selected service, reusing a warm one
+        from the pool when module, service id, lang and settings all match.
+        With a `failover` section the instance pairs the selected service
+        with its secondary.
+        """
+        service_id = self.get_selected_service_id(module)
+        settings = self.get_service_settings(module, service_id)
+        key = self.service_key(module, lang)
+        failover = self.get_failover_settings(module)
+        if failover is None:
+            return await self.pool.acquire(
+                key, lambda: self.create_service(module, service_id, lang, settings))
+
+        secondary = failover['secondary']
+        return await self.pool.acquire(key, lambda: build_failover(
+            module, lambda sid, lang: self.create_service(module, sid, lang),
+            service_id, secondary, lang, FailoverPolicy.from_settings(failover)))
+
+    async def release_service(self, instance):
+        await self.pool.release(instance)
+
+    def service_lang_switched(self, instance, lang):
+        """Re-key a pooled instance whose language was switched in place."""
+        key = self.pool.key_of(instance)
+        if key is not None:
+            self.pool.rekey(instance, key[:2] + (lang,) + key[3:])
+
+    def reload_settings(self, settings=None):
+        """Reload from disk, or take `settings` directly when the file may not be saved yet."""
+        if settings is not None:
+            self.settings = copy.deepcopy(settings)
+        else:
+            self.settings = self._load_yaml(self.settings_path)
+
+
+class PooledServiceProvider(ServiceProvider):
+    """Service provider for transforms backed by the ServiceManager pool."""
+    def __init__(self, module):
+        self.module = module
+
+    async def acquire(self, lang=None):
+        return await ServiceManager().acquire_service(self.module, lang=lang)
+
+    async def release(self, service):
+        await ServiceManager().release_service(service)
+
+    def lang_switched(self, service, lang):
+        ServiceManager().service_lang_switched(service, lang)
+
+    def is_current(self, service, lang=None):
+        manager = ServiceManager()
+        return manager.pool.key_of(service) == manager.service_key(self.module, lang)
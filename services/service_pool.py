@@ -0,0 +1,120 @@
+"""
+`ServicePool`
+Keeps released services connected so the next acquire with the same key
+skips the connect handshake (Start/Stop, language switch, settings change).
+Instances are bound to the event loop that started them, so idle instances
+are kept per loop.
+"""
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def _call_optional(method):
+    try:
+        await method()
+    except NotImplementedError:
+        pass
+
+
+class ServicePool:
+    def __init__(self, ttl=120.0, max_idle_per_key=2, keepalive_interval=5.0):
+        self.ttl = ttl
+        self.max_idle_per_key = max_idle_per_key
+        self.keepalive_interval = keepalive_interval
+        self._idle = {}      # (loop, key) -> [(instance, released_at)]
+        self._in_use = {}    # id(instance) -> key
+        self._reapers = {}   # loop -> task
+
+    async def acquire(self, key, create):
+        loop = asyncio.get_running_loop()
+        idle = self._idle.get((loop, key), [])
+        while idle:
+            instance, _ = idle.pop()
+            try:
+                if hasattr(instance, "resume"):
+                    await _call_optional(instance.resume)
+            except Exception as e:
+                logger.warning(f"Discard idle {instance.__class__.__name__}: {e}")
+                await self._stop(instance)
+                continue
+            if hasattr(instance, "clear_results"):
+                # Results the previous holder did not consume are not the new holder's
+                instance.clear_results()
+            logger.debug(f"Reuse warm {instance.__class__.__name__} for {key}")
+            self._in_use[id(instance)] = key
+            return instance
+
+        instance = create()
+        await instance.start()
+        self._in_use[id(instance)] = key
+        return instance
+
+    async def release(self, instance):
+        loop = asyncio.get_running_loop()
+        key = self._in_use.pop(id(instance), None)
+        idle = self._idle.get((loop, key), [])
+        if key is None or self.ttl <= 0 or len(idle) >= self.max_idle_per_key:
+            await self._stop(instance)
+            return
+
+        try:
+            if hasattr(instance, "pause"):
+                await _call_optional(instance.pause)
+        except Exception as e:
+            logger.warning(f"Failed to pause {instance.__class__.__name__}: {e}")
+            await self._stop(instance)
+            return
+
+        self._idle.setdefault((loop, key), []).append((instance, loop.time()))
+        if loop not in self._reapers or self._reapers[loop].done():
+            self._reapers[loop] = asyncio.create_task(self._reap(loop))
+
+    async def clear(self):
+        """Stop every idle instance owned by the running loop."""
+        loop = asyncio.get_running_loop()
+        reaper = self._reapers.pop(loop, None)
+        if reaper:
+            reaper.cancel()
+        for pool_key in [k for k in self._idle if k[0] is loop]:
+            for instance, _ in self._idle.pop(pool_key):
+                await self._stop(instance)
+
+    def rekey(self, instance, key):
+        """File an in-use `instance` under `key`, e.g. after its language was switched in place."""
+        if id(instance) in self._in_use:
+            self._in_use[id(instance)] = key
+
+    def key_of(self, instance):
+        """The key `instance` was acquired with, None if it is not in use."""
+        return self._in_use.get(id(instance))
+
+    def idle_count(self, key=None):
+        return sum(len(v) for (_, k), v in self._idle.items() if key is None or k == key)
+
+    async def _reap(self, loop):
+        while any(v for (l, _), v in self._idle.items() if l is loop):
+            await asyncio.sleep(self.keepalive_interval)
+            now = loop.time()
+            for (l, key), idle in list(self._idle.items()):
+                if l is not loop:
+                    continue
+                for item in list(idle):
+                    instance, released_at = item
+                    try:
+                        if now - released_at >= self.ttl:
+                            raise TimeoutError("idle ttl expired")
+                        if hasattr(instance, "keepalive"):
+                            await _call_optional(instance.keepalive)
+                    except Exception as e:
+                        logger.debug(f"Evict {instance.__class__.__name__} for {key}: {e}")
+                        if item in idle:
+                            idle.remove(item)
+                            await self._stop(instance)
+
+    async def _stop(self, instance):
+        try:
+            await instance.stop()
+        except Exception as e:
+            logger.warning(f"Failed to stop {instance.__class__.__name__}: {e}")
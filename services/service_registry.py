@@ -0,0 +1,126 @@
+"""
+`ServiceRegistry`
+Resolved view of services_config.yaml: entries with parsed schema fields,
+merged defaults and lazily imported, cached classes. Lookups do no disk
+I/O; the config and schema files are re-checked by mtime at most once per
+CHECK_INTERVAL_S and only the files that changed are parsed again.
+"""
+import importlib
+import logging
+import os
+import time
+import yaml
+
+logger = logging.getLogger(__name__)
+
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except (OSError, TypeError):
+        return None
+
+
+def _read_yaml(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+class ServiceEntry:
+    def __init__(self, module, config):
+        self.module = module
+        self.config = config
+        self.id = config['id']
+        self.class_path = config.get('class')
+        self.schema_path = config.get('schema')
+        self.fields = []
+        self.defaults = {}
+        self._schema_mtime = None
+        self._cls = None
+
+    def load_schema(self):
+        self._schema_mtime = _mtime(self.schema_path)
+        try:
+            schema = _read_yaml(self.schema_path) if self.schema_path else {}
+        except OSError as e:
+            logger.warning(f"Schema of {self.module}/{self.id} not readable: {e}")
+            schema = {}
+        self.fields = schema.get('fields', [])
+        self.defaults = {f['key']: str(f.get('default', '')) for f in self.fields if f.get('key')}
+
+    def schema_changed(self):
+        return self.schema_path is not None and _mtime(self.schema_path) != self._schema_mtime
+
+    @property
+    def cls(self):
+        if self._cls is None:
+            module_name, class_name = self.class_path.rsplit('.', 1)
+            self._cls = getattr(importlib.import_module(module_name), class_name)
+        return self._cls
+
+
+class ServiceRegistry:
+    CHECK_INTERVAL_S = 1.0
+
+    def __init__(self, config_path, config=None):
+        self.config_path = config_path
+        self._config_mtime = _mtime(config_path)
+        self._checked_at = time.monotonic()
+        self._build(config if config is not None else _read_yaml(config_path))
+
+    def _build(self, config):
+        old = getattr(self, '_entries', {})
+        self.config = config
+        self._entries = {}
+        for module, services in config.items():
+            for service in services or []:
+                entry = old.get((module, service['id']))
+                if entry is None or entry.config != service:
+                    entry = ServiceEntry(module, service)
+                    entry.load_schema()
+                self._entries[(module, service['id'])] = entry
+
+    def refresh(self, force=False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.CHECK_INTERVAL_S:
+            return
+        self._checked_at = now
+
+        mtime = _mtime(self.config_path)
+        if mtime is not None and mtime != self._config_mtime:
+            self._config_mtime = mtime
+            logger.info(f"Reloading service config: {self.config_path}")
+            self._build(_read_yaml(self.config_path))
+        for entry in self._entries.values():
+            if entry.schema_changed():
+                logger.info(f"Reloading schema: {entry.schema_path}")
+                entry.load_schema()
+
+    def service_list(self, module):
+        self.refresh()
+        return self.config.get(module, [])
+
+    def get(self, module, service_id):
+        self.refresh()
+        return self._entries.get((module, service_id))
+
+    def get_class(self, module, service_id):
+        entry = self.get(module, service_id)
+        if entry is None:
+            raise ValueError(f"Service {service_id} not found in {module}")
+        return entry.cls
+
+    def fields(self, module, service_id):
+        entry = self.get(module, service_id)
+        return entry.fields if entry else []
+
+    def merged_settings(self, module, service_id, settings):
+        """`settings` with empty or missing keys filled from the schema defaults."""
+        result = dict(settings) if settings else {}
+        entry = self.get(module, service_id)
+        if entry is None:
+            return result
+        for key, default in entry.defaults.items():
+            if key not in result or result[key] == '':
+                result[key] = default
+        return result
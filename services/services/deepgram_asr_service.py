@@ -26,6 +26,7 @@ class DeepGramASRService(ASRServiceInterface):
         self.recv_queue = asyncio.Queue()
         self.buffer = bytearray()
         self.started = False
+        self.paused = False
         self.min_send_size = 1024 * 16
 
         self.conn.on(LiveTranscriptionEvents.Transcript, self._on_transcript)
@@ -67,18 +68,34 @@ class DeepGramASRService(ASRServiceInterface):
             logger.debug("Deepgram ASR service stopped successfully")
             self.started = False
 
-    async def transcribe(self, audio: bytes) -> tuple[str, bool]:
-        if not self.started:
-            return None
-        
+    async def pause(self):
+        # Flush pending audio so the last words still get transcribed
+        if self.started and self.buffer:
+            await self.conn.send(self.buffer)
+        self.buffer = bytearray()
+        self.paused = True
+
+    async def resume(self):
+        self.paused = False
+
+    def clear_results(self):
+        while not self.recv_queue.empty():
+            self.recv_queue.get_nowait()
+
+    async def keepalive(self):
+        if self.started:
+            await self.conn.keep_alive()
+
+    async def send(self, audio):
+        if not self.started or self.paused:
+            return
+
         self.buffer += audio.tobytes()
         if len(self.buffer) >= self.min_send_size:
             await self.conn.send(self.buffer)
             self.buffer = bytearray()
 
-        try:
-            result, is_final = self.recv_queue.get_nowait()
-            return result, is_final
-        except asyncio.QueueEmpty:
-            return None
+    async def results(self):
+        while True:
+            yield await self.recv_queue.get()
 
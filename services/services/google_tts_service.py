@@ -1,9 +1,11 @@
 import io
 from gtts import gTTS
-from pydub import AudioSegment
 import asyncio
-import numpy as np
 from vpipe.capsules.services.tts import TTSServiceInterface
+from vpipe.core.config import AudioFormat
+from vpipe.utils import audio_codec
+
+OUTPUT_FORMAT = AudioFormat(rate=16000, channels=1)
 
 class GoogleTTSService(TTSServiceInterface):
     def __init__(self, settings={}):
@@ -26,7 +28,5 @@ class GoogleTTSService(TTSServiceInterface):
             return buf
 
         buf = await loop.run_in_executor(None, synth)
-        audio = AudioSegment.from_file(buf, format="mp3")
-        audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-        out = np.frombuffer(audio.raw_data, dtype=np.int16)
-        return out
+        out = await audio_codec.decode_to_async(buf.getvalue(), OUTPUT_FORMAT, format="mp3")
+        return out.reshape(-1)
@@ -1,5 +1,5 @@
 from vpipe.capsules.services.asr import ASRServiceInterface
-from typing import Any, Optional, Tuple
+from typing import AsyncIterator, Tuple
 import numpy as np
 import json
 import struct
@@ -35,6 +35,7 @@ class WhisperASRService(ASRServiceInterface):
         self._starting = False
         self._started = False
         self._stopped = True
+        self._paused = False
 
     async def switch_lang(self, lang):
         """ Support dynamic language switching """
@@ -90,18 +91,44 @@ class WhisperASRService(ASRServiceInterface):
         self._buffer.clear()
         self._started = False
 
-    async def transcribe(self, buf: np.ndarray) -> Optional[Tuple[str, bool]]:
-        if self._stopped or not self._connected_event.is_set():
-            return None
+    async def pause(self):
+        # The send loop holds back the tail until it fills a chunk; send it
+        # now, or the last words before the pause are never transcribed
+        tail, self._buffer = self._buffer, bytearray()
+        self._paused = True
+        if tail and self._ws is not None and not self._stopped:
+            try:
+                await self._ws.send(self._message(tail))
+            except (websockets.WebSocketException, OSError) as e:
+                logger.warning(f"[{self.language}] Failed to send buffered audio on pause: {e}")
+
+    async def resume(self):
+        self._paused = False
+
+    def clear_results(self):
+        while not self._recv_queue.empty():
+            self._recv_queue.get_nowait()
+
+    async def keepalive(self):
+        # A websocket ping control frame keeps the server connection open
+        if self._ws:
+            await self._ws.ping()
+
+    async def send(self, buf: np.ndarray):
+        if self._stopped or self._paused or not self._connected_event.is_set():
+            return
 
         audio_bytes = buf.astype(np.int16).tobytes()
         self._buffer.extend(audio_bytes)
 
-        try:
-            text, speaker, wav_bytes = self._recv_queue.get_nowait()
-            return text, True
-        except asyncio.QueueEmpty:
-            return None
+    async def results(self) -> AsyncIterator[Tuple[str, bool]]:
+        while True:
+            text, speaker, wav_bytes = await self._recv_queue.get()
+            yield text, True
+
+    def _message(self, chunk):
+        header = json.dumps({"language": self.language}).encode("utf-8")
+        return struct.pack("<I", len(header)) + header + bytes(chunk)
 
     async def _send_loop(self):
         try:
@@ -113,11 +140,7 @@ class WhisperASRService(ASRServiceInterface):
                 chunk = self._buffer[:self.min_send_size]
                 self._buffer = self._buffer[self.min_send_size:]
 
-                header = json.dumps({"language": self.language}).encode("utf-8")
-                header_len = struct.pack("<I", len(header))
-                message = header_len + header + chunk
-
-                await self._ws.send(message)
+                await self._ws.send(self._message(chunk))
 
         except asyncio.CancelledError:
             pass
@@ -1,69 +1,160 @@
 import asyncio
-import io
+import itertools
 import json
 import numpy as np
 import websockets
-import soundfile as sf
+from websockets.protocol import State
 from vpipe.capsules.services.tts import TTSServiceInterface
-from pydub import AudioSegment
+from vpipe.core.config import AudioFormat
+from vpipe.utils import audio_codec
 import logging
 
 SERVER_URL = "ws://localhost:8765"
+OUTPUT_FORMAT = AudioFormat(rate=16000, channels=1)
+POOL_SIZE = 2
+REQUEST_TIMEOUT_S = 30.0
 
 logger = logging.getLogger(__name__)
 
 
+class XttsConnection:
+    """
+    One websocket to the XTTS server. The server answers requests on a
+    connection in order, so a connection serves one request at a time and
+    the next message is always its response; the binary WAV reply has no
+    room for a request id. A request that fails or is cancelled mid-flight leaves its response
+    outstanding; the socket is dropped and reopened on the next request.
+    """
+    def __init__(self, url):
+        self.url = url
+        self.websocket = None
+        self.busy = 0
+        self._lock = asyncio.Lock()
+
+    async def connect(self):
+        self.websocket = await websockets.connect(self.url, ping_timeout=None, max_size=None)
+
+    async def close(self):
+        websocket, self.websocket = self.websocket, None
+        if websocket:
+            await websocket.close()
+
+    async def request(self, payload, timeout):
+        async with self._lock:
+            if self.websocket is None or self.websocket.state is not State.OPEN:
+                await self.close()
+                await self.connect()
+            try:
+                await self.websocket.send(json.dumps(payload))
+                return await asyncio.wait_for(self.websocket.recv(), timeout)
+            except BaseException:
+                await asyncio.shield(self.close())
+                raise
+
+
+class XttsConnectionPool:
+    """
+    N connections to one XTTS server with least-busy dispatch. A request
+    that fails on a broken connection is retried once on a reconnected one.
+    """
+    def __init__(self, url, size=POOL_SIZE, timeout=REQUEST_TIMEOUT_S):
+        self.url = url
+        self.size = size
+        self.timeout = timeout
+        self.connections = [XttsConnection(url) for _ in range(size)]
+        self._ids = itertools.count(1)
+
+    async def start(self):
+        results = await asyncio.gather(*(c.connect() for c in self.connections), return_exceptions=True)
+        errors = [r for r in results if isinstance(r, Exception)]
+        if len(errors) == len(results):
+            raise RuntimeError(f"Connection to XTTS server failed: {errors[0]}")
+        logger.info(f"XTTS pool connected {len(results) - len(errors)}/{self.size} to {self.url}")
+
+    async def close(self):
+        await asyncio.gather(*(c.close() for c in self.connections), return_exceptions=True)
+
+    def _pick(self):
+        return min(self.connections, key=lambda c: (c.busy, c.websocket is None))
+
+    async def request(self, payload):
+        request_id = next(self._ids)
+        for attempt in range(2):
+            connection = self._pick()
+            connection.busy += 1
+            try:
+                logger.debug(f"XTTS request {request_id} on connection {self.connections.index(connection)}")
+                return await connection.request(payload, self.timeout)
+            except (websockets.WebSocketException, OSError) as e:
+                if attempt:
+                    raise
+                logger.warning(f"XTTS request {request_id} failed ({e}), retrying on a new connection")
+            finally:
+                connection.busy -= 1
+
+
+_shared_pools = {}  # (loop, url, size) -> [pool, refcount]
+
+
+async def acquire_pool(url, size):
+    """Pool shared by every XTTS service on the running loop with the same url and size."""
+    key = (asyncio.get_running_loop(), url, size)
+    if key not in _shared_pools:
+        pool = XttsConnectionPool(url, size)
+        _shared_pools[key] = [pool, 0]
+        try:
+            await pool.start()
+        except BaseException:
+            del _shared_pools[key]
+            raise
+    _shared_pools[key][1] += 1
+    return _shared_pools[key][0]
+
+
+async def release_pool(pool):
+    for key, entry in list(_shared_pools.items()):
+        if entry[0] is pool:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del _shared_pools[key]
+                await pool.close()
+            return
+
+
 class XttsTTSService(TTSServiceInterface):
     def __init__(self, settings={}):
         logger.debug(f"Initializing Xtts TTS service with settings: {settings}")
         self.server_url = settings.get("url", SERVER_URL)
-        self.websocket = None
+        self.pool_size = max(1, int(settings.get("pool_size") or POOL_SIZE))
+        self.pool = None
         self.default_speakers = {
-            'vi': "ref/vi_male.wav", 
-            'en': 'ref/en.wav', 
+            'vi': "ref/vi_male.wav",
+            'en': 'ref/en.wav',
             'ja': 'ref/ja.wav'
         }
 
     async def start(self):
-        # Open connection once (optional: keep alive across calls)
-        self.websocket = await websockets.connect(self.server_url, ping_timeout=None)
-        print("XTTS websocket openned")
+        if self.pool is None:
+            self.pool = await acquire_pool(self.server_url, self.pool_size)
 
     async def stop(self):
-        if self.websocket:
-            await self.websocket.close()
+        if self.pool:
+            pool, self.pool = self.pool, None
+            await release_pool(pool)
 
     async def synthesize(self, text: str, lang: str):
-        print("synthesize")
-
         payload = {
             "lang": lang,
             "text": text,
             "speaker_wav": self.default_speakers[lang]
         }
 
-        print(f"[DEBUG] Sending payload: {payload}")
-        await self.websocket.send(json.dumps(payload))
-        response = await self.websocket.recv()
+        logger.debug(f"Sending payload: {payload}")
+        response = await self.pool.request(payload)
         if isinstance(response, bytes):
-            # audio_np, sr = sf.read(io.BytesIO(response), dtype='int16') 
-
-            def play():
-                audio_np_test, samplerate = sf.read(io.BytesIO(response))
-                import sounddevice as sd
-                print(f"[CLIENT] Playing audio... (Sample rate: {samplerate}, Shape: {audio_np_test.shape})")
-                print(f'samplerate {samplerate}')
-                sd.play(audio_np_test, samplerate=samplerate)
-                sd.wait()
-
-            # await asyncio.to_thread(play)
-            # await asyncio.sleep(7)
-
-            audio = AudioSegment.from_file(io.BytesIO(response), format="wav")
-            audio = audio.set_channels(1).set_frame_rate(16000).set_sample_width(2)
-            out = np.frombuffer(audio.raw_data, dtype=np.int16)
-            return out
+            out = await audio_codec.decode_to_async(response, OUTPUT_FORMAT, format="wav")
+            return out.reshape(-1)
 
         else:
-            print("[ERROR] Invalid response:", response)
+            logger.error(f"Invalid response: {response}")
             return np.zeros(16000, dtype=np.int16)  # 1s of silence fallback
@@ -0,0 +1,121 @@
+import asyncio
+import unittest
+import numpy as np
+from unittest.mock import AsyncMock
+from vpipe.capsules.services.asr import ASRServiceInterface, ASRTransform
+from vpipe.capsules.services.provider import ServiceProvider
+
+
+class FakeASRService(ASRServiceInterface):
+    def __init__(self, lang='en', settings={}):
+        self.lang = lang
+        self.sent = []
+        self.queue = asyncio.Queue()
+        self.started = False
+
+    async def start(self):
+        self.started = True
+
+    async def stop(self):
+        self.started = False
+
+    async def send(self, buf):
+        self.sent.append(buf)
+
+    async def results(self):
+        while True:
+            yield await self.queue.get()
+
+
+class PausableASRService(FakeASRService):
+    def __init__(self, lang='en', settings={}):
+        super().__init__(lang, settings)
+        self.paused = False
+        self.keepalives = 0
+
+    async def pause(self):
+        self.paused = True
+
+    async def resume(self):
+        self.paused = False
+
+    async def keepalive(self):
+        self.keepalives += 1
+
+
+class TestASRTransform(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.services = []
+
+        def factory(lang='en'):
+            service = FakeASRService(lang=lang)
+            self.services.append(service)
+            return service
+
+        self.asr = ASRTransform("asr", service_factory=factory)
+        self.asr.out.push = AsyncMock()
+        await self.asr.start()
+
+    async def asyncTearDown(self):
+        await self.asr.stop()
+
+    async def test_transform_is_fire_and_forget(self):
+        buf = np.ones((2048, 1), dtype=np.int16)
+        result = await self.asr.transform(buf)
+        self.assertIsNone(result)
+        self.assertIs(self.services[0].sent[0], buf)
+
+    async def test_results_pushed_without_audio(self):
+        service = self.services[0]
+        for item in [("hello", False), ("hello wor", False), ("hello world", True)]:
+            service.queue.put_nowait(item)
+        await asyncio.sleep(0.01)
+        pushed = [c.args[0] for c in self.asr.out.push.await_args_list]
+        self.assertEqual(pushed, [("hello", False), ("hello wor", False), ("hello world", True)])
+
+    async def test_disabled_sends_silence(self):
+        await self.asr.set_prop("enable", False)
+        buf = np.ones((16, 1), dtype=np.int16)
+        await self.asr.transform(buf)
+        self.assertFalse(self.services[0].sent[-1].any())
+
+    async def test_disabled_pauses_and_keeps_alive(self):
+        service = PausableASRService()
+        asr = ASRTransform("asr", service_factory=lambda lang='en': service)
+        asr.KEEPALIVE_INTERVAL_S = 0
+        await asr.start()
+        await asr.set_prop("enable", False)
+        self.assertTrue(service.paused)
+        await asr.transform(np.ones((16, 1), dtype=np.int16))
+        self.assertEqual(service.sent, [])
+        self.assertEqual(service.keepalives, 1)
+        await asr.set_prop("enable", True)
+        self.assertFalse(service.paused)
+        await asr.stop()
+
+    async def test_stop_cancels_result_task(self):
+        await self.asr.stop()
+        self.assertIsNone(self.asr._results_task)
+        self.assertFalse(self.services[0].started)
+
+    async def test_lang_switch_in_place_is_reported_to_provider(self):
+        class SwitchingService(FakeASRService):
+            async def switch_lang(self, lang):
+                self.lang = lang
+
+        class Provider(ServiceProvider):
+            switched = []
+
+            def lang_switched(self, service, lang):
+                self.switched.append(lang)
+
+        asr = ASRTransform("asr", service_provider=Provider(SwitchingService))
+        await asr.start()
+        await asr.set_prop("lang", "ja")
+        self.assertEqual(Provider.switched, ["ja"])
+        self.assertEqual(asr.service.lang, "ja")
+        await asr.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import io
+import threading
+import unittest
+import wave
+import numpy as np
+from vpipe.core.config import AudioFormat
+from vpipe.utils import audio_codec
+
+
+def make_wav(samples, rate, channels=1):
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(rate)
+        wf.writeframes(samples.astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def tone(rate, seconds=0.5, freq=440):
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * freq * t) * 32767).astype(np.int16)
+
+
+class TestAudioCodec(unittest.TestCase):
+    def test_decode_wav(self):
+        samples = tone(16000)
+        decoded, rate = audio_codec.decode(make_wav(samples, 16000))
+        self.assertEqual(rate, 16000)
+        self.assertEqual(decoded.shape, (len(samples), 1))
+        np.testing.assert_allclose(decoded[:, 0] * 32768, samples, atol=1)
+
+    def test_decode_to_converts_rate_channels_dtype(self):
+        stereo = np.repeat(tone(24000)[:, None], 2, axis=1)
+        out = audio_codec.decode_to(make_wav(stereo, 24000, channels=2), AudioFormat(rate=16000, channels=1))
+        self.assertEqual(out.dtype, np.int16)
+        self.assertEqual(out.shape, (8000, 1))
+        self.assertGreater(np.abs(out).max(), 10000)
+
+    @unittest.skipUnless("MP3" in __import__("soundfile").available_formats(), "libsndfile without mp3")
+    def test_decode_mp3(self):
+        import soundfile as sf
+        buf = io.BytesIO()
+        sf.write(buf, tone(16000, seconds=1.0), 16000, format="MP3")
+        out = audio_codec.decode_to(buf.getvalue(), AudioFormat(rate=16000, channels=1), format="mp3")
+        self.assertAlmostEqual(len(out) / 16000, 1.0, delta=0.1)
+
+
+class TestAudioCodecAsync(unittest.IsolatedAsyncioTestCase):
+    async def test_decode_on_worker(self):
+        out = await audio_codec.decode_to_async(make_wav(tone(16000), 16000), AudioFormat())
+        self.assertEqual(out.shape, (8000, 1))
+
+    async def test_player_stretches_on_worker(self):
+        from vpipe.capsules.audio.audio_queue_player import VpAudioQueuePlayer
+        player = VpAudioQueuePlayer("player", speed=2.0)
+        threads = []
+        stretch = player.stretch_audio
+        player.stretch_audio = lambda *args: threads.append(threading.current_thread().name) or stretch(*args)
+        await player._handle_input("in", tone(16000)[:, None])
+        self.assertEqual(player.audio_queue.get_nowait().shape, (4000, 1))
+        self.assertTrue(threads[0].startswith("audio-decoder"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import threading
+import time
+import unittest
+from PySide6.QtCore import QCoreApplication
+from vpipe.utils.audio_devices import DeviceRegistry
+from app.models.audio_device_manager import AudioDeviceManager
+
+
+def device(name, inputs=0, outputs=0):
+    return {"name": name, "max_input_channels": inputs, "max_output_channels": outputs}
+
+
+class FakePortAudio:
+    def __init__(self):
+        self.devices = [device("Mic", inputs=1), device("Speakers", outputs=2), device("Headset", 1, 2)]
+        self.queries = 0
+        self.reinits = 0
+
+    def query(self):
+        self.queries += 1
+        return list(self.devices)
+
+    def reinit(self):
+        self.reinits += 1
+
+
+def make_registry(fake):
+    return DeviceRegistry(query=fake.query, reinit=fake.reinit,
+                          input_filter=lambda name, dev: dev["max_input_channels"] > 0,
+                          output_filter=lambda name, dev: dev["max_output_channels"] > 0)
+
+
+class TestDeviceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakePortAudio()
+        self.registry = make_registry(self.fake)
+
+    def test_queries_once_and_indexes_by_direction(self):
+        self.assertEqual(self.registry.inputs(), [(0, "Mic"), (2, "Headset")])
+        self.assertEqual(self.registry.outputs(), [(1, "Speakers"), (2, "Headset")])
+        self.assertEqual(self.registry.find("Headset", is_input=False), 2)
+        self.assertEqual(self.registry.find("Speakers"), 1)
+        self.assertEqual(self.fake.queries, 1)
+        with self.assertRaises(ValueError):
+            self.registry.find("Speakers", is_input=True)
+
+    def test_miss_refreshes_for_hotplugged_device(self):
+        self.registry.inputs()
+        self.fake.devices.append(device("USB Mic", inputs=1))
+        self.assertEqual(self.registry.find("USB Mic", is_input=True), 3)
+        self.assertEqual(self.fake.reinits, 1)
+
+    def test_no_reinit_while_streams_are_open(self):
+        self.registry.inputs()
+        self.registry.stream_opened()
+        self.fake.devices.append(device("USB Mic", inputs=1))
+        self.assertFalse(self.registry.refresh())
+        self.assertEqual(self.fake.reinits, 0)
+
+        self.registry.stream_closed()
+        changes = []
+        self.registry.subscribe(changes.append)
+        self.assertTrue(self.registry.refresh())
+        self.assertEqual(changes, [self.registry])
+        self.assertFalse(self.registry.refresh())
+        self.assertEqual(len(changes), 1)
+
+    def test_watcher_notices_changes(self):
+        self.registry.inputs()
+        changed = threading.Event()
+        self.registry.subscribe(lambda registry: changed.set())
+        self.registry.start_watcher(interval=0.01, detect=lambda: len(self.fake.devices))
+        try:
+            time.sleep(0.05)
+            self.assertEqual(self.fake.reinits, 0)  # no change, no re-initialization
+            self.fake.devices.pop()
+            self.assertTrue(changed.wait(2.0))
+        finally:
+            self.registry.stop_watcher()
+        self.assertEqual(self.registry.outputs(), [(1, "Speakers")])
+        self.assertEqual(self.fake.reinits, 1)
+
+    def test_open_stream_blocks_reinit_while_building(self):
+        self.registry.inputs()
+
+        def build():
+            self.assertIsNone(self.registry.refresh())
+            return "stream"
+        self.assertEqual(self.registry.open_stream(build), "stream")
+        self.assertEqual(self.fake.reinits, 0)
+
+        def fail():
+            raise OSError("device busy")
+        self.registry.stream_closed()
+        with self.assertRaises(OSError):
+            self.registry.open_stream(fail)
+        self.assertFalse(self.registry.refresh())
+        self.assertEqual(self.fake.reinits, 1)  # the failed open gave its count back
+
+
+class TestAudioDeviceManager(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def test_updates_from_registry_thread(self):
+        fake = FakePortAudio()
+        registry = make_registry(fake)
+        manager = AudioDeviceManager(registry=registry, watch_interval=0)
+        self.assertEqual([d["name"] for d in manager.inputDevices], ["Mic", "Headset"])
+
+        fake.devices.append(device("USB Mic", inputs=1))
+        thread = threading.Thread(target=registry.refresh)
+        thread.start()
+        thread.join()
+        self.app.processEvents()
+        self.assertEqual([d["name"] for d in manager.inputDevices], ["Mic", "Headset", "USB Mic"])
+
+
+if __name__ == "__main__":
+    unittest.main()
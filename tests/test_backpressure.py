@@ -0,0 +1,113 @@
+import asyncio
+import math
+import unittest
+from vpipe.core.basesrc import VpBaseSource
+from vpipe.core.bus import VpBus
+from vpipe.core.capsule import VpState
+from vpipe.core.fork import VpFork
+from vpipe.core.queue import VpQueue, DrainPolicy
+from vpipe.core.transform import VpBaseTransform
+
+
+class PassThrough(VpBaseTransform):
+    async def transform(self, data):
+        return data
+
+
+class CountingSource(VpBaseSource):
+    def __init__(self, realtime):
+        super().__init__("src", realtime=realtime)
+        self.count = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def read(self):
+        self.count += 1
+        return self.count
+
+
+class TestCredits(unittest.IsolatedAsyncioTestCase):
+    async def test_credits_follow_the_tightest_queue(self):
+        transform, fork = PassThrough(), VpFork()
+        wide = VpQueue(maxsize=5)
+        narrow = VpQueue(maxsize=2, leaky=DrainPolicy.DOWNSTREAM)
+        transform >> fork
+        fork.fork() >> wide
+        fork.fork() >> narrow
+        self.assertEqual(transform.inp.credits(), 2)
+        await transform.inp.push("a")
+        await transform.inp.push("b")
+        self.assertEqual(transform.inp.credits(), 0)
+        self.assertEqual(VpFork().get_input("in").credits(), math.inf)
+
+    async def test_limiting_ports_are_cached_per_graph_version(self):
+        transform, narrow, wider = PassThrough(), VpQueue(maxsize=1), VpQueue(maxsize=3)
+        transform >> narrow
+        self.assertEqual(transform.inp.credits(), 1)
+        self.assertEqual(transform.inp._credit_ports, (narrow.get_input("in"),))
+
+        walks = []
+        find = transform.out._find_credit_ports
+        transform.out._find_credit_ports = lambda *args: walks.append(1) or find(*args)
+        for _ in range(3):
+            transform.inp.credits()
+        self.assertEqual(walks, [])
+
+        transform.out.relink(narrow.get_input("in"), wider.get_input("in"))
+        self.assertEqual(transform.inp.credits(), 3)
+        self.assertEqual(walks, [1])
+
+    async def test_wait_credits_wakes_when_queue_drains(self):
+        queue = VpQueue(maxsize=1)
+        await queue.get_input("in").push("a")
+        waiter = asyncio.create_task(queue.get_input("in").wait_credits())
+        await asyncio.sleep(0.01)
+        self.assertFalse(waiter.done())
+        await queue.flush()
+        self.assertEqual(await asyncio.wait_for(waiter, 1.0), 1)
+        await queue.get_input("in").push("b")
+        self.assertEqual(await queue.get_input("in").wait_credits(timeout=0.01), 0)
+
+
+class TestSourceFlowControl(unittest.IsolatedAsyncioTestCase):
+    async def test_non_realtime_source_waits_without_drops(self):
+        src = CountingSource(realtime=False)
+        queue = VpQueue(maxsize=3, leaky=DrainPolicy.DOWNSTREAM)
+        src >> queue
+        src.state = VpState.RUNNING
+        for _ in range(3):
+            await src._src_loop()
+        reader = asyncio.create_task(src._src_loop())
+        await asyncio.sleep(0.02)
+        self.assertEqual(src.count, 3)  # no credits, no read
+
+        self.assertEqual(queue._queue.get_nowait(), 1)
+        queue.get_input("in").credits_changed()
+        await asyncio.wait_for(reader, 1.0)
+        self.assertEqual(list(queue._queue._queue), [2, 3, 4])
+
+    async def test_realtime_source_counts_overflows(self):
+        src = CountingSource(realtime=True)
+        queue = VpQueue(maxsize=1, leaky=DrainPolicy.DOWNSTREAM)
+        src >> queue
+        messages = []
+        src.bus = VpBus()
+
+        async def watch(message):
+            messages.append(message)
+        src.bus.add_watch(watch)
+        src.state = VpState.RUNNING
+        for _ in range(4):
+            await src._src_loop()
+        await asyncio.sleep(0)
+        self.assertEqual(src.overflows, 3)
+        overflow = [m.payload for m in messages if m.msg_type == "overflow"]
+        self.assertEqual(overflow, [{"overflows": 1}])  # one message per run of overflows
+
+
+if __name__ == "__main__":
+    unittest.main()
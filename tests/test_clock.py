@@ -0,0 +1,131 @@
+import unittest
+import numpy as np
+from vpipe.core.audiosink import VpAudioSink
+from vpipe.capsules.audio.virtual_speaker_src import VpVirtualSpeakerSrc
+from vpipe.core.clock import VpClock, DriftCompensator
+from vpipe.core.pipeline import VpPipeline
+from vpipe.core.capsule import VpState
+
+
+class FakeClock(VpClock):
+    def __init__(self):
+        super().__init__("fake")
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+
+class TestClockSlave(unittest.TestCase):
+    def test_estimates_drift(self):
+        clock = FakeClock()
+        slave = clock.slave("dev", 16000)
+        for i in range(200):
+            clock.now = i * 0.1
+            # +100 ppm device with +-1 frame of read jitter
+            slave.observe(16000 * 1.0001 * clock.now + (i % 3 - 1))
+            if clock.now < slave.min_span:
+                self.assertEqual(slave.ratio, 1.0)
+        self.assertAlmostEqual(slave.drift_ppm, 100, delta=5)
+        self.assertIs(clock.slave("dev", 16000), slave)
+
+    def test_clamps_and_reports(self):
+        clock = FakeClock()
+        slave = clock.slave("dev", 16000)
+        for i in range(100):
+            clock.now = i * 0.1
+            slave.observe(17000 * clock.now)
+        self.assertAlmostEqual(slave.drift_ppm, slave.max_ppm)
+        self.assertIsNone(slave.poll_report())
+        clock.now += slave.report_interval + 0.1
+        self.assertEqual(slave.poll_report()["drift_ppm"], 1000.0)
+
+
+class TestDriftCompensator(unittest.TestCase):
+    def test_unity_ratio_is_a_one_frame_delay(self):
+        comp = DriftCompensator(1, np.int16)
+        ramp = np.arange(1000, dtype=np.int16).reshape(-1, 1)
+        out = np.concatenate([comp.process(block, 1.0) for block in np.split(ramp, 10)])
+        self.assertEqual(out.dtype, np.int16)
+        np.testing.assert_array_equal(out[1:], ramp[:-1])
+
+    def test_ratio_changes_length_continuously(self):
+        comp = DriftCompensator(1, np.float32)
+        ramp = np.arange(160000, dtype=np.float32).reshape(-1, 1) / 1000
+        out = np.concatenate([comp.process(block, 1.001) for block in np.split(ramp, 500)])
+        self.assertAlmostEqual(len(out), 160000 * 1.001, delta=2)
+        steps = np.diff(out[1:, 0])
+        np.testing.assert_allclose(steps, 0.001 / 1.001, atol=1e-4)  # no jumps between blocks
+
+    def test_fixed_size_pops(self):
+        comp = DriftCompensator(2, np.int16)
+        block = np.ones((320, 2), dtype=np.int16)
+        sizes = []
+        for _ in range(50):
+            while comp.available < 320:
+                comp.push(block, 0.999)
+            sizes.append(comp.pop(320).shape)
+        self.assertEqual(set(sizes), {(320, 2)})
+
+
+class SlowVirtualSpeaker:
+    """Driver that delivers `rate` of the bytes asked for, in whole frames."""
+    def __init__(self, rate):
+        self.rate = rate
+        self.asked = self.given = 0
+
+    def read(self, size):
+        self.asked += size
+        frames = int(self.asked * self.rate) // 4 - self.given // 4
+        self.given += frames * 4
+        return bytes(frames * 4)
+
+
+class TestVirtualSpeakerClock(unittest.IsolatedAsyncioTestCase):
+    async def test_slow_device_shows_as_drift(self):
+        src = VpVirtualSpeakerSrc("vspk")
+        clock = FakeClock()
+        src.use_clock(clock)
+        self.assertIsNotNone(src.clock_slave)
+        src.device = SlowVirtualSpeaker(1 - 300e-6)
+        src.clock_slave.min_span = 1.0
+        for i in range(100):
+            clock.now = i * src.audio_config.block_duration
+            await src.read_chunk(src.audio_config.blocksize)
+            src.clock_slave.observe(src.device_frames())
+        self.assertAlmostEqual(src.clock_slave.drift_ppm, -300, delta=20)
+
+
+class DeviceSink(VpAudioSink):
+    device_clock = True
+
+    def __init__(self):
+        super().__init__("speaker")
+        self.written = []
+
+    async def write(self, buf):
+        self.written.append(len(buf))
+
+    def device_frames(self):
+        return self.frames_written
+
+
+class TestPipelineClock(unittest.IsolatedAsyncioTestCase):
+    async def test_pipeline_slaves_device_capsules(self):
+        pipeline, inner = VpPipeline("p"), VpPipeline("inner")
+        sink = DeviceSink()
+        inner.add(sink)
+        pipeline.add(inner)
+        await pipeline.set_state(VpState.PAUSED)
+        self.assertIs(sink.clock_slave, pipeline.clock.slave("p/inner/speaker", sink.audio_config.format.rate))
+        self.assertIsNotNone(sink.clock_slave)
+
+        blocksize = sink.audio_config.blocksize
+        for _ in range(3):
+            await sink.inp.push(np.zeros((blocksize, 1), dtype=np.int16))
+        self.assertEqual(sum(sink.written), 3 * blocksize)  # ratio 1 until min_span
+        await pipeline.set_state(VpState.NULL)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+from PySide6.QtCore import QCoreApplication
+from app.models.conversation_model import ConversationModel
+
+
+class TestConversationModel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.app = QCoreApplication.instance() or QCoreApplication([])
+
+    def setUp(self):
+        self.model = ConversationModel(max_rows=5)
+        self.inserts = []
+        self.changes = []
+        self.model.rowsInserted.connect(lambda parent, first, last: self.inserts.append((first, last)))
+        self.model.dataChanged.connect(lambda tl, br, roles: self.changes.append((tl.row(), list(roles))))
+
+    def texts(self):
+        return [self.model.data(self.model.index(i, 0), ConversationModel.TextRole)
+                for i in range(self.model.rowCount())]
+
+    def test_appends_are_batched(self):
+        for i in range(3):
+            self.model.append("You", f"line {i}")
+        self.assertEqual(self.model.rowCount(), 1)
+        self.model.flush()
+        self.assertEqual(self.inserts, [(1, 3)])
+        self.assertEqual(self.texts(), ["Hello!", "line 0", "line 1", "line 2"])
+
+    def test_flush_runs_on_event_loop(self):
+        self.model.append("You", "queued")
+        self.app.processEvents()
+        self.assertEqual(self.texts()[-1], "queued")
+
+    def test_update_names_changed_roles_only(self):
+        row_id = self.model.append("You", "hel")
+        self.model.flush()
+        self.model.update(row_id, "You", "hello")
+        self.model.flush()
+        self.assertEqual(self.changes, [(1, [ConversationModel.TextRole])])
+
+    def test_old_rows_spill_and_load_back(self):
+        ids = [self.model.append("You", f"line {i}") for i in range(10)]
+        self.model.flush()
+        self.assertEqual(self.model.rowCount(), 5)
+        self.assertEqual(self.texts()[0], "line 5")
+        self.assertTrue(self.model.hasOlder)
+
+        # Updating a spilled row still reaches it through its id
+        self.model.update(ids[4], "You", "line 4 (final)")
+        self.model.flush()
+
+        self.assertEqual(self.model.loadOlder(2), 2)
+        self.assertEqual(self.texts()[:3], ["line 3", "line 4 (final)", "line 5"])
+        self.assertEqual(self.model.loadOlder(100), 4)
+        self.assertEqual(self.texts()[0], "Hello!")
+        self.assertFalse(self.model.hasOlder)
+
+    def test_loaded_rows_are_not_spilled_twice(self):
+        ids = [self.model.append("You", f"line {i}") for i in range(10)]
+        self.model.flush()
+        store = self.model._store
+        records = lambda: store._file.seek(0) or len(store._file.readlines())
+        self.assertEqual(records(), 6)
+
+        self.model.loadOlder(3)
+        self.model.update(ids[3], "You", "line 3 (edited)")
+        self.model.append("You", "line 10")
+        self.model.flush()
+        self.model.setFollowing(True)
+        self.assertEqual(self.texts()[0], "line 6")
+        # line 5 spills for the first time; of the loaded rows only the edited one is rewritten
+        self.assertEqual(records(), 8)
+        self.assertEqual(store.read([ids[3]])[0]["text"], "line 3 (edited)")
+
+    def test_no_spill_while_scrolled_back(self):
+        for i in range(10):
+            self.model.append("You", f"line {i}")
+        self.model.flush()
+        notified = []
+        self.model.hasOlderChanged.connect(lambda: notified.append("hasOlder"))
+        self.model.followingChanged.connect(lambda: notified.append("following"))
+
+        self.assertEqual(self.model.loadOlder(2), 2)
+        self.assertFalse(self.model.following)
+        self.model.append("You", "line 10")
+        self.model.flush()
+        # Loaded rows stay while the user reads them, the window grows
+        self.assertEqual(self.texts()[:2], ["line 3", "line 4"])
+        self.assertEqual(self.model.rowCount(), 8)
+
+        self.model.setFollowing(True)
+        self.assertEqual(self.model.rowCount(), 5)
+        self.assertEqual(self.texts()[0], "line 6")
+        self.assertIn("hasOlder", notified)
+        self.assertEqual(notified.count("following"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import unittest
+from services.failover import FailoverPolicy, FailoverTranslatorService, FailoverASRService
+from vpipe.capsules.services.asr import ASRServiceInterface
+from vpipe.capsules.services.tran import TranslatorServiceInterface
+
+
+class FakeTranslator(TranslatorServiceInterface):
+    def __init__(self, tag, delay=0.0):
+        self.tag = tag
+        self.delay = delay
+        self.fail = False
+        self.calls = 0
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def translate(self, text, src, dest):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("down")
+        return f"{self.tag}:{text}"
+
+
+class FakeASR(ASRServiceInterface):
+    def __init__(self, tag, fail_start=False):
+        self.tag = tag
+        self.fail_start = fail_start
+        self.queue = asyncio.Queue()
+        self.sent = []
+
+    async def start(self):
+        if self.fail_start:
+            raise RuntimeError("down")
+
+    async def stop(self):
+        pass
+
+    async def send(self, buf):
+        self.sent.append(buf)
+
+    async def results(self):
+        while True:
+            item = await self.queue.get()
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class TestTranslatorFailover(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.primary = FakeTranslator("p")
+        self.secondary = FakeTranslator("s")
+        self.policy = FailoverPolicy(error_rate=0.5, min_calls=2, cooldown_s=0.05)
+        self.service = FailoverTranslatorService(self.primary, self.secondary, self.policy)
+        await self.service.start()
+
+    async def test_switches_on_errors_and_back(self):
+        self.primary.fail = True
+        self.assertEqual(await self.service.translate("a", "en", "vi"), "s:a")
+        self.assertEqual(await self.service.translate("b", "en", "vi"), "s:b")
+        self.assertTrue(self.service.breaker.is_open)
+
+        calls = self.primary.calls
+        self.assertEqual(await self.service.translate("c", "en", "vi"), "s:c")
+        self.assertEqual(self.primary.calls, calls)
+
+        self.primary.fail = False
+        await asyncio.sleep(0.06)
+        self.assertEqual(await self.service.translate("d", "en", "vi"), "p:d")
+        self.assertFalse(self.service.breaker.is_open)
+
+    async def test_switches_on_p95_latency(self):
+        self.policy.p95_ms = 10
+        self.primary.delay = 0.02
+        for _ in range(2):
+            self.assertEqual(await self.service.translate("x", "en", "vi"), "p:x")
+        self.assertTrue(self.service.breaker.is_open)
+        self.assertEqual(await self.service.translate("y", "en", "vi"), "s:y")
+
+    async def test_hedged_takes_first_answer(self):
+        self.policy.mode = "hedge"
+        self.primary.delay = 0.5
+        result = await asyncio.wait_for(self.service.translate("h", "en", "vi"), 0.2)
+        self.assertEqual(result, "s:h")
+
+
+class TestASRFailover(unittest.IsolatedAsyncioTestCase):
+    async def test_stream_moves_to_secondary_on_error(self):
+        created = []
+
+        def create(tag):
+            def factory(lang):
+                service = FakeASR(tag)
+                created.append(service)
+                return service
+            return factory
+
+        service = FailoverASRService(create("p"), create("s"), FailoverPolicy(cooldown_s=60))
+        await service.start()
+        results = service.results()
+        created[0].queue.put_nowait(("hello", True))
+        self.assertEqual(await results.__anext__(), ("hello", True))
+
+        created[0].queue.put_nowait(RuntimeError("socket closed"))
+        await asyncio.sleep(0.01)
+        self.assertFalse(service.on_primary)
+        await service.send(b"audio")
+        self.assertEqual(created[1].sent, [b"audio"])
+        created[1].queue.put_nowait(("again", True))
+        self.assertEqual(await results.__anext__(), ("again", True))
+        await results.aclose()
+        await service.stop()
+
+    async def test_slow_primary_is_switched_out(self):
+        created = []
+
+        def create(tag):
+            def factory(lang):
+                service = FakeASR(tag)
+                created.append(service)
+                return service
+            return factory
+
+        policy = FailoverPolicy(p95_ms=20, min_calls=2, cooldown_s=60)
+        service = FailoverASRService(create("p"), create("s"), policy)
+        await service.start()
+        results = service.results()
+        for i in range(2):
+            await service.send(b"audio")
+            await asyncio.sleep(0.03)   # finals arrive, but late
+            created[0].queue.put_nowait((f"slow {i}", True))
+            self.assertEqual(await results.__anext__(), (f"slow {i}", True))
+        await asyncio.sleep(0.01)
+        self.assertFalse(service.on_primary)
+        self.assertEqual(service.active.tag, "s")
+        self.assertEqual(len(service.health.outcomes), 0)   # fresh stats for the secondary
+        await results.aclose()
+        await service.stop()
+
+    async def test_primary_start_failure_uses_secondary(self):
+        service = FailoverASRService(lambda lang: FakeASR("p", fail_start=True),
+                                     lambda lang: FakeASR("s"), FailoverPolicy())
+        await service.start()
+        self.assertFalse(service.on_primary)
+        self.assertEqual(service.active.tag, "s")
+        await service.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
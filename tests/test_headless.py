@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+import wave
+import numpy as np
+import yaml
+from headless import HeadlessRun, make_source, make_sink, parse_options
+from vpipe.capsules.audio.file_source import VpFileSource
+from vpipe.capsules.audio.null_sink import VpWavSink
+from vpipe.capsules.audio.tone_source import VpToneSource, VpSilenceSource
+from vpipe.core.config import AudioConfig, AudioFormat
+
+
+class TestHeadlessCapsules(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.config = AudioConfig(format=AudioFormat(rate=16000), blocksize=1600)
+
+    async def asyncTearDown(self):
+        self.tmp.cleanup()
+
+    async def test_tone_source_emits_whole_blocks_until_duration(self):
+        tone = VpToneSource(frequency=1000, amplitude=0.5, duration=0.25, audio_config=self.config)
+        await tone.open()
+        blocks = []
+        while not tone.finished:
+            blocks.append(await tone.read_chunk(self.config.blocksize))
+        self.assertEqual(len(blocks), 3)
+        self.assertTrue(all(block.shape == (1600, 1) for block in blocks))
+        self.assertAlmostEqual(np.abs(np.concatenate(blocks)).max() / 32767, 0.5, places=2)
+        self.assertIsNone(await tone.read_chunk(self.config.blocksize))
+
+        silence = VpSilenceSource(audio_config=self.config)
+        await silence.open()
+        self.assertFalse((await silence.read_chunk(160)).any())
+        self.assertFalse(silence.finished)
+
+    async def test_file_source_pads_last_block(self):
+        path = os.path.join(self.tmp.name, "in.wav")
+        with wave.open(path, "wb") as wf:
+            wf.setnchannels(1)
+            wf.setsampwidth(2)
+            wf.setframerate(16000)
+            wf.writeframes(np.full(2000, 1000, dtype=np.int16).tobytes())
+        source = VpFileSource(path, audio_config=self.config)
+        await source.open()
+        first = await source.read_chunk(1600)
+        last = await source.read_chunk(1600)
+        self.assertEqual(last.shape, first.shape)
+        self.assertTrue(last[:400].all() and not last[400:].any())
+        self.assertTrue(source.finished)
+
+    async def test_wav_sink_writes_frames(self):
+        path = os.path.join(self.tmp.name, "out.wav")
+        sink = VpWavSink(path, audio_config=self.config)
+        await sink.open()
+        await sink.write(np.ones((1600, 1), dtype=np.int16))
+        await sink.write(np.ones((1600, 1), dtype=np.int16))
+        await sink.close()
+        with wave.open(path, "rb") as wf:
+            self.assertEqual(wf.getnframes(), 3200)
+            self.assertEqual(wf.getframerate(), 16000)
+        self.assertEqual((sink.blocks, sink.frames), (2, 3200))
+
+
+class TestHeadlessOptions(unittest.TestCase):
+    def test_specs(self):
+        tone = make_source("tone:300:0.1", duration=2)
+        self.assertEqual((tone.frequency, tone.amplitude, tone.duration), (300.0, 0.1, 2))
+        self.assertIsInstance(make_source("silence"), VpSilenceSource)
+        sink = make_sink("wav:out/run.wav", suffix="upstream")
+        self.assertEqual(str(sink.filepath).replace("\\", "/"), "out/run-upstream.wav")
+        with self.assertRaises(ValueError):
+            make_source("no-such-source")
+
+    def test_dualstream_sinks_reported_per_stream(self):
+        run = HeadlessRun(parse_options(["--pipeline", "dualstream"]))
+        run.build()
+        self.assertEqual(sorted(sink.name for sink in run.sinks), ["sink-downstream", "sink-upstream"])
+
+    def test_speculative_flag(self):
+        run = HeadlessRun(parse_options(["--pipeline", "dualstream", "--speculative"]))
+        self.assertEqual(run.initial_props(), {"upstream/tran-speculative": True,
+                                               "downstream/tran-speculative": True})
+        self.assertEqual(HeadlessRun(parse_options([])).initial_props(), {})
+
+    def test_cli_overrides_yaml(self):
+        with tempfile.NamedTemporaryFile("w", suffix=".yaml", delete=False) as f:
+            yaml.safe_dump({"pipeline": "dualstream", "stats-interval": 5, "source": "tone",
+                            "props": {"upstream/tts-speed": 1.2}}, f)
+        try:
+            opts = parse_options(["--config", f.name, "--source", "silence",
+                                  "--prop", "upstream/asr-enable=false"])
+        finally:
+            os.remove(f.name)
+        self.assertEqual(opts["pipeline"], "dualstream")
+        self.assertEqual(opts["stats_interval"], 5)
+        self.assertEqual(opts["source"], "silence")
+        self.assertEqual(opts["props"], {"upstream/tts-speed": 1.2, "upstream/asr-enable": False})
+        self.assertEqual(opts["sink"], "null")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+import numpy as np
+from vpipe.capsules.services.asr import ASRServiceInterface, ASRTransform
+from vpipe.capsules.services.provider import ServiceProvider
+from vpipe.core.capsule import VpState
+from vpipe.core.compiler import compile_graph
+from vpipe.core.pipeline import VpPipeline
+from vpipe.core.port import VpPort
+from vpipe.core.transform import VpBaseTransform
+
+
+class FakeASRService(ASRServiceInterface):
+    def __init__(self, lang='en', settings={}):
+        self.sent = []
+        self.queue = asyncio.Queue()
+        self.started = False
+
+    async def start(self):
+        self.started = True
+
+    async def stop(self):
+        self.started = False
+
+    async def send(self, buf):
+        self.sent.append(buf)
+
+    async def results(self):
+        while True:
+            yield await self.queue.get()
+
+
+class Tag(VpBaseTransform):
+    def __init__(self, name, gate=None):
+        super().__init__(name)
+        self.gate = gate
+        self.started = False
+
+    async def start(self):
+        self.started = True
+
+    async def stop(self):
+        self.started = False
+
+    async def transform(self, data):
+        if self.gate is not None:
+            await self.gate.wait()
+        return f"{self.name}:{data}"
+
+
+class TestRelink(unittest.IsolatedAsyncioTestCase):
+    async def test_relink_keeps_order(self):
+        port, a, b, c = VpPort("src"), VpPort("a"), VpPort("b"), VpPort("c")
+        seen = []
+        for target in (a, b, c):
+            target.set_chain_callback(AsyncMock(side_effect=lambda name, data: seen.append(name)))
+        port >> a
+        port >> b
+        port.relink(a, c)
+        await port.push(1)
+        self.assertEqual(seen, ["c", "b"])
+        with self.assertRaises(ValueError):
+            port.relink(a, b)
+
+
+class TestReplace(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pipeline = VpPipeline("p")
+        self.head, self.old, self.new = Tag("head"), Tag("old", gate=asyncio.Event()), Tag("new")
+        self.head >> self.old
+        self.sink = AsyncMock()
+        self.old.out.set_chain_callback(self.sink)
+        self.pipeline.adds(self.head, self.old)
+        await self.pipeline.set_state(VpState.RUNNING)
+
+    async def test_replace_while_running(self):
+        in_flight = asyncio.create_task(self.head.inp.push(1))
+        await asyncio.sleep(0)
+        retire = await self.pipeline.replace(self.old, self.new, grace=0.01)
+        self.assertIn(retire, self.pipeline._retiring)
+        self.assertTrue(self.new.started)
+        self.assertEqual(self.new.state, VpState.RUNNING)
+        self.assertIs(self.pipeline.get_capsule("new"), self.new)
+
+        await self.head.inp.push(2)
+        self.old.gate.set()
+        await in_flight  # the block inside `old` when it was swapped still comes out
+        await retire
+        self.assertEqual([c.args[1] for c in self.sink.await_args_list], ["new:head:2", "old:head:1"])
+        self.assertEqual(self.old.state, VpState.NULL)
+        self.assertFalse(self.old.started)
+        self.assertIsNone(self.old.parent)
+        await asyncio.sleep(0)
+        self.assertEqual(self.pipeline._retiring, set())
+
+    async def test_replace_on_compiled_graph(self):
+        compile_graph(self.pipeline)
+        self.old.gate.set()
+        await self.head.inp.push(1)
+        await (await self.pipeline.replace(self.old, self.new, grace=0))
+        await self.head.inp.push(2)
+        self.assertEqual([c.args[1] for c in self.sink.await_args_list], ["old:head:1", "new:head:2"])
+
+    async def test_exposed_ports_follow_the_swap(self):
+        inner = VpPipeline("inner")
+        a, b = Tag("a"), Tag("b")
+        a >> b
+        inner.adds(a, b)
+        inner.expose_input("in", a.inp)
+        inner.expose_output("out", b.out)
+        outer = VpPipeline("outer")
+        outer.add(inner)
+        outer.expose_output("out", inner.get_output("out"))
+        await outer.set_state(VpState.RUNNING)
+
+        new = Tag("c")
+        await (await inner.replace(b, new, grace=0))
+        self.assertIs(inner.get_output("out"), new.out)
+        self.assertIs(outer.get_output("out"), new.out)
+        sink = AsyncMock()
+        outer.get_output("out").set_chain_callback(sink)  # linked after the swap
+        await inner.get_input("in").push(1)
+        sink.assert_awaited_once_with("out", "c:a:1")
+        await outer.set_state(VpState.NULL)
+
+    async def test_missing_port(self):
+        with self.assertRaises(ValueError):
+            await self.pipeline.replace(self.old, VpPipeline("no-ports"))
+        self.assertIs(self.pipeline.get_capsule("old"), self.old)
+
+    async def asyncTearDown(self):
+        await self.pipeline.set_state(VpState.NULL)
+
+
+class TestServiceReload(unittest.IsolatedAsyncioTestCase):
+    async def test_asr_reload_keeps_results_of_old_service(self):
+        services = []
+
+        def factory(lang='en'):
+            services.append(FakeASRService(lang=lang))
+            return services[-1]
+
+        asr = ASRTransform("asr", service_factory=factory)
+        asr.RELOAD_GRACE_S = 0.05
+        asr.out.push = AsyncMock()
+        await asr.start()
+        old = services[0]
+        await asr.set_prop("service-reload", True)
+        new = services[1]
+        self.assertIs(asr.service, new)
+        self.assertTrue(new.started)
+
+        buf = np.ones((16, 1), dtype=np.int16)
+        await asr.transform(buf)
+        self.assertEqual((len(old.sent), len(new.sent)), (0, 1))
+        old.queue.put_nowait(("late final", True))  # still forwarded during the grace period
+        await asyncio.sleep(0.01)
+        self.assertTrue(old.started)
+        await asyncio.sleep(0.1)
+        self.assertFalse(old.started)
+        self.assertEqual([c.args[0] for c in asr.out.push.await_args_list], [("late final", True)])
+        await asr.stop()
+
+    async def test_reload_skipped_when_current(self):
+        class Provider(ServiceProvider):
+            def is_current(self, service, **kwargs):
+                return True
+
+        asr = ASRTransform("asr", service_provider=Provider(FakeASRService))
+        await asr.start()
+        service = asr.service
+        await asr.set_prop("service-reload", True)
+        self.assertIs(asr.service, service)
+        await asr.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
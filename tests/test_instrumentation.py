@@ -0,0 +1,130 @@
+import asyncio
+import unittest
+import numpy as np
+from services.instrumentation import ServiceStats, instrument
+from vpipe.capsules.services.asr import ASRServiceInterface
+from vpipe.capsules.services.tran import TranslatorServiceInterface
+
+
+class FakeASRService(ASRServiceInterface):
+    def __init__(self, lang='en', settings={}):
+        self.lang = lang
+        self.queue = asyncio.Queue()
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def send(self, buf):
+        pass
+
+    async def switch_lang(self, lang):
+        self.lang = lang
+
+    async def results(self):
+        while True:
+            yield await self.queue.get()
+
+
+class FlakyTranslator(TranslatorServiceInterface):
+    def __init__(self, settings={}):
+        self.fail = False
+
+    async def start(self):
+        await asyncio.sleep(0.01)
+
+    async def stop(self):
+        pass
+
+    async def translate(self, text, src, dest):
+        if self.fail:
+            raise asyncio.TimeoutError()
+        return text.upper()
+
+
+class TestInstrumentation(unittest.IsolatedAsyncioTestCase):
+    async def test_translator_calls_are_timed(self):
+        stats = ServiceStats("TRA/flaky")
+        service = instrument('TRA', FlakyTranslator(), stats)
+        await service.start()
+        self.assertEqual(await service.translate("hi", src="en", dest="vi"), "HI")
+        service.inner.fail = True
+        with self.assertRaises(asyncio.TimeoutError):
+            await service.translate("hi", src="en", dest="vi")
+
+        snap = stats.snapshot()
+        self.assertGreaterEqual(snap["connect_ms"], 10)
+        self.assertEqual(snap["calls"], 2)
+        self.assertEqual(snap["timeouts"], 1)
+        self.assertEqual(snap["error_rate"], 0.5)
+        self.assertEqual(snap["bytes_sent"], 2)
+        self.assertEqual(snap["bytes_received"], 2)
+        self.assertIsNotNone(snap["p95_ms"])
+
+    async def test_asr_final_delay(self):
+        stats = ServiceStats("ASR/fake")
+        service = instrument('ASR', FakeASRService(), stats)
+        await service.send(np.zeros(160, dtype=np.int16))
+        service.inner.queue.put_nowait(("hello", False))
+        service.inner.queue.put_nowait(("hello world", True))
+
+        results = service.results()
+        self.assertEqual(await results.__anext__(), ("hello", False))
+        self.assertEqual(await results.__anext__(), ("hello world", True))
+        await results.aclose()
+
+        snap = stats.snapshot()
+        self.assertEqual(snap["bytes_sent"], 320)
+        self.assertEqual(snap["bytes_received"], len("hello") + len("hello world"))
+        self.assertIn("final_delay_p50_ms", snap)
+
+    async def test_asr_final_delay_spans_the_utterance(self):
+        stats = ServiceStats("ASR/fake")
+        service = instrument('ASR', FakeASRService(), stats)
+        results = service.results()
+        for utterance in ("one", "two"):
+            for _ in range(10):   # audio keeps streaming while the service listens
+                await service.send(np.zeros(160, dtype=np.int16))
+                await asyncio.sleep(0.005)
+            service.inner.queue.put_nowait((utterance, True))
+            await results.__anext__()
+        await results.aclose()
+
+        self.assertEqual(len(stats.final_delays), 2)
+        self.assertGreaterEqual(min(stats.final_delays), 0.04)
+
+    async def test_asr_round_trips_not_sends_are_calls(self):
+        stats = ServiceStats("ASR/fake")
+        service = instrument('ASR', FakeASRService(), stats)
+        for _ in range(10):
+            await service.send(np.zeros(160, dtype=np.int16))
+        service.inner.queue.put_nowait(("hello", False))
+        service.inner.queue.put_nowait(("hello world", True))
+        results = service.results()
+        await results.__anext__()
+        await results.__anext__()
+        await results.aclose()
+        await service.switch_lang('ja')
+
+        snap = stats.snapshot()
+        self.assertEqual(snap["sends"], 10)
+        self.assertEqual(snap["bytes_sent"], 3200)
+        self.assertEqual(snap["calls"], 2)   # send -> first result, switch_lang
+        self.assertEqual(len(stats.latencies), 2)
+
+        service.inner.send = None   # not callable: the send fails
+        with self.assertRaises(TypeError):
+            await service.send(np.zeros(160, dtype=np.int16))
+        snap = stats.snapshot()
+        self.assertEqual((snap["errors"], snap["calls"], snap["error_rate"]), (1, 2, 0.0))
+
+    async def test_wrapper_delegates_attributes(self):
+        service = instrument('ASR', FakeASRService(lang='ja'), ServiceStats("ASR/fake"))
+        self.assertEqual(service.lang, 'ja')
+        self.assertIs(instrument('ASR', service, service.stats), service)
+
+
+if __name__ == "__main__":
+    unittest.main()
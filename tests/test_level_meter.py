@@ -0,0 +1,50 @@
+import unittest
+import numpy as np
+from vpipe.capsules.audio.level_meter import VpLevelMeter
+from vpipe.core.config import AudioFormat
+
+
+def block(value, frames=256):
+    return np.full((frames, 1), value, dtype=np.int16)
+
+
+class TestLevelMeter(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        # 256 frames at 16 kHz = 16 ms per block
+        self.meter = VpLevelMeter(audio_format=AudioFormat(rate=16000), interval=0.05,
+                                  release=0.1, peak_hold=0.1)
+
+    async def test_publishes_at_fixed_rate(self):
+        readings = [await self.meter.transform(block(1000)) for _ in range(64)]
+        published = [r for r in readings if r is not None]
+        # 64 blocks = 1.024 s of audio -> one reading per 50 ms
+        self.assertEqual(len(published), 16)
+
+        large = await self.meter.transform(block(1000, frames=16000))
+        self.assertIsNotNone(large)
+
+    async def test_levels_and_clips(self):
+        data = block(16384)
+        data[:3] = 32767
+        reading = None
+        while reading is None:
+            reading = await self.meter.transform(data)
+        self.assertAlmostEqual(reading["peak"], 1.0, places=3)
+        self.assertAlmostEqual(reading["rms"], 0.5, delta=0.02)
+        self.assertEqual(reading["clips"], 12)
+
+    async def test_release_and_peak_hold(self):
+        reading = None
+        while reading is None:
+            reading = await self.meter.transform(block(16384))
+        loud_rms, loud_peak = reading["rms"], reading["peak"]
+
+        quiet = [r for r in [await self.meter.transform(block(0)) for _ in range(8)] if r]
+        self.assertLess(quiet[0]["rms"], loud_rms)
+        self.assertGreater(quiet[0]["rms"], 0.0)
+        self.assertEqual(quiet[0]["peak"], loud_peak)   # held
+        self.assertLess(quiet[-1]["peak"], loud_peak)   # released after the hold
+
+
+if __name__ == "__main__":
+    unittest.main()
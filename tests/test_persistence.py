@@ -0,0 +1,68 @@
+import os
+import tempfile
+import time
+import unittest
+import yaml
+from app.utils.persistence import DebouncedYamlWriter
+
+
+class TestDebouncedYamlWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "setting.yaml")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+
+    def test_changes_are_coalesced(self):
+        writer = DebouncedYamlWriter(self.path, delay=0.05)
+        data = {"volume": 0.0}
+        for i in range(50):
+            data["volume"] = i / 50
+            writer.schedule(data)
+        self.assertFalse(os.path.exists(self.path))
+        time.sleep(0.2)
+        self.assertEqual(writer.writes, 1)
+        self.assertEqual(self.read(), {"volume": 0.98})
+
+    def test_write_waits_for_the_last_change(self):
+        writer = DebouncedYamlWriter(self.path, delay=0.1, max_wait=None)
+        for i in range(6):
+            writer.schedule({"speed": i})
+            time.sleep(0.04)
+        self.assertEqual(writer.writes, 0)   # 0.2 s of edits, never 0.1 s apart
+        time.sleep(0.2)
+        self.assertEqual(writer.writes, 1)
+        self.assertEqual(self.read(), {"speed": 5})
+
+    def test_max_wait_bounds_staleness(self):
+        writer = DebouncedYamlWriter(self.path, delay=0.1, max_wait=0.15)
+        for i in range(8):
+            writer.schedule({"speed": i})
+            time.sleep(0.04)
+        self.assertGreaterEqual(writer.writes, 1)
+        writer.flush()
+
+    def test_snapshot_taken_at_schedule(self):
+        writer = DebouncedYamlWriter(self.path, delay=10)
+        data = {"lang": "en"}
+        writer.schedule(data)
+        data["lang"] = "vi"
+        writer.flush()
+        self.assertEqual(self.read(), {"lang": "en"})
+
+    def test_flush_writes_atomically(self):
+        writer = DebouncedYamlWriter(self.path, delay=10)
+        writer.schedule({"a": 1})
+        writer.flush()
+        writer.flush()
+        self.assertEqual(writer.writes, 1)
+        self.assertEqual(os.listdir(self.tmp.name), ["setting.yaml"])
+
+
+if __name__ == "__main__":
+    unittest.main()
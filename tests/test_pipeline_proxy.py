@@ -0,0 +1,96 @@
+import asyncio
+import os
+import threading
+import unittest
+from functools import partial
+from vpipe.core.bus import VpBusMessage
+from vpipe.core.capsule import VpState
+from vpipe.core.pipeline import VpPipeline
+from app.controller.pipeline_proxy import ThreadPipelineProxy, ProcessPipelineProxy
+
+
+class EchoPipeline(VpPipeline):
+    def __init__(self, name="echo", echo_callback=None):
+        super().__init__(name)
+        self.echo_callback = echo_callback
+
+    async def set_prop(self, prop, value):
+        match prop:
+            case "echo":
+                self.echo_callback(value, threading.get_ident(), os.getpid())
+                self.post_message(VpBusMessage("echo", value, self))
+            case _:
+                await super().set_prop(prop, value)
+
+
+class ProxyTests:
+    def make_proxy(self, callbacks):
+        raise NotImplementedError
+
+    async def asyncSetUp(self):
+        self.echoes = []
+        self.messages = []
+        self.proxy = self.make_proxy({"echo_callback": lambda *args: self.echoes.append(args)})
+        self.outer = VpPipeline("outer")
+        self.outer.add(self.proxy)
+
+        async def watch(message):
+            self.messages.append(message)
+        self.outer.bus.add_watch(watch)
+
+    async def asyncTearDown(self):
+        await self.proxy.close()
+
+    async def wait_for(self, condition, timeout=5.0):
+        deadline = asyncio.get_running_loop().time() + timeout
+        while not condition():
+            self.assertLess(asyncio.get_running_loop().time(), deadline)
+            await asyncio.sleep(0.01)
+
+    async def test_forwards_props_callbacks_and_messages(self):
+        await self.outer.set_prop("echo/echo", "hello")
+        await self.wait_for(lambda: self.echoes and any(m.msg_type == "echo" for m in self.messages))
+        value, thread_id, pid = self.echoes[0]
+        self.assertEqual(value, "hello")
+        self.assertNotEqual(thread_id, threading.get_ident())
+
+        timings = await self.proxy.set_props({"echo": "batched"})
+        self.assertEqual(set(timings), {"echo"})
+
+    async def test_state_changes_reach_the_pipeline(self):
+        self.assertTrue(await self.outer.set_state(VpState.RUNNING))
+        self.assertEqual(self.proxy.state, VpState.RUNNING)
+        await self.wait_for(lambda: any(m.msg_type == "state_changed"
+                                        and m.payload["new_state"] == "RUNNING"
+                                        and m.source != self.proxy and m.source != self.outer
+                                        for m in self.messages))
+        self.assertTrue(await self.outer.set_state(VpState.NULL))
+
+    async def test_errors_are_raised_in_the_caller(self):
+        with self.assertRaises(ValueError):
+            await self.proxy.set_prop("bogus", 1)
+
+
+class TestThreadPipelineProxy(ProxyTests, unittest.IsolatedAsyncioTestCase):
+    def make_proxy(self, callbacks):
+        return ThreadPipelineProxy("echo", partial(EchoPipeline, name="echo"), callbacks)
+
+    async def test_close_stops_the_pipeline(self):
+        self.assertTrue(await self.outer.set_state(VpState.RUNNING))
+        await self.proxy.close()
+        self.assertEqual(self.proxy.pipeline.state, VpState.NULL)
+
+
+class TestProcessPipelineProxy(ProxyTests, unittest.IsolatedAsyncioTestCase):
+    def make_proxy(self, callbacks):
+        return ProcessPipelineProxy("echo", partial(EchoPipeline, name="echo"), callbacks)
+
+    async def test_runs_in_worker_process(self):
+        await self.proxy.set_prop("echo", "hello")
+        await self.wait_for(lambda: self.echoes)
+        self.assertNotEqual(self.echoes[0][2], os.getpid())
+        self.assertEqual(await self.proxy.call(os.getpid), self.echoes[0][2])
+
+
+if __name__ == "__main__":
+    unittest.main()
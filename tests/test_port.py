@@ -2,6 +2,10 @@ import unittest
 import asyncio
 from unittest.mock import AsyncMock, MagicMock
 from vpipe.core.port import VpPort
+from vpipe.core.capsule import VpState
+from vpipe.core.compiler import compile_graph
+from vpipe.core.pipeline import VpPipeline
+from vpipe.core.transform import VpBaseTransform
 
 class TestPort(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
@@ -58,5 +62,56 @@ class TestPort(unittest.IsolatedAsyncioTestCase):
         self.port.stop_task()
         self.assertIsNone(self.port._task)
 
+class AddOne(VpBaseTransform):
+    async def transform(self, data):
+        return data + 1
+
+
+class Collector(VpBaseTransform):
+    def __init__(self, name=None):
+        super().__init__(name)
+        self.items = []
+
+    async def transform(self, data):
+        self.items.append(data)
+
+
+class TestCompiledPush(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.pipeline = VpPipeline("p")
+        self.a, self.b, self.sink = AddOne("a"), AddOne("b"), Collector("sink")
+        self.a >> self.b >> self.sink
+        self.pipeline.adds(self.a, self.b, self.sink)
+
+    async def test_compiled_on_paused_and_matches_hop_by_hop(self):
+        await self.a.inp.push(1)
+        self.assertIsNone(self.a.inp._plan)
+        await self.pipeline.set_state(VpState.PAUSED)
+        self.assertIsNotNone(self.a.inp._plan)
+        await self.a.inp.push(1)
+        self.assertEqual(self.sink.items, [3, 3])
+
+    async def test_graph_edits_recompile(self):
+        compile_graph(self.pipeline)
+        other = Collector("other")
+        self.b.out.link(other.inp)
+        listener = MagicMock()
+        self.a.out.connect_signal("data_pushed", listener)
+        await self.a.inp.push(1)
+        self.assertEqual((self.sink.items, other.items), ([3], [3]))
+        listener.assert_called_once_with(data=2)
+
+        self.b.out.unlink(self.sink.inp)
+        await self.a.inp.push(1)
+        self.assertEqual((self.sink.items, other.items), ([3], [3, 3]))
+
+    async def test_patched_push_is_not_inlined(self):
+        self.b.inp.push = AsyncMock()
+        compile_graph(self.pipeline)
+        await self.a.inp.push(1)
+        self.b.inp.push.assert_awaited_once_with(2)
+        self.assertEqual(self.sink.items, [])
+
+
 if __name__ == "__main__":
     unittest.main()
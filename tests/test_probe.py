@@ -0,0 +1,95 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from vpipe.core.compiler import compile_graph
+from vpipe.core.pipeline import VpPipeline
+from vpipe.core.port import VpPort
+from vpipe.core.probe import VpProbeReturn, VpProbeType
+from vpipe.core.queue import VpQueue, DrainPolicy
+from vpipe.core.transform import VpBaseTransform
+
+
+class Double(VpBaseTransform):
+    async def transform(self, data):
+        return data * 2
+
+
+class TestProbe(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.port = VpPort("p")
+        self.received = AsyncMock()
+        self.port.set_chain_callback(self.received)
+
+    async def test_detached_port_has_plain_push(self):
+        probe = self.port.add_probe(VpProbeType.BUFFER, lambda port, info: None)
+        self.assertIn("push", vars(self.port))
+        self.port.remove_probe(probe)
+        self.assertNotIn("push", vars(self.port))
+
+    async def test_sampling_and_rewrite(self):
+        seen = []
+
+        def tap(port, info):
+            seen.append(info.index)
+            info.data = info.data * 10
+        self.port.add_probe(VpProbeType.BUFFER, tap, every=3)
+        for i in range(1, 8):
+            await self.port.push(i)
+        self.assertEqual(seen, [1, 4, 7])
+        self.assertEqual([c.args[1] for c in self.received.await_args_list], [10, 2, 3, 40, 5, 6, 70])
+
+    async def test_drop_and_remove(self):
+        dropped = []
+        self.port.add_probe(VpProbeType.DROP, lambda port, info: dropped.append(info.data))
+
+        async def drop_odd(port, info):
+            if info.data == "stop":
+                return VpProbeReturn.REMOVE
+            return VpProbeReturn.DROP if info.data % 2 else None
+        self.port.add_probe(VpProbeType.BUFFER, drop_odd)
+        for data in (1, 2, 3, "stop", 5):
+            await self.port.push(data)
+        self.assertEqual(dropped, [1, 3])
+        self.assertEqual([c.args[1] for c in self.received.await_args_list], [2, "stop", 5])
+
+    async def test_block_until_removed(self):
+        probe = self.port.add_probe(VpProbeType.BUFFER, lambda port, info: None, block=True)
+        push = asyncio.create_task(self.port.push("x"))
+        await asyncio.sleep(0.01)
+        self.assertFalse(push.done())
+        self.received.assert_not_awaited()
+        self.port.remove_probe(probe)
+        await push
+        self.received.assert_awaited_once_with("p", "x")
+
+    async def test_events_and_queue_drops(self):
+        queue = VpQueue(maxsize=1, leaky=DrainPolicy.DOWNSTREAM)
+        events = []
+        queue.get_input("in").add_probe(VpProbeType.EVENT | VpProbeType.DROP,
+                                        lambda port, info: events.append((info.type, info.data)))
+        await queue.get_input("in").push("a")
+        await queue.get_input("in").push("b")
+        await queue.get_input("in").activate(False)
+        self.assertEqual(events, [(VpProbeType.DROP, "a"),
+                                  (VpProbeType.EVENT, {"event": "deactivate"})])
+
+    async def test_probe_on_compiled_graph(self):
+        pipeline = VpPipeline("p")
+        a, b = Double("a"), Double("b")
+        a >> b
+        sink = AsyncMock()
+        b.out.set_chain_callback(sink)
+        pipeline.adds(a, b)
+        compile_graph(pipeline)
+
+        seen = []
+        probe = b.inp.add_probe(VpProbeType.BUFFER, lambda port, info: seen.append(info.data))
+        await a.inp.push(1)
+        b.inp.remove_probe(probe)
+        await a.inp.push(1)
+        self.assertEqual(seen, [2])
+        self.assertEqual([c.args[1] for c in sink.await_args_list], [4, 4])
+
+
+if __name__ == "__main__":
+    unittest.main()
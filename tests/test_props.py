@@ -0,0 +1,80 @@
+import unittest
+from vpipe.core.capsule import VpCapsule
+from vpipe.core.composite import VpComposite
+from vpipe.core.pipeline import VpPipeline
+
+
+class RestartingCapsule(VpCapsule):
+    def __init__(self, name):
+        super().__init__(name)
+        self.props = {}
+        self.restarts = 0
+
+    async def set_prop(self, prop, value):
+        match prop:
+            case "lang" | "device":
+                self.props[prop] = value
+                await self.schedule_restart(self._restart)
+            case "volume":
+                self.props[prop] = value
+            case _:
+                await super().set_prop(prop, value)
+
+    async def _restart(self):
+        self.restarts += 1
+
+
+class TestSetProps(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.asr = RestartingCapsule("asr")
+        self.inner = VpComposite("inner")
+        self.inner.add(self.asr)
+        self.pipeline = VpPipeline("pipeline")
+        self.pipeline.add(self.inner)
+
+    async def test_set_prop_restarts_immediately(self):
+        await self.asr.set_prop("lang", "vi")
+        await self.asr.set_prop("device", "mic")
+        self.assertEqual(self.asr.restarts, 2)
+
+    async def test_path_keys_reach_children(self):
+        await self.pipeline.set_prop("inner/asr/volume", 0.5)
+        self.assertEqual(self.asr.props["volume"], 0.5)
+        with self.assertRaises(ValueError):
+            await self.pipeline.set_prop("inner/missing/volume", 0.5)
+        with self.assertRaises(ValueError):
+            await self.pipeline.set_prop("volume", 0.5)
+
+    async def test_batch_merges_restarts(self):
+        timings = await self.pipeline.set_props({
+            "inner/asr/lang": "vi",
+            "inner/asr/device": "mic",
+            "inner/asr/volume": 0.5,
+        })
+        self.assertEqual(self.asr.restarts, 1)
+        self.assertEqual(self.asr.props, {"lang": "vi", "device": "mic", "volume": 0.5})
+        self.assertEqual(set(timings), {"inner/asr/lang", "inner/asr/device", "inner/asr/volume",
+                                        "restart:pipeline/inner/asr"})
+        self.assertTrue(all(elapsed >= 0 for elapsed in timings.values()))
+
+    async def test_nested_batch_joins_outer(self):
+        class Outer(VpComposite):
+            async def set_prop(self, prop, value):
+                await self.get_capsule("asr").set_props({"lang": value, "device": value})
+
+        outer = Outer("outer")
+        outer.add(self.asr)
+        await outer.set_props({"a": "vi", "b": "en"})
+        self.assertEqual(self.asr.restarts, 1)
+
+    async def test_restarts_run_when_a_prop_fails(self):
+        with self.assertRaises(ValueError):
+            await self.pipeline.set_props({"inner/asr/lang": "vi", "inner/asr/bogus": 1})
+        self.assertEqual(self.asr.restarts, 1)
+        # The batch is over, restarts are immediate again
+        await self.asr.set_prop("lang", "en")
+        self.assertEqual(self.asr.restarts, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
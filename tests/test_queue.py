@@ -1,8 +1,9 @@
 import asyncio
 import unittest
 from unittest.mock import AsyncMock
-from vpipe.core.queue import VpQueue, DrainPolicy
+from vpipe.core.queue import VpQueue, DrainPolicy, coalesce_interim, coalesce_text
 from vpipe.core.capsule import VpCapsule, VpState
+from vpipe.core.bus import VpBus
 
 
 class TestQueue(unittest.IsolatedAsyncioTestCase):
@@ -71,5 +72,49 @@ class TestQueue(unittest.IsolatedAsyncioTestCase):
         capsule.process.assert_awaited_once_with("data")
 
 
+class TestLatencyQueue(unittest.IsolatedAsyncioTestCase):
+    async def run_late(self, queue, inputs, fresh):
+        output_data = []
+        queue >> TestQueue.Sink(output_data, name="sink")
+        for data in inputs:
+            await queue.get_input("in").push(data)
+        await asyncio.sleep(0.05)
+        await queue.get_input("in").push(fresh)
+        while not queue._queue.empty():
+            await queue._process_queue(queue.get_output("out"))
+        return output_data
+
+    async def test_drops_late_items_but_delivers_newest(self):
+        queue = VpQueue(maxsize=10, max_latency_ms=20)
+        self.assertEqual(await self.run_late(queue, ["1", "2", "3"], "4"), ["4"])
+        self.assertEqual(queue._window["dropped"], 3)
+
+    async def test_coalesces_late_items(self):
+        queue = VpQueue(max_latency_ms=20, coalesce=coalesce_text)
+        self.assertEqual(await self.run_late(queue, ["a.", "b."], "c."), ["a. b. c."])
+
+        self.assertEqual(coalesce_text("はい。", "行きます。", lang="ja"), "はい。行きます。")
+        self.assertEqual(coalesce_text("Yes.", "Go.", lang="en"), "Yes. Go.")
+
+        queue = VpQueue(max_latency_ms=20, coalesce=coalesce_interim)
+        output = await self.run_late(queue, [("x", False), ("xy", False), ("xyz", True)], ("w", False))
+        self.assertEqual(output, [("xyz", True), ("w", False)])
+
+    async def test_reports_decisions_on_bus(self):
+        queue = VpQueue(max_latency_ms=20, report_interval=0)
+        queue.bus = VpBus()
+        messages = []
+
+        async def watch(message):
+            messages.append(message)
+        queue.bus.add_watch(watch)
+        await self.run_late(queue, ["1", "2"], "3")
+        await asyncio.sleep(0)
+        report = [m.payload for m in messages if m.msg_type == "queue-latency"]
+        self.assertEqual(len(report), 1)
+        self.assertEqual((report[0]["dropped"], report[0]["delivered"]), (2, 1))
+        self.assertGreaterEqual(report[0]["max_wait_ms"], 20)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -114,5 +114,13 @@ class TestServiceManager(unittest.TestCase):
         self.assertEqual(instance_tts.kwargs['voice'], 'test')
         self.assertEqual(instance_tts.kwargs['lang'], 'vi')
 
+    def test_service_key_follows_settings(self):
+        sm = ServiceManager('dummy_config.yaml', 'dummy_settings.yaml')
+        key = sm.service_key('ASR', 'en')
+        self.assertEqual(key, sm.service_key('ASR', 'en'))
+        self.assertNotEqual(key, sm.service_key('ASR', 'vi'))
+        sm.settings['ASR']['settings']['other']['api_key'] = 'new'
+        self.assertNotEqual(key, sm.service_key('ASR', 'en'))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import unittest
+from services.service_pool import ServicePool
+
+
+class DummyService:
+    def __init__(self):
+        self.started = 0
+        self.stopped = 0
+        self.paused = False
+        self.keepalives = 0
+        self.results = []
+
+    async def start(self):
+        self.started += 1
+
+    async def stop(self):
+        self.stopped += 1
+
+    async def pause(self):
+        self.paused = True
+
+    async def resume(self):
+        self.paused = False
+
+    async def keepalive(self):
+        self.keepalives += 1
+
+    def clear_results(self):
+        self.results = []
+
+
+class TestServicePool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.pool = ServicePool(ttl=60, max_idle_per_key=1, keepalive_interval=0.01)
+        self.created = []
+
+    async def asyncTearDown(self):
+        await self.pool.clear()
+
+    def create(self):
+        service = DummyService()
+        self.created.append(service)
+        return service
+
+    async def test_acquire_starts_new_instance(self):
+        service = await self.pool.acquire("k", self.create)
+        self.assertEqual(service.started, 1)
+
+    async def test_release_keeps_instance_warm(self):
+        service = await self.pool.acquire("k", self.create)
+        await self.pool.release(service)
+        self.assertTrue(service.paused)
+        self.assertEqual(service.stopped, 0)
+
+        again = await self.pool.acquire("k", self.create)
+        self.assertIs(again, service)
+        self.assertFalse(again.paused)
+        self.assertEqual(len(self.created), 1)
+
+    async def test_different_key_creates_new_instance(self):
+        service = await self.pool.acquire(("ASR", "en"), self.create)
+        await self.pool.release(service)
+        other = await self.pool.acquire(("ASR", "vi"), self.create)
+        self.assertIsNot(other, service)
+        self.assertEqual(self.pool.idle_count(("ASR", "en")), 1)
+
+    async def test_release_over_capacity_stops(self):
+        s1 = await self.pool.acquire("k", self.create)
+        s2 = await self.pool.acquire("k", self.create)
+        await self.pool.release(s1)
+        await self.pool.release(s2)
+        self.assertEqual(s2.stopped, 1)
+        self.assertEqual(self.pool.idle_count("k"), 1)
+
+    async def test_idle_instances_kept_alive_then_evicted(self):
+        service = await self.pool.acquire("k", self.create)
+        await self.pool.release(service)
+        await asyncio.sleep(0.05)
+        self.assertGreater(service.keepalives, 0)
+
+        self.pool.ttl = 0.01
+        await asyncio.sleep(0.05)
+        self.assertEqual(service.stopped, 1)
+        self.assertEqual(self.pool.idle_count(), 0)
+
+    async def test_rekey_and_clear_results_on_reuse(self):
+        service = await self.pool.acquire(("ASR", "en"), self.create)
+        service.results.append("left over")
+        self.pool.rekey(service, ("ASR", "ja"))  # switched language in place
+        self.assertEqual(self.pool.key_of(service), ("ASR", "ja"))
+        await self.pool.release(service)
+        self.assertEqual(self.pool.idle_count(("ASR", "en")), 0)
+
+        again = await self.pool.acquire(("ASR", "ja"), self.create)
+        self.assertIs(again, service)
+        self.assertEqual(again.results, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
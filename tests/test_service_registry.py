@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import yaml
+from services.service_registry import ServiceRegistry
+
+
+class TestServiceRegistry(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.schema_path = os.path.join(self.tmp.name, "dummy.yaml")
+        self.config_path = os.path.join(self.tmp.name, "services_config.yaml")
+        self.write(self.schema_path, {"fields": [{"key": "url", "default": "ws://a"},
+                                                 {"key": "timeout", "default": 5}]})
+        self.write(self.config_path, {"ASR": [{"id": "dummy", "class": "collections.OrderedDict",
+                                               "schema": self.schema_path}]})
+        self.registry = ServiceRegistry(self.config_path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, data, bump=0):
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(data, f)
+        if bump:
+            st = os.stat(path)
+            os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))
+
+    def test_merged_defaults(self):
+        merged = self.registry.merged_settings("ASR", "dummy", {"url": "", "extra": "x"})
+        self.assertEqual(merged, {"url": "ws://a", "timeout": "5", "extra": "x"})
+
+    def test_lookups_do_not_touch_disk(self):
+        with patch("builtins.open", side_effect=AssertionError("disk I/O")):
+            for _ in range(3):
+                self.registry.fields("ASR", "dummy")
+                self.registry.merged_settings("ASR", "dummy", {})
+                self.registry.get_class("ASR", "dummy")
+
+    def test_class_is_cached(self):
+        with patch("importlib.import_module", wraps=__import__("importlib").import_module) as imp:
+            self.registry.get_class("ASR", "dummy")
+            self.registry.get_class("ASR", "dummy")
+            self.assertEqual(imp.call_count, 1)
+
+    def test_schema_change_invalidates(self):
+        self.write(self.schema_path, {"fields": [{"key": "url", "default": "ws://b"}]}, bump=10**9)
+        self.registry.refresh(force=True)
+        self.assertEqual(self.registry.merged_settings("ASR", "dummy", {}), {"url": "ws://b"})
+
+    def test_missing_service_and_schema(self):
+        self.assertEqual(self.registry.fields("ASR", "unknown"), [])
+        with self.assertRaises(ValueError):
+            self.registry.get_class("ASR", "unknown")
+        registry = ServiceRegistry("missing.yaml", config={"TTS": [{"id": "x", "schema": "missing.yaml"}]})
+        self.assertEqual(registry.merged_settings("TTS", "x", {"a": "1"}), {"a": "1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
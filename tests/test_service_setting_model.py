@@ -3,6 +3,7 @@ import tempfile
 import yaml
 import unittest
 from app.models.service_setting_model import ServiceSettingModel
+from services.service_registry import ServiceRegistry
 
 CONFIG_YAML = '''
 ASR:
@@ -64,6 +65,7 @@ class TestServiceSettingModel(unittest.TestCase):
         self.model = ServiceSettingModel(self.config_path, self.settings_path)
 
     def tearDown(self):
+        self.model.flush()
         self.tmpdir.cleanup()
 
     def test_get_service_list(self):
@@ -92,6 +94,22 @@ class TestServiceSettingModel(unittest.TestCase):
         self.assertEqual(self.model.getFieldValue('TTS', 'voice'), 'en-US-Wavenet-A')
         self.model.setFieldValue('TTS', 'voice', 'vi-VN-Wavenet-B')
         self.assertEqual(self.model.getFieldValue('TTS', 'voice'), 'vi-VN-Wavenet-B')
+    def test_apply_reports_edits_once(self):
+        applied = []
+        self.model.settingsApplied.connect(lambda: applied.append(True))
+        self.model.setSelectedService('ASR', 'google')
+        for value in ('v', 'vi', 'vi-VN'):
+            self.model.setFieldValue('ASR', 'lang', value)
+        self.assertEqual(applied, [])
+        self.model.apply()
+        self.model.apply()
+        self.assertEqual(applied, [True])
+
+    def test_shares_a_given_registry(self):
+        registry = ServiceRegistry(self.config_path)
+        model = ServiceSettingModel(self.config_path, self.settings_path, registry=registry)
+        self.assertIs(model.registry, registry)
+        model.flush()
 
 if __name__ == '__main__':
     unittest.main()
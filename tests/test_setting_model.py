@@ -11,6 +11,7 @@ class TestSettingModel(unittest.TestCase):
         self.model = SettingModel(filepath=self.test_file)
 
     def tearDown(self):
+        self.model.flush()
         if os.path.exists(self.test_file):
             os.remove(self.test_file)
 
@@ -28,6 +29,14 @@ class TestSettingModel(unittest.TestCase):
         model2.load()
         self.assertEqual(model2.get("conference.your_lang"), "en")
 
+    def test_load_fills_keys_added_since(self):
+        with open(self.test_file, "w", encoding="utf-8") as f:
+            yaml.safe_dump({"conference": {"your_lang": "ja"}}, f)
+        self.model.load()
+        self.assertEqual(self.model.get("conference.your_lang"), "ja")
+        self.assertFalse(self.model.get("conference.tran_speculative"))
+        self.assertTrue(self.model.get("conference.upstream.asr_enable"))
+
     def test_get_set(self):
         self.model.load()
         self.model.set("conference.upstream.asr_enable", False)
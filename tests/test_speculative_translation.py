@@ -0,0 +1,75 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock
+from vpipe.capsules.services.tran import TranslatorServiceInterface, TranslationTransform
+
+
+class FakeTranslator(TranslatorServiceInterface):
+    def __init__(self, settings={}):
+        self.calls = []
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    async def translate(self, text, src='en', dest='vi'):
+        self.calls.append(text)
+        await asyncio.sleep(0)
+        return f"<{text}>"
+
+
+class TestSpeculativeTranslation(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.service = FakeTranslator()
+        self.tran = TranslationTransform("tran", service_factory=lambda: self.service, speculative=True)
+        self.tran.out.push = AsyncMock()
+        self.interim = self.tran.get_input("interim")
+        await self.tran.start()
+
+    async def asyncTearDown(self):
+        await self.tran.stop()
+
+    async def feed(self, *results):
+        for result in results:
+            await self.interim.push(result)
+        await asyncio.sleep(0.01)
+
+    async def test_stable_final_is_hit(self):
+        await self.feed(("hello there my friend", False),
+                        ("hello there my friend", False),
+                        ("hello there my friend", True))
+        await self.tran.inp.push("hello there my friend")
+        self.tran.out.push.assert_awaited_with("<hello there my friend>")
+        self.assertEqual(self.service.calls, ["hello there my friend"])
+        self.assertEqual(self.tran.speculation.report()["hits"], 1)
+
+    async def test_clause_prefix_is_extended(self):
+        await self.feed(("good morning everyone,", False),
+                        ("good morning everyone, wel", False),
+                        ("good morning everyone, welcome", True))
+        await self.tran.inp.push("good morning everyone, welcome")
+        self.tran.out.push.assert_awaited_with("<good morning everyone,> <welcome>")
+        self.assertEqual(self.tran.speculation.report()["extended"], 1)
+
+    async def test_changed_final_is_miss(self):
+        await self.feed(("I want to go", False),
+                        ("I want to go home", False),
+                        ("I want two cookies", True))
+        await self.tran.inp.push("I want two cookies")
+        self.tran.out.push.assert_awaited_with("<I want two cookies>")
+        report = self.tran.speculation.report()
+        self.assertEqual(report["misses"], 1)
+        self.assertEqual(report["wasted"], 1)
+
+    async def test_disabled_ignores_interims(self):
+        await self.tran.set_prop("speculative", False)
+        await self.feed(("hello there my friend", False), ("hello there my friend", False))
+        self.assertEqual(self.service.calls, [])
+        await self.tran.inp.push("hello there my friend")
+        self.tran.out.push.assert_awaited_with("<hello there my friend>")
+
+
+if __name__ == "__main__":
+    unittest.main()
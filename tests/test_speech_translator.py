@@ -0,0 +1,44 @@
+import asyncio
+import unittest
+from pipelines.speech_translator import SpeechTranslator
+
+
+class Collector:
+    def __init__(self):
+        self.items = []
+
+    async def push(self, data):
+        self.items.append(data)
+
+
+class TestSpeechTranslator(unittest.IsolatedAsyncioTestCase):
+    async def test_q2_coalescing_follows_language(self):
+        pipeline = SpeechTranslator("st", "ja", "en")
+        q2 = pipeline.get_capsule("q2")
+        self.assertEqual(q2.coalesce("はい。", "行きます。"), "はい。行きます。")
+        await pipeline.set_prop("src-lang", "en")
+        self.assertEqual(q2.coalesce("Yes.", "Go."), "Yes. Go.")
+
+    async def test_finals_reach_speculation_before_q2(self):
+        pipeline = SpeechTranslator("st", "en", "vi")
+        targets = pipeline.get_capsule("asr").get_output("out")._targets
+        self.assertIs(targets[0], pipeline.get_capsule("tran").get_input("interim"))
+
+    async def test_late_finals_reach_translation_while_speculating(self):
+        pipeline = SpeechTranslator("st", "en", "vi")
+        await pipeline.set_prop("tran-speculative", True)
+        q2 = pipeline.get_capsule("q2")
+        await q2.set_prop("max-latency-ms", 20)
+        for text in ("One.", "Two."):
+            await q2.get_input("in").push(text)
+        await asyncio.sleep(0.05)
+        await q2.get_input("in").push("Three.")
+
+        translation = Collector()
+        while not q2._queue.empty():
+            await q2._process_queue(translation)
+        self.assertEqual(translation.items, ["One. Two. Three."])
+
+
+if __name__ == "__main__":
+    unittest.main()
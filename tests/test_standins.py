@@ -0,0 +1,73 @@
+import asyncio
+import unittest
+import numpy as np
+import websockets
+from tools.standins.common import make_parser
+from tools.standins.nllb_server import NllbStandIn
+from tools.standins.whisper_server import WhisperStandIn, CANNED
+from tools.standins.xtts_server import XttsStandIn
+from services.services.local_nllb_translator_service import LocalNLLBTranslatorService
+from services.services.whisper_asr_service import WhisperASRService
+from services.services.xtts_tts_service import XttsTTSService
+
+
+def stand_in_args(**extra):
+    args = make_parser("test", 0).parse_args([])
+    for name, value in extra.items():
+        setattr(args, name, value)
+    return args
+
+
+class TestStandIns(unittest.IsolatedAsyncioTestCase):
+    """One round trip through each stand-in with its service client, on ephemeral ports."""
+
+    async def serve_ws(self, handler):
+        server = await websockets.serve(handler, "127.0.0.1", 0, max_size=None)
+        self.addAsyncCleanup(server.wait_closed)
+        self.addCleanup(server.close)
+        return f"ws://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+    async def test_whisper(self):
+        stand_in = WhisperStandIn(stand_in_args(sample_rate=16000, segment_s=0.1, silence_rms=50.0,
+                                                ready_delay=0.0))
+        service = WhisperASRService(lang='en', settings={"url": await self.serve_ws(stand_in.handler)})
+        await service.start()
+        try:
+            tone = (8000 * np.sin(np.arange(1600) / 5)).astype(np.int16)
+            await service.send(np.concatenate((tone, tone)))
+            results = service.results()
+            text, is_final = await asyncio.wait_for(results.__anext__(), 5)
+            await results.aclose()
+        finally:
+            await service.stop()
+        self.assertIn(text, CANNED["en"])
+        self.assertTrue(is_final)
+
+    async def test_nllb(self):
+        stand_in = NllbStandIn(stand_in_args(per_char_latency=0.0))
+        server = await asyncio.start_server(stand_in.handle_client, "127.0.0.1", 0)
+        self.addAsyncCleanup(server.wait_closed)
+        self.addCleanup(server.close)
+        url = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+        service = LocalNLLBTranslatorService(settings={"url": url})
+        await service.start()
+        try:
+            translated = await service.translate("hello", src="en", dest="vi")
+        finally:
+            await service.stop()
+        self.assertEqual(translated, "[vi] hello")
+
+    async def test_xtts(self):
+        stand_in = XttsStandIn(stand_in_args(sample_rate=24000, seconds_per_char=0.06, per_char_latency=0.0))
+        service = XttsTTSService(settings={"url": await self.serve_ws(stand_in.handler), "pool_size": 1})
+        await service.start()
+        try:
+            audio = await service.synthesize("hello", "en")
+        finally:
+            await service.stop()
+        self.assertEqual(audio.dtype, np.int16)
+        self.assertAlmostEqual(len(audio) / 16000, 0.3, delta=0.01)   # 5 chars * 0.06 s, at 16 kHz
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import importlib
+import os
+import sys
+import tempfile
+import time
+import unittest
+from app.utils import startup_profiler
+
+
+class TestStartupProfiler(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        pkg = os.path.join(self.tmp.name, "slowpkg")
+        os.makedirs(pkg)
+        with open(os.path.join(pkg, "__init__.py"), "w") as f:
+            f.write("import time\ntime.sleep(0.02)\nfrom . import child\n")
+        with open(os.path.join(pkg, "child.py"), "w") as f:
+            f.write("import time\ntime.sleep(0.05)\nVALUE = 42\n")
+        sys.path.insert(0, self.tmp.name)
+
+    def tearDown(self):
+        startup_profiler.disable()
+        sys.path.remove(self.tmp.name)
+        for name in ("slowpkg", "slowpkg.child"):
+            sys.modules.pop(name, None)
+        self.tmp.cleanup()
+
+    def test_times_imports_and_phases(self):
+        startup_profiler.enable()
+        with startup_profiler.phase("load"):
+            module = importlib.import_module("slowpkg")
+        startup_profiler.mark("ready")
+        self.assertEqual(module.child.VALUE, 42)
+
+        inclusive, self_time = startup_profiler._imports["slowpkg"]
+        child_inclusive, child_self = startup_profiler._imports["slowpkg.child"]
+        self.assertGreaterEqual(child_self, 0.05)
+        self.assertGreaterEqual(inclusive, 0.07)
+        self.assertLess(self_time, inclusive - 0.04)   # child time is not counted as self
+
+        report = startup_profiler.report()
+        self.assertIn("phase  load", report)
+        self.assertIn("mark   ready", report)
+        self.assertIn("package slowpkg", report)
+        self.assertIn("module  slowpkg.child", report)
+
+    def test_disabled_is_a_no_op(self):
+        self.assertFalse(startup_profiler.is_enabled())
+        with startup_profiler.phase("ignored"):
+            time.sleep(0)
+        self.assertNotIn("ignored", startup_profiler.report())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import os
+import tempfile
+import unittest
+from vpipe.capsules.text.transcript_recorder import (
+    INDEX_ENTRY, TranscriptReader, TranscriptWriter, VpTranscriptRecorder)
+from vpipe.core.capsule import VpState
+
+
+def records(count, start=1000.0, step=0.5):
+    return [{"t": start + i * step, "kind": "asr" if i % 2 else "tran", "text": f"câu {i}", "final": i % 3 == 0}
+            for i in range(count)]
+
+
+class TestTranscriptWriter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, format, items):
+        path = os.path.join(self.tmp.name, f"log.{format}")
+        writer = TranscriptWriter(path, format=format, fsync_interval=10.0, index_interval=2.0)
+        for record in items:
+            writer.write(record)
+        writer.close()
+        self.assertEqual(writer.records, len(items))
+        self.assertGreaterEqual(writer.syncs, 1)
+        return path
+
+    def test_round_trip_both_formats(self):
+        items = records(40)
+        for format in ("jsonl", "binary"):
+            with self.subTest(format=format):
+                path = self.write(format, items)
+                reader = TranscriptReader(path)
+                self.assertEqual(reader.format, format)
+                self.assertEqual(list(reader.read()), items)
+
+    def test_index_seeks_to_time_range(self):
+        items = records(40)
+        path = self.write("binary", items)
+        with open(path + ".idx", "rb") as f:
+            self.assertEqual(len(f.read()) // INDEX_ENTRY.size, 10)  # one entry per 2 s of records
+        got = list(TranscriptReader(path).read(start=1005.2, end=1008.0))
+        self.assertEqual(got, [r for r in items if 1005.2 <= r["t"] < 1008.0])
+
+    def test_torn_tail_is_ignored(self):
+        path = self.write("jsonl", records(3))
+        with open(path, "ab") as f:
+            f.write(b'{"t": 2000.0, "kind"')
+        self.assertEqual(len(list(TranscriptReader(path).read())), 3)
+
+
+class TestTranscriptRecorder(unittest.IsolatedAsyncioTestCase):
+    async def test_records_while_active(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            recorder = VpTranscriptRecorder(directory=tmp, prefix="upstream")
+            await recorder.get_input("asr").push(("ignored", False))
+            await recorder.set_state(VpState.PAUSED)
+            await recorder.get_input("asr").push(("xin chào", False))
+            await recorder.get_input("asr").push(("xin chào bạn", True))
+            await recorder.get_input("tran").push("hello there")
+            path = recorder.writer.path
+            await recorder.set_state(VpState.NULL)
+            self.assertIsNone(recorder.writer)
+
+            self.assertTrue(path.name.startswith("upstream-") and path.suffix == ".jsonl")
+            got = [(r["kind"], r["text"], r["final"]) for r in TranscriptReader(path).read()]
+            self.assertEqual(got, [("asr", "xin chào", False), ("asr", "xin chào bạn", True),
+                                   ("tran", "hello there", True)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import json
+import struct
+import unittest
+import numpy as np
+from services.services.whisper_asr_service import WhisperASRService
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+
+class TestWhisperASRService(unittest.IsolatedAsyncioTestCase):
+    async def test_pause_sends_buffered_tail(self):
+        service = WhisperASRService(lang='ja')
+        service._ws = FakeWebSocket()
+        service._stopped = False
+        service._connected_event.set()
+
+        tail = np.arange(100, dtype=np.int16)
+        await service.send(tail)   # less than min_send_size, held back by the send loop
+        await service.pause()
+
+        message, = service._ws.sent
+        header_len = struct.unpack("<I", message[:4])[0]
+        self.assertEqual(json.loads(message[4:4 + header_len]), {"language": "ja"})
+        self.assertEqual(message[4 + header_len:], tail.tobytes())
+        self.assertEqual(len(service._buffer), 0)
+
+        await service.send(tail)   # dropped while paused
+        self.assertEqual(len(service._buffer), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
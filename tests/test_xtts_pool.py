@@ -0,0 +1,56 @@
+import asyncio
+import time
+import unittest
+import websockets
+from services.services.xtts_tts_service import XttsTTSService, _shared_pools
+from tools.standins.common import make_parser
+from tools.standins.xtts_server import XttsStandIn
+
+
+class TestXttsPool(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        parser = make_parser("xtts", 0)
+        parser.add_argument("--sample-rate", type=int, default=24000)
+        parser.add_argument("--seconds-per-char", type=float, default=0.01)
+        parser.add_argument("--per-char-latency", type=float, default=0.0)
+        self.standin = XttsStandIn(parser.parse_args(["--latency", "fixed:100"]))
+        self.server = await websockets.serve(self.standin.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.settings = {"url": f"ws://127.0.0.1:{port}", "pool_size": "2"}
+
+    async def asyncTearDown(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def test_concurrent_requests_use_separate_connections(self):
+        service = XttsTTSService(self.settings)
+        await service.start()
+        await service.synthesize("warm up", "en")
+        t0 = time.perf_counter()
+        results = await asyncio.gather(service.synthesize("hello", "en"), service.synthesize("world", "en"))
+        self.assertLess(time.perf_counter() - t0, 0.19)
+        self.assertTrue(all(len(r) > 0 for r in results))
+        await service.stop()
+
+    async def test_pool_shared_between_services(self):
+        s1, s2 = XttsTTSService(self.settings), XttsTTSService(self.settings)
+        await s1.start()
+        await s2.start()
+        self.assertIs(s1.pool, s2.pool)
+        await s1.stop()
+        self.assertEqual(len(_shared_pools), 1)
+        await s2.stop()
+        self.assertEqual(len(_shared_pools), 0)
+
+    async def test_reconnects_after_connection_loss(self):
+        service = XttsTTSService(self.settings)
+        await service.start()
+        for connection in service.pool.connections:
+            await connection.websocket.close()
+        result = await service.synthesize("again", "en")
+        self.assertGreater(len(result), 0)
+        await service.stop()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+"""
+Per-block push overhead on the dual-stream graph, hop-by-hop vs compiled.
+
+Each stream has the shape of the audio path that runs synchronously per
+block in UpStreamPipeline/DownStreamPipeline: source -> volume ->
+[fork -> speech translator input queue, fork -> mixer] -> output queue,
+plus source -> level meter -> rms callback. Capsules that do real work
+(services, the mixer task) are pass-through transforms here, so the
+numbers are the framework's own cost.
+
+    python -m tools.bench_port_push --blocks 20000
+"""
+import argparse
+import asyncio
+import time
+import numpy as np
+from vpipe.capsules.audio.level_meter import VpLevelMeter
+from vpipe.capsules.audio.volume import VpVolume
+from vpipe.core.capsule import VpCapsule
+from vpipe.core.compiler import compile_graph, reset_graph
+from vpipe.core.composite import VpComposite
+from vpipe.core.fork import VpFork
+from vpipe.core.pipeline import VpPipeline
+from vpipe.core.queue import VpQueue, DrainPolicy
+from vpipe.core.transform import VpBaseTransform
+
+
+class PassThrough(VpBaseTransform):
+    async def transform(self, data):
+        return data
+
+
+class Source(VpCapsule):
+    def __init__(self, name):
+        super().__init__(name)
+        self.out = self.add_output("out")
+
+
+class Translator(VpComposite):
+    """AugmentedSpeechTranslator's per-block path: fork to the ASR queue and the mixer."""
+    def __init__(self, name):
+        super().__init__(name)
+        fork = VpFork(name="src-fork")
+        st_queue = VpQueue(name="st-q1", maxsize=10, leaky=DrainPolicy.DOWNSTREAM)
+        mixer = PassThrough(name="audio-mixer")
+        fork.fork() >> st_queue
+        fork.fork() >> mixer
+        self.adds(fork, st_queue, mixer)
+        self.expose_input("in", fork.get_input("in"))
+        self.expose_output("out", mixer.get_output("out"))
+
+
+class Stream(VpPipeline):
+    def __init__(self, name):
+        super().__init__(name)
+        self.src = Source("src")
+        volume = VpVolume(name="volume-control")
+        translator = Translator("ast")
+        q1 = VpQueue(name="q1", maxsize=2, leaky=DrainPolicy.DOWNSTREAM)
+        meter = VpLevelMeter(name="rms-transform")
+        self.rms = 0.0
+
+        async def on_rms(name, data):
+            self.rms = data["rms"]
+
+        self.src >> volume >> translator >> q1
+        self.src >> meter
+        meter.out.set_chain_callback(on_rms)
+        self.adds(self.src, volume, translator, q1, meter)
+
+
+def build():
+    dual = VpPipeline("dual-stream")
+    streams = [Stream("upstream"), Stream("downstream")]
+    dual.adds(*streams)
+    return dual, streams
+
+
+async def measure(streams, block, count):
+    ports = [stream.src.out for stream in streams]
+    for _ in range(200):  # warm up
+        for port in ports:
+            await port.push(block)
+    started = time.perf_counter()
+    for _ in range(count):
+        for port in ports:
+            await port.push(block)
+    return (time.perf_counter() - started) / count * 1e6
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blocks", type=int, default=20000)
+    parser.add_argument("--blocksize", type=int, default=320)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    dual, streams = build()
+    block = np.zeros((args.blocksize, 1), dtype=np.int16)
+    results = {"hop-by-hop": [], "compiled": []}
+    for _ in range(args.rounds):
+        reset_graph(dual)
+        results["hop-by-hop"].append(await measure(streams, block, args.blocks))
+        compile_graph(dual)
+        results["compiled"].append(await measure(streams, block, args.blocks))
+
+    print(f"dual-stream graph, {args.blocks} blocks of {args.blocksize} frames, best of {args.rounds}")
+    for label, values in results.items():
+        print(f"  {label:<11} {min(values):8.2f} us/block (both streams)")
+    before, after = min(results["hop-by-hop"]), min(results["compiled"])
+    print(f"  saved       {before - after:8.2f} us/block ({(1 - after / before) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,12 @@
+"""
+Local stand-ins for the self-hosted servers used by the Whisper ASR, XTTS and
+local NLLB services. They speak the same wire protocols as the real servers and
+return synthetic results, so the client code paths can be exercised without a
+GPU or network:
+
+    python -m tools.standins.whisper_server --latency lognormal:300:0.4
+    python -m tools.standins.xtts_server --max-concurrency 1 --fail-rate 0.05
+    python -m tools.standins.nllb_server --rate 20 --latency uniform:50:150
+
+Point the services at them through their `url` setting.
+"""
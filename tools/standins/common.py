@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import io
+import logging
+import random
+import time
+import wave
+
+logger = logging.getLogger("standins")
+
+
+class Latency:
+    """
+    Latency distribution parsed from a spec string, values in milliseconds:
+        fixed:200
+        uniform:100:400
+        normal:250:50          (mean, stddev)
+        lognormal:250:0.5      (median, sigma)
+    """
+    def __init__(self, spec="fixed:0"):
+        kind, *params = spec.split(":")
+        params = [float(p) for p in params]
+        match kind:
+            case "fixed":
+                self._sample = lambda: params[0]
+            case "uniform":
+                self._sample = lambda: random.uniform(params[0], params[1])
+            case "normal":
+                self._sample = lambda: random.gauss(params[0], params[1])
+            case "lognormal":
+                self._sample = lambda: params[0] * random.lognormvariate(0, params[1])
+            case _:
+                raise ValueError(f"Unknown latency distribution: {spec}")
+        self.spec = spec
+
+    def sample(self):
+        return max(0.0, self._sample()) / 1000
+
+    async def wait(self, scale=1.0):
+        await asyncio.sleep(self.sample() * scale)
+
+
+class RateLimiter:
+    """ Token bucket capping requests per second; rate <= 0 disables it. """
+    def __init__(self, rate=0.0, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class Faults:
+    """ Randomly fails (error response / closed connection) or drops (no response) requests. """
+    def __init__(self, fail_rate=0.0, drop_rate=0.0):
+        self.fail_rate = fail_rate
+        self.drop_rate = drop_rate
+
+    def should_fail(self):
+        return random.random() < self.fail_rate
+
+    def should_drop(self):
+        return random.random() < self.drop_rate
+
+
+class StandIn:
+    """ Shared knobs of every stand-in server, built from the common CLI args. """
+    def __init__(self, args):
+        self.latency = Latency(args.latency)
+        self.limiter = RateLimiter(args.rate, args.burst)
+        self.concurrency = asyncio.Semaphore(args.max_concurrency) if args.max_concurrency > 0 else None
+        self.faults = Faults(args.fail_rate, args.drop_rate)
+        self.requests = 0
+        self.failed = 0
+        self.dropped = 0
+
+    async def __aenter__(self):
+        await self.limiter.acquire()
+        if self.concurrency:
+            await self.concurrency.acquire()
+        self.requests += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.concurrency:
+            self.concurrency.release()
+
+    def log_stats(self):
+        logger.info(f"requests={self.requests} failed={self.failed} dropped={self.dropped}")
+
+
+def make_parser(description, port):
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=port)
+    parser.add_argument("--latency", default="fixed:0",
+                        help="fixed:MS | uniform:LO:HI | normal:MEAN:STD | lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--rate", type=float, default=0.0, help="max requests per second (0 = unlimited)")
+    parser.add_argument("--burst", type=int, default=1, help="token bucket size for --rate")
+    parser.add_argument("--max-concurrency", type=int, default=0, help="max requests served at once (0 = unlimited)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="probability of an error response")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="probability of never answering")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--log-level", default="INFO")
+    return parser
+
+
+def setup(args):
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    if args.seed is not None:
+        random.seed(args.seed)
+
+
+def run(main):
+    try:
+        asyncio.run(main)
+    except KeyboardInterrupt:
+        pass
+
+
+def wav_bytes(samples, sample_rate):
+    """ Encode mono int16 samples as a WAV file. """
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.astype("<i2").tobytes())
+    return buf.getvalue()
@@ -0,0 +1,92 @@
+"""
+Stand-in for the NLLB translation HTTP server used by `LocalNLLBTranslatorService`.
+
+Protocol:
+    POST /translated  JSON {"text", "src_lang", "tgt_lang"}
+    200               JSON {"translated_text"}
+
+The translation is the source text tagged with the target language. Plain
+asyncio streams keep it dependency free; HTTP/1.1 keep-alive is supported
+because httpx reuses connections.
+"""
+import asyncio
+import json
+from tools.standins.common import StandIn, logger, make_parser, setup, run
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}
+
+
+class NllbStandIn(StandIn):
+    def __init__(self, args):
+        super().__init__(args)
+        self.per_char_latency = args.per_char_latency
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, response = await self.route(method, path, body)
+                if status is None:
+                    # Dropped: leave the client hanging until it gives up
+                    await reader.read()
+                    break
+                data = json.dumps(response, ensure_ascii=False).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode("latin-1") + data)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, path, body):
+        if method != "POST" or path.split("?")[0] != "/translated":
+            return 404, {"detail": "Not Found"}
+        try:
+            payload = json.loads(body)
+            text, tgt = payload["text"], payload.get("tgt_lang", "vi")
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {"detail": f"Invalid request: {e}"}
+
+        async with self:
+            await self.latency.wait()
+            await asyncio.sleep(len(text) * self.per_char_latency / 1000)
+            if self.faults.should_drop():
+                self.dropped += 1
+                return None, None
+            if self.faults.should_fail():
+                self.failed += 1
+                return 500, {"detail": "injected failure"}
+            return 200, {"translated_text": f"[{tgt}] {text}"}
+
+
+async def main(args):
+    server = NllbStandIn(args)
+    srv = await asyncio.start_server(server.handle_client, args.host, args.port)
+    logger.info(f"NLLB stand-in listening on http://{args.host}:{args.port}")
+    try:
+        async with srv:
+            await srv.serve_forever()
+    finally:
+        server.log_stats()
+
+
+if __name__ == "__main__":
+    parser = make_parser("NLLB translator stand-in server", 8011)
+    parser.add_argument("--per-char-latency", type=float, default=0.0, help="extra ms of latency per character")
+    args = parser.parse_args()
+    setup(args)
+    run(main(args))
@@ -0,0 +1,99 @@
+"""
+Stand-in for the Whisper ASR websocket server used by `WhisperASRService`.
+
+Protocol:
+    server -> client (text):   {"type": "status", "ready": true} once connected
+    client -> server (binary): <I header length> + JSON {"language": ...} + int16 PCM
+    server -> client (binary): <I header length> + JSON {"text", "speaker"} + WAV of the segment
+
+Every `--segment-s` seconds of received audio louder than `--silence-rms`
+produces one result, after the configured latency.
+"""
+import asyncio
+import itertools
+import json
+import struct
+import numpy as np
+import websockets
+from tools.standins.common import StandIn, logger, make_parser, setup, run, wav_bytes
+
+CANNED = {
+    "en": ["Hello, how are you today?", "Let's get started with the meeting.",
+           "Could you repeat that, please?", "Thank you very much."],
+    "ja": ["こんにちは、お元気ですか。", "会議を始めましょう。", "もう一度お願いします。"],
+    "vi": ["Xin chào, bạn khỏe không?", "Chúng ta bắt đầu cuộc họp nhé.", "Cảm ơn bạn rất nhiều."],
+}
+
+
+class WhisperStandIn(StandIn):
+    def __init__(self, args):
+        super().__init__(args)
+        self.sample_rate = args.sample_rate
+        self.segment_bytes = int(args.segment_s * args.sample_rate) * 2
+        self.silence_rms = args.silence_rms
+        self.ready_delay = args.ready_delay
+
+    async def handler(self, ws):
+        logger.info(f"Client connected: {ws.remote_address}")
+        await asyncio.sleep(self.ready_delay)
+        await ws.send(json.dumps({"type": "status", "ready": True}))
+
+        buffer = bytearray()
+        phrases = {}
+        pending = set()
+        try:
+            async for msg in ws:
+                if not isinstance(msg, bytes) or len(msg) < 4:
+                    continue
+                header_len = struct.unpack("<I", msg[:4])[0]
+                header = json.loads(msg[4:4 + header_len])
+                buffer.extend(msg[4 + header_len:])
+
+                while len(buffer) >= self.segment_bytes:
+                    segment = np.frombuffer(bytes(buffer[:self.segment_bytes]), dtype=np.int16)
+                    del buffer[:self.segment_bytes]
+                    if np.sqrt(np.mean(segment.astype(np.float32) ** 2)) < self.silence_rms:
+                        continue
+                    lang = header.get("language", "en")
+                    phrase = phrases.setdefault(lang, itertools.cycle(CANNED.get(lang, CANNED["en"])))
+                    task = asyncio.create_task(self._respond(ws, next(phrase), segment))
+                    pending.add(task)
+                    task.add_done_callback(pending.discard)
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            for task in pending:
+                task.cancel()
+            logger.info(f"Client disconnected: {ws.remote_address}")
+            self.log_stats()
+
+    async def _respond(self, ws, text, segment):
+        async with self:
+            await self.latency.wait()
+            if self.faults.should_drop():
+                self.dropped += 1
+                return
+            if self.faults.should_fail():
+                self.failed += 1
+                await ws.close(code=1011, reason="injected failure")
+                return
+            header = json.dumps({"text": text, "speaker": "SPEAKER_00"}).encode("utf-8")
+            await ws.send(struct.pack("<I", len(header)) + header + wav_bytes(segment, self.sample_rate))
+
+
+async def main(args):
+    server = WhisperStandIn(args)
+    async with websockets.serve(server.handler, args.host, args.port, max_size=None):
+        logger.info(f"Whisper stand-in listening on ws://{args.host}:{args.port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = make_parser("Whisper ASR stand-in server", 8012)
+    parser.add_argument("--sample-rate", type=int, default=16000)
+    parser.add_argument("--segment-s", type=float, default=3.0, help="seconds of audio per result")
+    parser.add_argument("--silence-rms", type=float, default=50.0, help="segments below this RMS produce no result")
+    parser.add_argument("--ready-delay", type=float, default=0.0, help="seconds before the ready status is sent")
+    args = parser.parse_args()
+    setup(args)
+    run(main(args))
@@ -0,0 +1,76 @@
+"""
+Stand-in for the XTTS websocket server used by `XttsTTSService`.
+
+Protocol:
+    client -> server (text):   JSON {"lang", "text", "speaker_wav"}
+    server -> client (binary): WAV file with the synthesized speech
+    server -> client (text):   error message on failure
+
+The reply is a tone whose duration grows with the text length, so the
+downstream audio path sees realistic buffer sizes.
+"""
+import asyncio
+import json
+import numpy as np
+import websockets
+from tools.standins.common import StandIn, logger, make_parser, setup, run, wav_bytes
+
+
+class XttsStandIn(StandIn):
+    def __init__(self, args):
+        super().__init__(args)
+        self.sample_rate = args.sample_rate
+        self.seconds_per_char = args.seconds_per_char
+        self.per_char_latency = args.per_char_latency
+
+    def synthesize(self, text):
+        n = int(max(0.2, len(text) * self.seconds_per_char) * self.sample_rate)
+        t = np.arange(n) / self.sample_rate
+        tone = 0.2 * np.sin(2 * np.pi * 220 * t) * np.hanning(n)
+        return wav_bytes((tone * 32767).astype(np.int16), self.sample_rate)
+
+    async def handler(self, ws):
+        logger.info(f"Client connected: {ws.remote_address}")
+        try:
+            # Requests on one connection are answered in order, like the real server
+            async for msg in ws:
+                try:
+                    payload = json.loads(msg)
+                    text = payload["text"]
+                except (ValueError, KeyError, TypeError) as e:
+                    await ws.send(f"Invalid request: {e}")
+                    continue
+
+                async with self:
+                    await self.latency.wait()
+                    await asyncio.sleep(len(text) * self.per_char_latency / 1000)
+                    if self.faults.should_drop():
+                        self.dropped += 1
+                        continue
+                    if self.faults.should_fail():
+                        self.failed += 1
+                        await ws.send("Synthesis failed: injected failure")
+                        continue
+                    await ws.send(self.synthesize(text))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            logger.info(f"Client disconnected: {ws.remote_address}")
+            self.log_stats()
+
+
+async def main(args):
+    server = XttsStandIn(args)
+    async with websockets.serve(server.handler, args.host, args.port, max_size=None):
+        logger.info(f"XTTS stand-in listening on ws://{args.host}:{args.port}")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    parser = make_parser("XTTS TTS stand-in server", 8765)
+    parser.add_argument("--sample-rate", type=int, default=24000)
+    parser.add_argument("--seconds-per-char", type=float, default=0.06, help="audio duration per character")
+    parser.add_argument("--per-char-latency", type=float, default=0.0, help="extra ms of latency per character")
+    args = parser.parse_args()
+    setup(args)
+    run(main(args))
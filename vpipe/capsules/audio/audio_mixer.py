@@ -18,6 +18,7 @@ class VpAudiopMixer(VpCapsule):
 
         port.set_property("volume", 1.0)
         port.set_property("mute", False)
+        port.set_credit_handler(lambda: 0 if self._buffers[name] is not None else 1)
 
         return port
 
@@ -64,6 +65,8 @@ class VpAudiopMixer(VpCapsule):
                 mix = np.mean(chunks, axis=0).round().astype(dtype)
                 self._buffers = {k: None for k in self._buffers}
                 self._cond.notify_all()
+                for port in self._input_ports.values():
+                    port.credits_changed()
 
             await out_port.push(mix)
             await asyncio.sleep(0)
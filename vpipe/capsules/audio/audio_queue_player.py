@@ -1,8 +1,8 @@
 import asyncio
 import numpy as np
 from vpipe.core.audiosrc import VpAudioSource
-from pydub import AudioSegment
 from vpipe.core.config import GLOBAL_AUDIO_CONFIG
+from vpipe.utils import audio_codec
 
 
 class VpAudioQueuePlayer(VpAudioSource):
@@ -12,6 +12,7 @@ class VpAudioQueuePlayer(VpAudioSource):
         self.speed = speed
         self.inp = self.add_input("in")
         self.audio_queue = asyncio.Queue(maxsize=10)
+        self.inp.set_credit_handler(lambda: self.audio_queue.maxsize - self.audio_queue.qsize())
         self.samples = None
         self.position = 0
         self.silence = np.zeros((self.audio_config.blocksize,
@@ -26,25 +27,22 @@ class VpAudioQueuePlayer(VpAudioSource):
                 raise ValueError(f"Unknown property: {prop}")
 
     def stretch_audio(self, audio, speed, fmt):
-        seg = AudioSegment(
-            audio,
-            frame_rate=fmt.rate,
-            sample_width=fmt.sample_size,
-            channels=fmt.channels
-        )
-
-        if speed != 1.0:
-            seg = seg._spawn(seg.raw_data, overrides={
-                "frame_rate": int(seg.frame_rate * speed)
-            }).set_frame_rate(fmt.rate)
-
-        return seg.raw_data
+        """ Play `audio` at `speed` by treating it as recorded at rate * speed (changes pitch too). """
+        if speed == 1.0:
+            return audio
+        info = np.iinfo(fmt.dtype)
+        samples = audio.astype(np.float32) / (info.max + 1)
+        return audio_codec.convert(samples, int(fmt.rate * speed), fmt)
 
     async def _handle_input(self, name, buf):
         fmt = self.audio_config.format
         try:
-            stretched_buf = self.stretch_audio(buf.tobytes(), self.speed, fmt)
-            stretched_buf = np.frombuffer(stretched_buf, dtype=fmt.dtype).reshape((-1, fmt.channels))
+            buf = np.frombuffer(buf.tobytes(), dtype=fmt.dtype).reshape((-1, fmt.channels))
+            if self.speed == 1.0:
+                stretched_buf = buf
+            else:
+                # Resampling takes milliseconds per block, keep it off the event loop
+                stretched_buf = await audio_codec.run_on_decoder(self.stretch_audio, buf, self.speed, fmt)
             await asyncio.wait_for(self.audio_queue.put(stretched_buf), timeout=1.0)
 
         except asyncio.TimeoutError:
@@ -59,6 +57,7 @@ class VpAudioQueuePlayer(VpAudioSource):
                 self.audio_queue.get_nowait()
             except:
                 pass
+        self.inp.credits_changed()
         self.samples = None
         self.position = 0
 
@@ -68,6 +67,7 @@ class VpAudioQueuePlayer(VpAudioSource):
                 self.samples = await asyncio.wait_for(self.audio_queue.get(), timeout=0.01)
                 self.position = 0
                 self.audio_queue.task_done()
+                self.inp.credits_changed()
             except (asyncio.TimeoutError, asyncio.QueueEmpty):
                 return self.silence
 
@@ -1,27 +1,23 @@
-import asyncio
-from pydub import AudioSegment
 import numpy as np
 from vpipe.core.audiosrc import VpAudioSource
 from vpipe.core.config import GLOBAL_AUDIO_CONFIG, AudioConfig
+from vpipe.utils import audio_codec
 
 
 class VpFileSource(VpAudioSource):
-    def __init__(self, filepath: str, audio_config: AudioConfig = None):
-        super().__init__(audio_config=audio_config or GLOBAL_AUDIO_CONFIG)
+    def __init__(self, filepath: str, audio_config: AudioConfig = None, name=None, realtime=True):
+        super().__init__(name=name, audio_config=audio_config or GLOBAL_AUDIO_CONFIG, realtime=realtime)
         self.filepath = filepath
         self.samples = None
         self.position = 0
 
-    async def open(self):
-        fmt = self.audio_config.format
-
-        audio = AudioSegment.from_file(self.filepath) \
-            .set_channels(fmt.channels) \
-            .set_sample_width(fmt.dtype().itemsize) \
-            .set_frame_rate(fmt.rate)
+    @property
+    def finished(self):
+        return self.samples is not None and self.position >= len(self.samples)
 
-        samples = np.frombuffer(audio.raw_data, dtype=fmt.dtype)
-        self.samples = samples.reshape((-1, fmt.channels))
+    async def open(self):
+        samples, rate = audio_codec.load(self.filepath)
+        self.samples = audio_codec.convert(samples, rate, self.audio_config.format)
         self.position = 0
 
     async def close(self):
@@ -37,4 +33,8 @@ class VpFileSource(VpAudioSource):
         chunk = self.samples[self.position:end]
         self.position = end
 
+        if len(chunk) < length:
+            # Downstream mixers expect whole blocks, pad the last one with silence
+            padding = np.zeros((length - len(chunk),) + chunk.shape[1:], dtype=chunk.dtype)
+            return np.concatenate([chunk, padding])
         return chunk.copy()
@@ -0,0 +1,98 @@
+import math
+import numpy as np
+from vpipe.core.transform import VpBaseTransform
+from vpipe.core.config import AudioFormat
+
+
+class VpLevelMeter(VpBaseTransform):
+    """
+    Audio level meter. Measures peak, RMS and clipped samples of every
+    block, and pushes one reading every `interval` seconds of audio,
+    independent of the block size:
+
+        {"rms": float, "peak": float, "clips": int}
+
+    Levels are normalized to 0-1. `rms` follows rises immediately and
+    falls with a `release` time constant; `peak` is held for `peak_hold`
+    seconds before it falls the same way. `clips` counts full-scale
+    samples since the previous reading.
+    """
+    def __init__(self, name=None, audio_format: AudioFormat = None,
+                 interval=0.05, release=0.3, peak_hold=1.0):
+        super().__init__(name=name)
+        self.audio_format = audio_format or AudioFormat()
+        self.interval = interval
+        self.release = release
+        self.peak_hold = peak_hold
+
+        dtype = self.audio_format.dtype
+        self._full_scale = float(np.iinfo(dtype).max) if np.issubdtype(dtype, np.integer) else 1.0
+        self.reset()
+
+    def reset(self):
+        self._energy = 0.0
+        self._frames = 0
+        self._peak = 0.0
+        self._clips = 0
+        self._rms_level = 0.0
+        self._peak_level = 0.0
+        self._peak_age = 0.0
+
+    async def set_prop(self, prop, value):
+        match prop:
+            case "interval":
+                self.interval = value
+            case "release":
+                self.release = value
+            case "peak-hold":
+                self.peak_hold = value
+            case _:
+                raise ValueError(f"Unknown property: {prop}")
+
+    async def start(self):
+        self.reset()
+
+    def measure(self, data):
+        samples = np.asarray(data).reshape(-1).astype(np.float32)
+        if samples.size == 0:
+            return
+        full_scale = self._full_scale
+        hi, lo = float(samples.max()), float(samples.min())
+        self._energy += float(np.dot(samples, samples))
+        self._frames += samples.size
+        self._peak = max(self._peak, hi, -lo)
+        if hi >= full_scale or lo <= -full_scale:
+            self._clips += int(np.count_nonzero(samples >= full_scale)
+                               + np.count_nonzero(samples <= -full_scale))
+
+    def _reading(self, elapsed):
+        full_scale = self._full_scale
+        rms = math.sqrt(self._energy / self._frames) / full_scale if self._frames else 0.0
+        peak = self._peak / full_scale
+        decay = math.exp(-elapsed / self.release) if self.release > 0 else 0.0
+
+        self._rms_level = max(rms, self._rms_level * decay)
+        self._peak_age += elapsed
+        if peak >= self._peak_level:
+            self._peak_level = peak
+            self._peak_age = 0.0
+        elif self._peak_age > self.peak_hold:
+            self._peak_level = max(peak, self._peak_level * decay)
+
+        reading = {
+            "rms": min(self._rms_level, 1.0),
+            "peak": min(self._peak_level, 1.0),
+            "clips": self._clips,
+        }
+        self._energy = 0.0
+        self._frames = 0
+        self._peak = 0.0
+        self._clips = 0
+        return reading
+
+    async def transform(self, data):
+        self.measure(data)
+        channels = self.audio_format.channels
+        elapsed = self._frames / channels / self.audio_format.rate
+        if elapsed >= self.interval:
+            return self._reading(elapsed)
@@ -1,11 +1,12 @@
 import asyncio
 import numpy as np
-import sounddevice as sd
 from vpipe.core.audiosrc import VpAudioSource
-from vpipe.utils.audio_devices import find_device_index
+from vpipe.utils.audio_devices import device_registry
 
 
 class VpMicSource(VpAudioSource):
+    device_clock = True
+
     def __init__(self, name=None, audio_config=None):
         super().__init__(name=name, audio_config=audio_config)
         self.stream = None
@@ -24,6 +25,10 @@ class VpMicSource(VpAudioSource):
             
     async def _set_device(self, device: str):
         self.device = device
+        if self.stream is not None and getattr(self.stream, 'active', False):
+            await self.schedule_restart(self._reopen)
+
+    async def _reopen(self):
         if self.stream is not None and getattr(self.stream, 'active', False):
             await self.close()
             await self.open()
@@ -31,8 +36,7 @@ class VpMicSource(VpAudioSource):
     def _resolve_device(self, dev):
         if isinstance(dev, str):
             try:
-                idx = find_device_index(dev, is_input=True)
-                return idx
+                return device_registry().find(dev, is_input=True)
             except Exception as e:
                 return None
         return dev
@@ -40,28 +44,40 @@ class VpMicSource(VpAudioSource):
     async def open(self):
         async with self._lock:
             def start():
+                import sounddevice as sd
                 fmt = self.audio_config.format
                 device_index = self._resolve_device(self.device)
-                self.stream = sd.InputStream(
+                self.stream = device_registry().open_stream(lambda: sd.InputStream(
                     samplerate=fmt.rate,
                     channels=fmt.channels,
                     blocksize=self.audio_config.blocksize,
                     dtype=fmt.dtype,
                     device=device_index
-                )
+                ))
                 self.stream.start()
             await asyncio.to_thread(start)
 
     async def close(self):
         async with self._lock:
             def close():
-                if self.stream is not None and getattr(self.stream, 'active', False):
-                    self.stream.stop()
-                    self.stream.close()
+                if self.stream is not None:
+                    if getattr(self.stream, 'active', False):
+                        self.stream.stop()
+                        self.stream.close()
+                    device_registry().stream_closed()
                 self.stream = None
 
             await asyncio.to_thread(close)
 
+    def device_frames(self):
+        stream = self.stream
+        if stream is None:
+            return None
+        try:
+            return self.frames_read + stream.read_available
+        except Exception:
+            return None
+
     async def read_chunk(self, length):
         async with self._lock:
             def read():
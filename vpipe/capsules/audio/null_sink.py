@@ -0,0 +1,40 @@
+import wave
+import numpy as np
+from vpipe.core.audiosink import VpAudioSink
+
+
+class VpNullSink(VpAudioSink):
+    """Discards audio, counting blocks and frames."""
+    def __init__(self, name=None, audio_config=None):
+        super().__init__(name=name, audio_config=audio_config)
+        self.blocks = 0
+        self.frames = 0
+
+    async def write(self, buf):
+        self.blocks += 1
+        self.frames += len(buf)
+
+
+class VpWavSink(VpNullSink):
+    """Writes audio to a WAV file in the sink's audio format."""
+    def __init__(self, filepath, name=None, audio_config=None):
+        super().__init__(name=name, audio_config=audio_config)
+        self.filepath = filepath
+        self._wav = None
+
+    async def open(self):
+        fmt = self.audio_config.format
+        self._wav = wave.open(str(self.filepath), "wb")
+        self._wav.setnchannels(fmt.channels)
+        self._wav.setsampwidth(fmt.sample_size)
+        self._wav.setframerate(fmt.rate)
+
+    async def close(self):
+        if self._wav is not None:
+            self._wav.close()
+            self._wav = None
+
+    async def write(self, buf):
+        await super().write(buf)
+        if self._wav is not None:
+            self._wav.writeframes(np.ascontiguousarray(buf, dtype=self.audio_config.format.dtype).tobytes())
@@ -1,10 +1,11 @@
 import asyncio
-import sounddevice as sd
 from vpipe.core.audiosink import VpAudioSink
-from vpipe.utils.audio_devices import find_device_index
+from vpipe.utils.audio_devices import device_registry
 
 
 class VpSpeakerSink(VpAudioSink):
+    device_clock = True
+
     def __init__(self, name=None, audio_config=None):
         super().__init__(name=name, audio_config=audio_config)
         self.stream = None
@@ -13,14 +14,17 @@ class VpSpeakerSink(VpAudioSink):
 
     async def _set_device(self, device: str):
         self.device = device
+        if self.stream and getattr(self.stream, 'active', False):
+            await self.schedule_restart(self._reopen)
+
+    async def _reopen(self):
         if self.stream and getattr(self.stream, 'active', False):
             await self.close()
             await self.open()
 
     def _resolve_device(self, dev):
         if isinstance(dev, str):
-            idx = find_device_index(dev, is_input=False)
-            return idx
+            return device_registry().find(dev, is_input=False)
         return dev
 
     async def set_prop(self, key: str, value):
@@ -32,15 +36,16 @@ class VpSpeakerSink(VpAudioSink):
 
     async def open(self):
         async with self._lock:
+            import sounddevice as sd
             fmt = self.audio_config.format
             device_index = self._resolve_device(self.device)
-            self.stream = sd.OutputStream(
+            self.stream = device_registry().open_stream(lambda: sd.OutputStream(
                 samplerate=fmt.rate,
                 channels=fmt.channels,
                 blocksize=self.audio_config.blocksize,
                 dtype=fmt.dtype,
                 device=device_index
-            )
+            ))
             await asyncio.to_thread(self.stream.start)
 
     async def close(self):
@@ -49,8 +54,19 @@ class VpSpeakerSink(VpAudioSink):
                 if getattr(self.stream, 'active', False):
                     await asyncio.to_thread(self.stream.stop)
                     await asyncio.to_thread(self.stream.close)
+                device_registry().stream_closed()
                 self.stream = None
 
+    def device_frames(self):
+        # written + free space = played + buffer size
+        stream = self.stream
+        if stream is None:
+            return None
+        try:
+            return self.frames_written + stream.write_available
+        except Exception:
+            return None
+
     async def write(self, buf):
         async with self._lock:
             if self.stream and getattr(self.stream, 'active', False):
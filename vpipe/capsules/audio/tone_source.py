@@ -0,0 +1,55 @@
+import numpy as np
+from vpipe.core.audiosrc import VpAudioSource
+from vpipe.core.config import GLOBAL_AUDIO_CONFIG, AudioConfig
+
+
+class VpToneSource(VpAudioSource):
+    """
+    Sine tone at `frequency` Hz and `amplitude` (0-1 of full scale), for
+    `duration` seconds (rounded up to whole blocks) or forever when None.
+    Phase is continuous across blocks.
+    """
+    def __init__(self, name=None, frequency=440.0, amplitude=0.5, duration=None,
+                 audio_config: AudioConfig = None, realtime=True):
+        super().__init__(name=name, audio_config=audio_config or GLOBAL_AUDIO_CONFIG, realtime=realtime)
+        self.frequency = frequency
+        self.amplitude = amplitude
+        self.duration = duration
+        self.position = 0
+
+    @property
+    def finished(self):
+        return self.duration is not None and self.position >= self.duration * self.audio_config.format.rate
+
+    async def set_prop(self, prop, value):
+        match prop:
+            case "frequency":
+                self.frequency = value
+            case "amplitude":
+                self.amplitude = value
+            case _:
+                await super().set_prop(prop, value)
+
+    async def open(self):
+        self.position = 0
+
+    async def close(self):
+        pass
+
+    async def read_chunk(self, length):
+        if self.finished:
+            return None
+        fmt = self.audio_config.format
+        t = (self.position + np.arange(length)) / fmt.rate
+        self.position += length
+        wave = self.amplitude * np.sin(2 * np.pi * self.frequency * t)
+        if np.issubdtype(fmt.dtype, np.integer):
+            wave = wave * np.iinfo(fmt.dtype).max
+        block = wave.astype(fmt.dtype).reshape(-1, 1)
+        return np.repeat(block, fmt.channels, axis=1)
+
+
+class VpSilenceSource(VpToneSource):
+    def __init__(self, name=None, duration=None, audio_config: AudioConfig = None, realtime=True):
+        super().__init__(name=name, amplitude=0.0, duration=duration, audio_config=audio_config,
+                         realtime=realtime)
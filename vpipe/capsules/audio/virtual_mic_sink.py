@@ -2,11 +2,12 @@ import time
 import numpy as np
 import asyncio
 from vpipe.core.audiosink import VpAudioSink
-from vpipe.utils.virtual_audio_device_client import VirtualAudioDeviceClient
 from vpipe.utils.cache_resampler import CacheResampler
 
 
 class VirtualMicSink(VpAudioSink):
+    device_clock = True
+
     def __init__(self, name=None, audio_config=None):
         super().__init__(audio_config=audio_config)
         self._name = name or "virtual-mic-sink"
@@ -15,6 +16,8 @@ class VirtualMicSink(VpAudioSink):
 
     async def open(self):
         def open():
+            # Windows only (pywin32), imported when the device is opened
+            from vpipe.utils.virtual_audio_device_client import VirtualAudioDeviceClient
             self.device = VirtualAudioDeviceClient()
             self.resampler.warmup()
         await asyncio.to_thread(open)
@@ -26,6 +29,16 @@ class VirtualMicSink(VpAudioSink):
                 self.device = None
         await asyncio.to_thread(close)
 
+    def device_frames(self):
+        # written - still queued in the device (int32 stereo 48kHz, 8 bytes a frame)
+        if self.device is None:
+            return None
+        try:
+            used, _ = self.device.get_mic_status()
+        except Exception:
+            return None
+        return self.frames_written - used / 8 * self.audio_config.format.rate / 48000
+
     async def write(self, buf):
         """
         buf: (2048,1), int16 mono 16kHz
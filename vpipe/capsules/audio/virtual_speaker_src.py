@@ -1,15 +1,17 @@
 import asyncio
 import numpy as np
 from vpipe.core.audiosrc import VpAudioSource
-from vpipe.utils.virtual_audio_device_client import VirtualAudioDeviceClient
 from vpipe.utils.cache_resampler import CacheResampler
 
 
 class VpVirtualSpeakerSrc(VpAudioSource):
+    device_clock = True
+
     def __init__(self, name=None, audio_config=None):
         super().__init__(name=name, audio_config=audio_config)
 
         self.device = None
+        self._delivered = 0  # bytes the device actually returned since open
         self.resampler = CacheResampler(
             sr_in=48000,
             sr_out=self.audio_config.format.rate,
@@ -18,8 +20,11 @@ class VpVirtualSpeakerSrc(VpAudioSource):
 
     async def open(self):
         def open():
+            # Windows only (pywin32), imported when the device is opened
+            from vpipe.utils.virtual_audio_device_client import VirtualAudioDeviceClient
             self.device = VirtualAudioDeviceClient()
             self.resampler.warmup()
+        self._delivered = 0
         await asyncio.to_thread(open)
 
     async def close(self):
@@ -29,6 +34,14 @@ class VpVirtualSpeakerSrc(VpAudioSource):
                 self.device = None
         await asyncio.to_thread(close)
 
+    def device_frames(self):
+        # The driver has no speaker status, so count what it delivered
+        # (int16 stereo 48kHz, 4 bytes a frame). A slow device shows up as
+        # short reads; a fast one is only seen as reads that are always full
+        if self.device is None:
+            return None
+        return self._delivered / 4 * self.audio_config.format.rate / 48000
+
     async def read_chunk(self, length):
         fmt = self.audio_config.format
         duration = self.audio_config.block_duration
@@ -44,6 +57,7 @@ class VpVirtualSpeakerSrc(VpAudioSource):
         except Exception:
             data = bytes(src_length)
 
+        self._delivered += len(data)
         if len(data) < src_length:
             data += bytes(src_length - len(data))
 
@@ -1,7 +1,9 @@
+import asyncio
 import numpy as np
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import AsyncIterator
 from vpipe.core.transform import VpBaseTransform
+from vpipe.capsules.services.provider import ServiceProvider, ServiceStatsPublisher
 
 
 class ASRServiceInterface(ABC):
@@ -21,41 +23,82 @@ class ASRServiceInterface(ABC):
         pass
 
     @abstractmethod
-    async def transcribe(self, buf) -> Any:
+    async def send(self, buf):
         """
-        Transcribe audio buffer and return the transcription result.
+        Feed an audio buffer to the service. Must not wait for a transcription result.
 
         Args:
             buf (np.ndarray): Audio data in shape (frames, channels), dtype typically np.int16.
                 The audio should be mono, 16kHz sample rate, and 16-bit format
+        """
+        pass
 
-        Returns:
-            None: If no transcription result is available yet.
-            tuple[str, bool]: (transcribed_text, is_final) if a result is available.
+    @abstractmethod
+    def results(self) -> AsyncIterator[tuple[str, bool]]:
+        """
+        Async stream of transcription results, yielded as soon as the service produces them.
+
+        Yields:
+            tuple[str, bool]: (transcribed_text, is_final)
                 - transcribed_text (str): The recognized text.
                 - is_final (bool): True if this is a final result, False if partial/intermediate.
         """
         pass
-        
+
     async def switch_lang(self, lang):
         """
         Implement this method if the service supports dynamic language switching.
         """
         raise NotImplementedError("This service does not support language setting at runtime.")
 
+    async def pause(self):
+        """
+        Implement this method if the service can stay connected without receiving audio.
+        While paused, `send` is not called; `keepalive` is called periodically instead.
+        """
+        raise NotImplementedError("This service does not support pausing.")
+
+    async def resume(self):
+        """Resume a paused service. Audio input continues through `send`."""
+        raise NotImplementedError("This service does not support pausing.")
+
+    async def keepalive(self):
+        """Keep a paused connection open without streaming audio."""
+        raise NotImplementedError("This service does not support keepalive.")
+
+    def clear_results(self):
+        """Drop results not consumed yet, before a pooled service serves a new session."""
+        pass
+
 
 class ASRTransform(VpBaseTransform):
     """
-    currently: forward silently to service in case disabled to keep ASR
-    service connection alive
-    future: delegate to service if it supports dynamic enabling/disabling
+    Audio in is fire-and-forget: `transform` only feeds the service.
+    Results are pushed to (out) by a dedicated task as soon as the service
+    emits them, independent of the audio block cadence.
+
+    When disabled, the service is paused and kept alive with `keepalive`
+    every KEEPALIVE_INTERVAL_S. Services without pause support fall back to
+    receiving silence so the connection stays open.
+
+    "service-reload" swaps in a service built from the current settings
+    between two blocks. The old one keeps forwarding its last results for
+    RELOAD_GRACE_S before it is released.
     """
-    def __init__(self, name, service_factory, lang='en'):
+    KEEPALIVE_INTERVAL_S = 5.0
+    RELOAD_GRACE_S = 2.0
+
+    def __init__(self, name, service_factory=None, lang='en', service_provider=None):
         super().__init__(name=name)
         self.service_factory = service_factory
+        self.service_provider = service_provider or ServiceProvider(service_factory)
         self.service = None
         self.enable = True
         self.lang = lang
+        self._results_task = None
+        self._paused = False
+        self._last_keepalive = 0.0
+        self.stats_publisher = ServiceStatsPublisher(self)
 
     def set_service(self, service: ASRServiceInterface):
         self.service = service
@@ -64,6 +107,7 @@ class ASRTransform(VpBaseTransform):
         match key:
             case "enable":
                 self.enable = value
+                await self._apply_enable()
             case "lang":
                 self.lang = value
                 # 1. If service is not started, nothing to do
@@ -73,15 +117,17 @@ class ASRTransform(VpBaseTransform):
                 # -> Try to switch language if supported
                 try:
                     await self.service.switch_lang(value)
+                    self.service_provider.lang_switched(self.service, value)
                 # 3. Fail to switch language, don't care the reason
                 #    (service does not support language switching, switching failed, ...)
                 # -> Restart service to apply new language setting
                 except Exception as e:
                     self.logger.warning(f"Can not switch language dynamically")
                     self.logger.warning(f"Try to restart service to apply new language")
-                    # Restart service to apply new language setting
-                    await self._restart_service()
-                
+                    # Restart service to apply new language setting, once per set_props batch
+                    await self.schedule_restart(self._restart_service)
+            case "service-reload":
+                await self._reload_service()
             case _:
                 raise AttributeError(f"Unknown property: {key}")
 
@@ -95,20 +141,84 @@ class ASRTransform(VpBaseTransform):
         await self.stop()
         await self.start()
         self.enable = enabled
+        await self._apply_enable()
+
+    async def _reload_service(self):
+        if not self.service or self.service_provider.is_current(self.service, lang=self.lang):
+            return
+        service = await self.service_provider.acquire(lang=self.lang)
+        old, old_results = self.service, self._results_task
+        self.service, self._paused = service, False
+        self._results_task = asyncio.create_task(self._forward_results(service))
+        await self._apply_enable()
+        self.logger.info(f"ASR service {old.__class__.__name__} replaced by {service.__class__.__name__}")
+
+        async def drain():
+            old_results.cancel()
+            await asyncio.gather(old_results, return_exceptions=True)
+        self.service_provider.retire(old, self.RELOAD_GRACE_S, drain)
+
+    async def _apply_enable(self):
+        if not self.service:
+            return
+        try:
+            if self.enable and self._paused:
+                await self.service.resume()
+                self._paused = False
+            elif not self.enable and not self._paused:
+                await self.service.pause()
+                self._paused = True
+                self._last_keepalive = asyncio.get_running_loop().time()
+        except NotImplementedError:
+            # Service can not pause, keep streaming silence instead
+            self._paused = False
+
+    async def _keepalive(self):
+        now = asyncio.get_running_loop().time()
+        if now - self._last_keepalive < self.KEEPALIVE_INTERVAL_S:
+            return
+        self._last_keepalive = now
+        try:
+            await self.service.keepalive()
+        except NotImplementedError:
+            pass
 
     async def start(self):
-        self.service = self.service_factory(lang=self.lang)
-        self.logger.info(f"Starting ASR service: {self.service.__class__.__name__}")
-        await self.service.start()
+        self.logger.info(f"Acquiring ASR service for lang: {self.lang}")
+        self.service = await self.service_provider.acquire(lang=self.lang)
+        self._paused = False
+        self._results_task = asyncio.create_task(self._forward_results(self.service))
         self.logger.info(f"ASR service {self.service.__class__.__name__} started")
+        await self._apply_enable()
 
     async def stop(self):
+        if self._results_task:
+            self._results_task.cancel()
+            await asyncio.gather(self._results_task, return_exceptions=True)
+            self._results_task = None
         if self.service:
-            self.logger.info(f"Stopping ASR service: {self.service.__class__.__name__}")
-            await self.service.stop()
-            self.logger.info(f"ASR service {self.service.__class__.__name__} stopped")
+            self.logger.info(f"Releasing ASR service: {self.service.__class__.__name__}")
+            service, self.service = self.service, None
+            await self.service_provider.release(service)
+            self.logger.info(f"ASR service {service.__class__.__name__} released")
+
+    async def _forward_results(self, service):
+        try:
+            async for result in service.results():
+                if result:
+                    await self.out.push(result)
+                    self.stats_publisher.publish(service)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.error(f"ASR result stream failed: {e}")
 
     async def transform(self, buf):
+        if self.service is None:
+            return
         if not self.enable:
+            if self._paused:
+                await self._keepalive()
+                return
             buf = np.zeros_like(buf)
-        return await self.service.transcribe(buf)
+        await self.service.send(buf)
@@ -0,0 +1,76 @@
+import asyncio
+import time
+from vpipe.core.bus import VpBusMessage
+
+_retiring = set()  # strong references to background releases
+
+
+class ServiceProvider:
+    """
+    Hands started services to service transforms and takes them back when
+    the transform stops. The default provider builds a fresh service with
+    `factory` on every acquire and stops it on release; providers backed by
+    a pool can keep released services connected for the next acquire.
+    """
+    def __init__(self, factory):
+        self.factory = factory
+
+    async def acquire(self, **kwargs):
+        service = self.factory(**kwargs)
+        await service.start()
+        return service
+
+    async def release(self, service):
+        await service.stop()
+
+    def lang_switched(self, service, lang):
+        """`service` was switched to `lang` in place."""
+        pass
+
+    def is_current(self, service, **kwargs):
+        """
+        Whether an acquire now would hand out a service like `service`.
+        Factory services are rebuilt on every reload.
+        """
+        return False
+
+    def retire(self, service, grace, drain=None):
+        """
+        Release `service` after `grace` seconds in the background, so calls
+        already in flight on it complete; `drain()` runs first. Returns the task.
+        """
+        async def retire():
+            await asyncio.sleep(grace)
+            if drain is not None:
+                await drain()
+            await self.release(service)
+        task = asyncio.create_task(retire())
+        _retiring.add(task)
+        task.add_done_callback(_retiring.discard)
+        return task
+
+
+class ServiceStatsPublisher:
+    """
+    Posts the stats snapshot of an instrumented service (one exposing
+    `stats.snapshot()`) as a "service-stats" bus message, at most once
+    every `interval` seconds.
+    """
+    def __init__(self, capsule, interval=2.0):
+        self.capsule = capsule
+        self.interval = interval
+        self._last = None
+
+    def publish(self, service):
+        stats = getattr(service, "stats", None)
+        if stats is None:
+            return
+        now = time.monotonic()
+        if self._last is not None and now - self._last < self.interval:
+            return
+        self._last = now
+        self.capsule.post_message(VpBusMessage(
+            msg_type="service-stats",
+            payload=stats.snapshot(),
+            source=self.capsule
+        ))
@@ -1,5 +1,8 @@
+import asyncio
 from abc import ABC, abstractmethod
 from vpipe.core.transform import VpBaseTransform
+from vpipe.core.bus import VpBusMessage
+from vpipe.capsules.services.provider import ServiceProvider, ServiceStatsPublisher
 
 
 class TranslatorServiceInterface(ABC):
@@ -24,13 +27,125 @@ class TranslatorServiceInterface(ABC):
         pass
 
 
+class SpeculativeTranslator:
+    """
+    Translates stable interim prefixes before the final transcript lands.
+
+    A prefix is stable when two consecutive interim hypotheses agree on it.
+    When the final arrives, an exact match is reused as is; a cached prefix
+    ending at a clause boundary is extended by translating only the rest.
+    Every other speculative request of the utterance is discarded.
+    """
+    CLAUSE_END = tuple(".,;:!?。、！？")
+
+    def __init__(self, translate, min_words=3, max_inflight=2, max_pending=4):
+        self._translate = translate
+        self.min_words = min_words
+        self.max_inflight = max_inflight
+        self.max_pending = max_pending
+        self._entries = {}   # prefix -> task, current utterance
+        self._pending = {}   # final text -> entries of a finished utterance
+        self._last_words = None
+        self.stats = {"finals": 0, "hits": 0, "extended": 0, "misses": 0,
+                      "requests": 0, "wasted": 0}
+
+    def offer(self, text, is_final):
+        words = text.split()
+        if is_final:
+            self._pending[" ".join(words)] = self._entries
+            self._entries = {}
+            self._last_words = None
+            while len(self._pending) > self.max_pending:
+                self._discard(self._pending.pop(next(iter(self._pending))))
+            return
+
+        prev, self._last_words = self._last_words, words
+        if prev is None:
+            return
+        n = 0
+        for a, b in zip(prev, words):
+            if a != b:
+                break
+            n += 1
+        stable = n >= self.min_words or (n and n == len(words) == len(prev))
+        prefix = " ".join(words[:n])
+        inflight = sum(1 for t in self._entries.values() if not t.done())
+        if stable and prefix not in self._entries and inflight < self.max_inflight:
+            self.stats["requests"] += 1
+            self._entries[prefix] = asyncio.create_task(self._translate(prefix))
+
+    async def resolve(self, text):
+        text = " ".join(text.split())
+        entries = self._pending.pop(text, None) or {}
+        self.stats["finals"] += 1
+        try:
+            if text in entries:
+                result = await self._result(entries.pop(text))
+                if result is not None:
+                    self.stats["hits"] += 1
+                    return result
+
+            for prefix in sorted(entries, key=len, reverse=True):
+                if text.startswith(prefix + " ") and prefix.endswith(self.CLAUSE_END):
+                    head = await self._result(entries.pop(prefix))
+                    if head is None:
+                        break
+                    tail = await self._translate(text[len(prefix) + 1:])
+                    self.stats["extended"] += 1
+                    return f"{head} {tail}"
+
+            self.stats["misses"] += 1
+            return await self._translate(text)
+        finally:
+            self._discard(entries)
+
+    def reset(self):
+        self._discard(self._entries)
+        for entries in self._pending.values():
+            self._discard(entries)
+        self._entries = {}
+        self._pending = {}
+        self._last_words = None
+
+    def report(self):
+        finals = self.stats["finals"]
+        hits = self.stats["hits"] + self.stats["extended"]
+        return dict(self.stats, hit_rate=hits / finals if finals else 0.0)
+
+    async def _result(self, task):
+        try:
+            return await task
+        except Exception:
+            return None
+
+    def _discard(self, entries):
+        for task in entries.values():
+            task.cancel()
+            self.stats["wasted"] += 1
+
+
 class TranslationTransform(VpBaseTransform):
-    def __init__(self, name=None, service_factory=None, src: str = 'en', dest: str = 'vi'):
+    """
+    (in): final transcript text
+    (interim): (text, is_final) ASR results, used only in speculative mode
+
+    "service-reload" swaps in a service built from the current settings;
+    requests in flight finish on the old one within RELOAD_GRACE_S.
+    """
+    RELOAD_GRACE_S = 5.0
+
+    def __init__(self, name=None, service_factory=None, src: str = 'en', dest: str = 'vi',
+                 service_provider=None, speculative=False):
         super().__init__(name=name)
         self.service_factory = service_factory
+        self.service_provider = service_provider or ServiceProvider(service_factory)
         self.service = None
         self.src = src
         self.dest = dest
+        self.speculative = speculative
+        self.speculation = SpeculativeTranslator(self._translate)
+        self.stats_publisher = ServiceStatsPublisher(self)
+        self.add_input("interim")
 
     def set_service(self, service: TranslatorServiceInterface):
         self.service = service
@@ -39,8 +154,15 @@ class TranslationTransform(VpBaseTransform):
         match key:
             case 'src-lang':
                 self.src = value
+                self.speculation.reset()
             case 'dest-lang':
                 self.dest = value
+                self.speculation.reset()
+            case 'speculative':
+                self.speculative = value
+                self.speculation.reset()
+            case 'service-reload':
+                await self._reload_service()
             case _:
                 raise ValueError(f"Unknown property: {key}")
     
@@ -50,21 +172,55 @@ class TranslationTransform(VpBaseTransform):
                 return self.src
             case 'dest-lang':
                 return self.dest
+            case 'speculative':
+                return self.speculative
             case _:
                 raise ValueError(f"Unknown property: {key}")
 
     async def start(self):
-        self.service = self.service_factory()
-        self.logger.info(f"Starting translation service: {self.service.__class__.__name__}")
-        await self.service.start()
-        self.logger.info(f"Translation service {self.service.__class__.__name__} started")
+        self.service = await self.service_provider.acquire()
+        self.logger.info(f"Translation service {self.service.__class__.__name__} acquired")
+
+    async def _reload_service(self):
+        if not self.service or self.service_provider.is_current(self.service):
+            return
+        service = await self.service_provider.acquire()
+        old, self.service = self.service, service
+        self.logger.info(f"Translation service {old.__class__.__name__} replaced by {service.__class__.__name__}")
+        self.service_provider.retire(old, self.RELOAD_GRACE_S)
 
     async def stop(self):
+        if self.speculative:
+            self.logger.info(f"Speculation report: {self.speculation.report()}")
+        self.speculation.reset()
         if self.service:
-            self.logger.info(f"Stopping translation service: {self.service.__class__.__name__}")
-            await self.service.stop()
-            self.logger.info(f"Translation service {self.service.__class__.__name__} stopped")
+            service, self.service = self.service, None
+            await self.service_provider.release(service)
+            self.logger.info(f"Translation service {service.__class__.__name__} released")
+
+    async def _handle_input(self, name, data):
+        if name == "interim":
+            if self.speculative and self.service is not None and data:
+                self.speculation.offer(*data)
+            return
+        await super()._handle_input(name, data)
+
+    async def _translate(self, text):
+        return await self.service.translate(text, src=self.src, dest=self.dest)
 
     async def transform(self, text) -> str:
-        translated_text = await self.service.translate(text, src=self.src, dest=self.dest)
+        if self.service is None:
+            return None
+        if not self.speculative:
+            translated_text = await self._translate(text)
+            self.stats_publisher.publish(self.service)
+            return translated_text
+
+        translated_text = await self.speculation.resolve(text)
+        self.stats_publisher.publish(self.service)
+        self.post_message(VpBusMessage(
+            msg_type="speculation",
+            payload=self.speculation.report(),
+            source=self
+        ))
         return translated_text
\ No newline at end of file
@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
 from vpipe.core.transform import VpBaseTransform
+from vpipe.capsules.services.provider import ServiceProvider, ServiceStatsPublisher
 
 
 class TTSServiceInterface(ABC):
@@ -30,12 +31,20 @@ class TTSServiceInterface(ABC):
 
 
 class TTSTransform(VpBaseTransform):
-    def __init__(self, name=None, service_factory=None, lang='en'):
+    """
+    "service-reload" swaps in a service built from the current settings;
+    syntheses in flight finish on the old one within RELOAD_GRACE_S.
+    """
+    RELOAD_GRACE_S = 5.0
+
+    def __init__(self, name=None, service_factory=None, lang='en', service_provider=None):
         super().__init__(name=name)
         self.service_factory = service_factory
+        self.service_provider = service_provider or ServiceProvider(service_factory)
         self.service = None
         self.lang = lang
         self.enable = True
+        self.stats_publisher = ServiceStatsPublisher(self)
 
     def set_service(self, service: TTSServiceInterface):
         self.service = service
@@ -46,6 +55,8 @@ class TTSTransform(VpBaseTransform):
                 self.lang = value
             case 'enable':
                 self.enable = value
+            case 'service-reload':
+                await self._reload_service()
             case _:
                 raise ValueError(f"Unknown property: {key}")
     
@@ -57,18 +68,25 @@ class TTSTransform(VpBaseTransform):
                 raise ValueError(f"Unknown property: {key}")
 
     async def start(self):
-        self.service = self.service_factory()
-        self.logger.info(f"Starting TTS service: {self.service.__class__.__name__}")
-        await self.service.start()
-        self.logger.info(f"TTS service {self.service.__class__.__name__} started")
+        self.service = await self.service_provider.acquire()
+        self.logger.info(f"TTS service {self.service.__class__.__name__} acquired")
+
+    async def _reload_service(self):
+        if not self.service or self.service_provider.is_current(self.service):
+            return
+        service = await self.service_provider.acquire()
+        old, self.service = self.service, service
+        self.logger.info(f"TTS service {old.__class__.__name__} replaced by {service.__class__.__name__}")
+        self.service_provider.retire(old, self.RELOAD_GRACE_S)
 
     async def stop(self):
         if self.service:
-            self.logger.info(f"Stopping TTS service: {self.service.__class__.__name__}")
-            await self.service.stop()
-            self.logger.info(f"TTS service {self.service.__class__.__name__} stopped")
+            service, self.service = self.service, None
+            await self.service_provider.release(service)
+            self.logger.info(f"TTS service {service.__class__.__name__} released")
 
     async def transform(self, text: str) -> bytes:
-        if self.enable:
+        if self.enable and self.service is not None:
             audio = await self.service.synthesize(text, lang=self.lang)
+            self.stats_publisher.publish(self.service)
             return audio
\ No newline at end of file
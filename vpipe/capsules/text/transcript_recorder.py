@@ -0,0 +1,236 @@
+"""
+Transcript recording: VpTranscriptRecorder persists ASR and translation
+results with wall-clock timestamps, TranscriptReader reads them back.
+
+Two formats:
+    jsonl   one JSON object per line: {"t", "kind", "text", "final"}
+    binary  b"VPTR\\x01" then records of struct "<dBBI" (time, kind,
+            final, text length) followed by the UTF-8 text
+
+Next to the log, "<log>.idx" holds struct "<dQ" (time, byte offset)
+entries, one every `index_interval` seconds of records, so a reader can
+seek close to a time without scanning the whole log.
+"""
+import asyncio
+import bisect
+import datetime
+import json
+import logging
+import os
+import queue
+import struct
+import threading
+import time
+from pathlib import Path
+from vpipe.core.capsule import VpCapsule
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VPTR\x01"
+RECORD = struct.Struct("<dBBI")
+INDEX_ENTRY = struct.Struct("<dQ")
+KINDS = ("asr", "tran")
+
+
+def encode_record(record, format):
+    if format == "jsonl":
+        return json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+    text = record["text"].encode("utf-8")
+    return RECORD.pack(record["t"], KINDS.index(record["kind"]), bool(record["final"]), len(text)) + text
+
+
+class TranscriptWriter:
+    """
+    Appends records to a log and its index from a background thread.
+    `write` only queues; the thread writes whatever is queued in one batch
+    and fsyncs at most every `fsync_interval` seconds. `close` drains the
+    queue and fsyncs.
+    """
+    def __init__(self, path, format="jsonl", fsync_interval=1.0, index_interval=1.0):
+        if format not in ("jsonl", "binary"):
+            raise ValueError(f"Unknown transcript format: {format}")
+        self.path = Path(path)
+        self.format = format
+        self.fsync_interval = fsync_interval
+        self.index_interval = index_interval
+        self.records = 0
+        self.syncs = 0
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, name=f"transcript-writer-{self.path.name}", daemon=True)
+        self._closed = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._log = open(self.path, "ab")
+        self._index = open(str(self.path) + ".idx", "ab")
+        if format == "binary" and self._log.tell() == 0:
+            self._log.write(MAGIC)
+        self._last_indexed = None
+        self._thread.start()
+
+    def write(self, record):
+        if not self._closed:
+            self._queue.put(record)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        last_sync = time.monotonic()
+        dirty = False
+        done = False
+        while not done:
+            timeout = max(0.0, self.fsync_interval - (time.monotonic() - last_sync)) if dirty else None
+            try:
+                batch = [self._queue.get(timeout=timeout)]
+                while True:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            if None in batch:
+                done = True
+                batch = [record for record in batch if record is not None]
+            try:
+                if batch:
+                    self._write_batch(batch)
+                    dirty = True
+                if dirty and (done or time.monotonic() - last_sync >= self.fsync_interval):
+                    self._sync()
+                    last_sync = time.monotonic()
+                    dirty = False
+            except OSError:
+                logger.exception(f"Failed to write transcript {self.path}")
+
+        self._log.close()
+        self._index.close()
+
+    def _write_batch(self, batch):
+        entries = []
+        chunks = []
+        offset = self._log.tell()
+        for record in batch:
+            if self._last_indexed is None or record["t"] - self._last_indexed >= self.index_interval:
+                entries.append(INDEX_ENTRY.pack(record["t"], offset))
+                self._last_indexed = record["t"]
+            data = encode_record(record, self.format)
+            chunks.append(data)
+            offset += len(data)
+        self._log.write(b"".join(chunks))
+        if entries:
+            self._index.write(b"".join(entries))
+        self.records += len(batch)
+
+    def _sync(self):
+        for f in (self._log, self._index):
+            f.flush()
+            os.fsync(f.fileno())
+        self.syncs += 1
+
+
+class TranscriptReader:
+    """Reads a transcript log, using its index to seek to a start time."""
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self.format = "binary" if f.read(len(MAGIC)) == MAGIC else "jsonl"
+        self._times, self._offsets = [], []
+        index_path = Path(str(self.path) + ".idx")
+        if index_path.exists():
+            data = index_path.read_bytes()
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            for t, offset in INDEX_ENTRY.iter_unpack(data[:usable]):
+                self._times.append(t)
+                self._offsets.append(offset)
+
+    def _seek_offset(self, start):
+        if start is None or not self._offsets:
+            return len(MAGIC) if self.format == "binary" else 0
+        i = bisect.bisect_right(self._times, start) - 1
+        if i < 0:
+            return self._offsets[0]
+        return self._offsets[i]
+
+    def _records(self, f):
+        if self.format == "jsonl":
+            for line in f:
+                if line.endswith(b"\n"):  # skip a torn last line
+                    yield json.loads(line)
+            return
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            t, kind, final, length = RECORD.unpack(header)
+            text = f.read(length)
+            if len(text) < length:
+                return
+            yield {"t": t, "kind": KINDS[kind], "text": text.decode("utf-8"), "final": bool(final)}
+
+    def read(self, start=None, end=None):
+        """Yield records with start <= t < end (either bound may be None)."""
+        with open(self.path, "rb") as f:
+            f.seek(self._seek_offset(start))
+            for record in self._records(f):
+                if start is not None and record["t"] < start:
+                    continue
+                if end is not None and record["t"] >= end:
+                    return
+                yield record
+
+
+class VpTranscriptRecorder(VpCapsule):
+    """
+    Records (asr): (text, is_final) and (tran): text to a transcript log.
+
+    Give `filepath` to append to one log, or `directory` to start a new
+    "<prefix>-<date>-<time>.<ext>" log every time the pipeline starts.
+    Opening, writing and closing happen off the pipeline loop, which only
+    queues records.
+    """
+    def __init__(self, name=None, filepath=None, directory=None, prefix="transcript",
+                 format="jsonl", fsync_interval=1.0, index_interval=1.0):
+        super().__init__(name)
+        if (filepath is None) == (directory is None):
+            raise ValueError("Give either filepath or directory")
+        self.filepath = filepath
+        self.directory = directory
+        self.prefix = prefix
+        self.format = format
+        self.fsync_interval = fsync_interval
+        self.index_interval = index_interval
+        self.writer = None
+        self.add_input("asr").set_activate_handler(self._activate)
+        self.add_input("tran")
+
+    def _log_path(self):
+        if self.filepath is not None:
+            return Path(self.filepath)
+        stamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+        ext = "jsonl" if self.format == "jsonl" else "vptr"
+        return Path(self.directory) / f"{self.prefix}-{stamp}.{ext}"
+
+    async def _activate(self, active):
+        if active and self.writer is None:
+            # mkdir and open can stall on a slow disk, keep them off the loop
+            self.writer = await asyncio.to_thread(TranscriptWriter, self._log_path(), self.format,
+                                                  self.fsync_interval, self.index_interval)
+            self.logger.info(f"Recording transcript to {self.writer.path}")
+        elif not active and self.writer is not None:
+            writer, self.writer = self.writer, None
+            await asyncio.to_thread(writer.close)
+
+    async def _handle_input(self, name, data):
+        if self.writer is None or not data:
+            return
+        match name:
+            case "asr":
+                text, is_final = data
+            case "tran":
+                text, is_final = data, True
+            case _:
+                return
+        self.writer.write({"t": time.time(), "kind": name, "text": text, "final": is_final})
@@ -1,10 +1,14 @@
 import asyncio
-import sounddevice as sd
+from .bus import VpBusMessage
 from .capsule import VpCapsule
+from .clock import DriftCompensator
 from .config import GLOBAL_AUDIO_CONFIG
 
 
 class VpAudioSink(VpCapsule):
+    # Sinks that can report device_frames() slave to the pipeline clock
+    device_clock = False
+
     def __init__(self, name=None, audio_config=None):
         super().__init__(name=name)
         self.audio_config = audio_config or GLOBAL_AUDIO_CONFIG
@@ -12,9 +16,27 @@ class VpAudioSink(VpCapsule):
         self.inp = self.add_input("in")
         self.inp.set_activate_handler(self._src_active)
         self._src_lock = asyncio.Lock()
-    
+        self.frames_written = 0
+        self.clock_slave = None
+        self._compensator = None
+
+    def use_clock(self, clock):
+        if not self.device_clock:
+            return
+        fmt = self.audio_config.format
+        self.clock_slave = clock.slave(self.path, fmt.rate)
+        self._compensator = DriftCompensator(fmt.channels, fmt.dtype)
+
+    def device_frames(self):
+        """Frames the device has played so far, give or take a constant; None if unknown."""
+        return None
+
     async def _src_active(self, active):
         if active:
+            self.frames_written = 0
+            if self.clock_slave is not None:
+                self.clock_slave.reset()
+                self._compensator.reset()
             await self.open()
         else:
             async def safe_close():
@@ -24,7 +46,20 @@ class VpAudioSink(VpCapsule):
     
     async def _handle_input(self, _, buf):
         async with self._src_lock:
+            if self._compensator is None:
+                await self.write(buf)
+                return
+            # Resample the clock's nominal rate to the device's
+            slave = self.clock_slave
+            buf = self._compensator.process(buf, slave.ratio)
             await self.write(buf)
+            self.frames_written += len(buf)
+            frames = self.device_frames()
+            if frames is not None:
+                slave.observe(frames)
+            report = slave.poll_report()
+            if report is not None:
+                self.post_message(VpBusMessage(msg_type="clock-drift", payload=report, source=self))
 
     async def open(self):
         pass
@@ -1,5 +1,7 @@
 import asyncio
 from .basesrc import VpBaseSource
+from .bus import VpBusMessage
+from .clock import DriftCompensator
 from vpipe.core.config import GLOBAL_AUDIO_CONFIG, AudioConfig
 
 
@@ -21,24 +23,69 @@ def timing_control(cycle_s_attr="cycle_s", next_time_attr="next_time"):
 
 
 class VpAudioSource(VpBaseSource):
-    def __init__(self, name=None, audio_config: AudioConfig = None):
-        super().__init__(name)
+    # Sources that can report device_frames() slave to the pipeline clock
+    device_clock = False
+
+    def __init__(self, name=None, audio_config: AudioConfig = None, realtime=True):
+        super().__init__(name, realtime=realtime)
         self.audio_config = audio_config or GLOBAL_AUDIO_CONFIG
 
         self.cycle_s = self.audio_config.block_duration
         self.next_time = None
+        self.frames_read = 0
+        self.clock_slave = None
+        self._compensator = None
+
+    def use_clock(self, clock):
+        if not self.device_clock:
+            return
+        fmt = self.audio_config.format
+        self.clock_slave = clock.slave(self.path, fmt.rate)
+        self._compensator = DriftCompensator(fmt.channels, fmt.dtype)
+
+    def device_frames(self):
+        """Frames the device has produced so far, including ones not read yet; None if unknown."""
+        return None
 
     async def start(self):
         await self.open()
         self.next_time = asyncio.get_running_loop().time()
+        self.frames_read = 0
+        if self.clock_slave is not None:
+            self.clock_slave.reset()
+            self._compensator.reset()
 
     async def stop(self):
         await self.close()
         self.next_time = None
 
-    @timing_control(cycle_s_attr="cycle_s", next_time_attr="next_time")
     async def read(self):
-        return await self.read_chunk(self.audio_config.blocksize)
+        if not self.realtime:
+            return await self._read_block()
+        return await self._paced_read()
+
+    @timing_control(cycle_s_attr="cycle_s", next_time_attr="next_time")
+    async def _paced_read(self):
+        return await self._read_block()
+
+    async def _read_block(self):
+        blocksize = self.audio_config.blocksize
+        if self._compensator is None:
+            return await self.read_chunk(blocksize)
+        # Resample the device's rate to the clock's nominal one; blocks
+        # downstream stay `blocksize` frames
+        slave = self.clock_slave
+        while self._compensator.available < blocksize:
+            block = await self.read_chunk(blocksize)
+            self.frames_read += len(block)
+            frames = self.device_frames()
+            if frames is not None:
+                slave.observe(frames)
+            self._compensator.push(block, 1.0 / slave.ratio)
+        report = slave.poll_report()
+        if report is not None:
+            self.post_message(VpBusMessage(msg_type="clock-drift", payload=report, source=self))
+        return self._compensator.pop(blocksize)
 
     async def open(self):
         raise NotImplementedError("Subclasses must implement open().")
@@ -1,12 +1,23 @@
 import asyncio
 from vpipe.core.capsule import VpCapsule, VpState, VpStateTransition
+from vpipe.core.bus import VpBusMessage
 
 class VpBaseSource(VpCapsule):
-    def __init__(self, name=None):
+    """
+    A realtime source (mic, device loopback) produces at its own pace; a
+    push downstream has no credits for is counted in `overflows`, and an
+    "overflow" message is posted when a run of them starts. A non-realtime
+    source (file, generator) only reads once downstream has credits, so it
+    runs as fast as the slowest stage without drops.
+    """
+    def __init__(self, name=None, realtime=True):
         super().__init__(name)
         self.out = self.add_output("out")
         self.out.set_activate_handler(self._src_active)
         self._src_lock = asyncio.Lock()
+        self.realtime = realtime
+        self.overflows = 0
+        self._overflowing = False
 
     def play(self):
         self.out.start_task(self._src_loop)
@@ -22,14 +33,33 @@ class VpBaseSource(VpCapsule):
             asyncio.create_task(safe_close())
 
     async def _src_loop(self):
-        if self.state in (VpState.PAUSED, VpState.RUNNING):        
+        if self.state in (VpState.PAUSED, VpState.RUNNING):
+            if not self.realtime and self.state == VpState.RUNNING:
+                if not await self.out.wait_credits(timeout=0.1):
+                    return
+
             async with self._src_lock:
                 data = await self.read()
 
             if self.state == VpState.RUNNING and data is not None:
+                if self.realtime:
+                    self._count_overflow()
                 await self.out.push(data)
         await asyncio.sleep(0)
 
+    def _count_overflow(self):
+        if self.out.credits() > 0:
+            self._overflowing = False
+            return
+        self.overflows += 1
+        if not self._overflowing:
+            self._overflowing = True
+            self.post_message(VpBusMessage(
+                msg_type="overflow",
+                payload={"overflows": self.overflows},
+                source=self
+            ))
+
     async def start(self):
         raise NotImplementedError("Subclasses must implement open.")
 
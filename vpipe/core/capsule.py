@@ -1,6 +1,8 @@
 __author__ = "DuyNV4 <duynv4@fpt.com>"
 
 import asyncio
+import contextvars
+import time
 from enum import Enum
 from .port import VpPort
 from .vpobject import VpObject
@@ -33,6 +35,10 @@ class VpStateTransition(Enum):
         return self.value
 
 
+# Restarts deferred by the set_props batch running in the current task
+_pending_restarts = contextvars.ContextVar("vp_pending_restarts", default=None)
+
+
 class VpCapsule(VpObject):
     def __init__(self, name=None):
         super().__init__(name)
@@ -93,6 +99,48 @@ class VpCapsule(VpObject):
     async def _handle_input(self, name, data):
         raise NotImplementedError
 
+    async def set_prop(self, prop, value):
+        raise ValueError(f"Unknown property: {prop}")
+
+    async def set_props(self, props):
+        """
+        Apply a dict of properties in order. Restarts requested with
+        `schedule_restart` while the batch runs are merged and run once,
+        after every property is set. Nested batches join the outer one.
+        Returns the apply time of each property, and of each restart under
+        "restart:<capsule path>", in seconds.
+        """
+        restarts = _pending_restarts.get()
+        outermost = restarts is None
+        if outermost:
+            restarts = {}
+            token = _pending_restarts.set(restarts)
+        timings = {}
+        try:
+            for prop, value in props.items():
+                started = time.perf_counter()
+                await self.set_prop(prop, value)
+                timings[prop] = time.perf_counter() - started
+        finally:
+            if outermost:
+                _pending_restarts.reset(token)
+                for restart in restarts:
+                    started = time.perf_counter()
+                    await restart()
+                    timings[f"restart:{restart.__self__.path}"] = time.perf_counter() - started
+        return timings
+
+    async def schedule_restart(self, restart):
+        """
+        Run `restart`, a bound coroutine method, now, or at the end of the
+        enclosing set_props batch. The same method scheduled twice runs once.
+        """
+        restarts = _pending_restarts.get()
+        if restarts is None:
+            await restart()
+        else:
+            restarts[restart] = None
+
     async def run(self):
         pass
 
@@ -0,0 +1,184 @@
+"""
+Pipeline clock and drift compensation between audio devices.
+
+Every audio device runs on its own crystal, so a mic producing "16 kHz"
+and an output device consuming "16 kHz" differ by tens to hundreds of
+ppm. Over a long call the difference piles up in the queues between them
+until one overflows and drops a block.
+
+The outermost VpPipeline owns a VpClock (monotonic time). Device sources
+and sinks (`device_clock = True`) get a VpClockSlave from it and report a
+frame counter whose slope is the device's real rate, e.g. frames read
+plus frames still waiting in the device buffer. The slave fits that rate
+against the master clock over a sliding window, and a DriftCompensator
+resamples the device's audio by the estimated ratio with linear
+interpolation, so everything between source and sink runs at the nominal
+rate of the master clock. No blocks are dropped or inserted: the ratio
+moves the stream by fractions of a frame.
+"""
+import math
+import time
+from collections import deque
+import numpy as np
+
+
+def distribute_clock(capsule, clock):
+    """Offer `clock` to `capsule` and every capsule nested in it."""
+    if hasattr(capsule, "use_clock"):
+        capsule.use_clock(clock)
+    for child in getattr(capsule, "_capsules", ()):
+        distribute_clock(child, clock)
+
+
+class VpClock:
+    """Master clock of a pipeline; hands out one slave per device."""
+    def __init__(self, name=None):
+        self.name = name
+        self._slaves = {}
+
+    def time(self):
+        return time.monotonic()
+
+    def slave(self, name, nominal_rate):
+        slave = self._slaves.get(name)
+        if slave is None or slave.nominal_rate != nominal_rate:
+            slave = self._slaves[name] = VpClockSlave(self, name, nominal_rate)
+        return slave
+
+    def report(self):
+        return {name: slave.report() for name, slave in self._slaves.items()}
+
+
+class VpClockSlave:
+    """
+    Estimates one device's frame rate against the master clock by least
+    squares over the last `window` seconds of `observe` calls. `ratio` is
+    device rate / nominal rate, 1.0 until `min_span` seconds have been
+    observed, and clamped to +-`max_ppm`.
+    """
+    def __init__(self, clock, name, nominal_rate, window=60.0, min_span=5.0, max_ppm=1000.0,
+                 report_interval=10.0):
+        self.clock = clock
+        self.name = name
+        self.nominal_rate = nominal_rate
+        self.window = window
+        self.min_span = min_span
+        self.max_ppm = max_ppm
+        self.report_interval = report_interval
+        self._points = deque()
+        self._ratio = None
+        self._last_report = None
+
+    def reset(self):
+        self._points.clear()
+        self._ratio = None
+        self._last_report = None
+
+    def observe(self, device_frames, t=None):
+        t = self.clock.time() if t is None else t
+        points = self._points
+        points.append((t, device_frames))
+        while points and t - points[0][0] > self.window:
+            points.popleft()
+        self._ratio = None
+
+    @property
+    def ratio(self):
+        if self._ratio is None:
+            self._ratio = self._fit()
+        return self._ratio
+
+    @property
+    def drift_ppm(self):
+        return (self.ratio - 1.0) * 1e6
+
+    def _fit(self):
+        points = self._points
+        if len(points) < 3 or points[-1][0] - points[0][0] < self.min_span:
+            return 1.0
+        t0, f0 = points[0]
+        n = len(points)
+        sum_t = sum_f = sum_tt = sum_tf = 0.0
+        for t, f in points:
+            t -= t0
+            f -= f0
+            sum_t += t
+            sum_f += f
+            sum_tt += t * t
+            sum_tf += t * f
+        denominator = n * sum_tt - sum_t * sum_t
+        if denominator <= 0:
+            return 1.0
+        rate = (n * sum_tf - sum_t * sum_f) / denominator
+        limit = self.max_ppm * 1e-6
+        return min(max(rate / self.nominal_rate, 1.0 - limit), 1.0 + limit)
+
+    def report(self):
+        span = self._points[-1][0] - self._points[0][0] if self._points else 0.0
+        return {"drift_ppm": round(self.drift_ppm, 1), "span_s": round(span, 1)}
+
+    def poll_report(self):
+        """report() once every `report_interval` seconds, None in between."""
+        now = self.clock.time()
+        if self._last_report is None:
+            self._last_report = now
+        elif now - self._last_report >= self.report_interval:
+            self._last_report = now
+            return self.report()
+        return None
+
+
+class DriftCompensator:
+    """
+    Streaming linear-interpolation resampler for ratios close to 1.
+    `process(block, ratio)` returns about len(block) * ratio frames and
+    carries the fractional position and last frame over to the next block,
+    so the output is continuous. `push` and `pop` add a FIFO for callers
+    that must hand on fixed-size blocks.
+    """
+    def __init__(self, channels, dtype):
+        self.dtype = np.dtype(dtype)
+        self._last = None     # last input frame, float32 (1, channels)
+        self._phase = 0.0     # next output position, in input frames after _last
+        self._fifo = np.zeros((0, channels), dtype=self.dtype)
+
+    def process(self, block, ratio):
+        block = np.asarray(block)
+        if len(block) == 0:
+            return block[:0]
+        samples = block.astype(np.float32)
+        if self._last is None:
+            self._last = samples[:1]
+        x = np.concatenate((self._last, samples))
+        step = 1.0 / ratio
+        end = len(x) - 1
+        count = max(0, math.ceil((end - self._phase) / step))
+        positions = self._phase + step * np.arange(count)
+        index = positions.astype(np.int64)
+        frac = (positions - index)[:, None].astype(np.float32)
+        out = x[index] * (1.0 - frac) + x[np.minimum(index + 1, end)] * frac
+        self._phase = self._phase + count * step - end
+        self._last = x[-1:]
+        return self._cast(out)
+
+    def _cast(self, out):
+        if np.issubdtype(self.dtype, np.integer):
+            info = np.iinfo(self.dtype)
+            return np.clip(np.rint(out), info.min, info.max).astype(self.dtype)
+        return out.astype(self.dtype)
+
+    @property
+    def available(self):
+        return len(self._fifo)
+
+    def push(self, block, ratio):
+        self._fifo = np.concatenate((self._fifo, self.process(block, ratio)))
+
+    def pop(self, length):
+        out, self._fifo = self._fifo[:length], self._fifo[length:]
+        return out
+
+    def reset(self):
+        self._last = None
+        self._phase = 0.0
+        self._fifo = self._fifo[:0]
@@ -0,0 +1,136 @@
+"""
+Compiles port pushes into flat call plans.
+
+An uncompiled VpPort.push walks the graph one hop at a time: the chain
+callback, the push of every linked target, then the data_pushed signal,
+and a VpBaseTransform adds _handle_input and its out.push on top.
+Composites only expose their children's ports, so they add no hops of
+their own. `compile_graph`, run by the outermost VpPipeline on
+READY -> PAUSED, resolves each port once into a single coroutine
+function (its plan):
+
+- linked plain VpPorts are inlined as their own plans,
+- the input of a VpBaseTransform that keeps the stock _handle_input
+  becomes `transform` followed directly by the plan of its out port,
+- data_pushed is only emitted by ports that have listeners.
+
+Plans are stamped with the graph version. link, unlink,
+set_chain_callback and connect_signal("data_pushed") bump it, and a
+port recompiles on its next push. Ports whose push is patched on the
+instance (mocks, probes) are called through `push`, never inlined.
+A `transform` patched on the instance after compiling is not seen
+until the next compile.
+"""
+from . import port as vp_port
+from .port import VpPort
+from .transform import VpBaseTransform
+
+
+def _is_plain(port):
+    return type(port) is VpPort and "push" not in vars(port)
+
+
+def _late_push(target):
+    async def step(data):
+        await target.push(data)
+    return step
+
+
+def _callback_step(port, callback, active):
+    capsule = getattr(callback, "__self__", None)
+    if (isinstance(capsule, VpBaseTransform)
+            and getattr(callback, "__func__", None) is VpBaseTransform._handle_input
+            and "transform" not in vars(capsule)
+            and _is_plain(capsule.out) and capsule.out not in active):
+        transform = capsule.transform
+        out = compile_port(capsule.out, active)
+
+        async def step(data):
+            result = await transform(data)
+            if result is not None:
+                await out(result)
+        return step
+
+    name = port.name
+
+    async def step(data):
+        await callback(name, data)
+    return step
+
+
+def _signal_step(port):
+    async def step(data):
+        port.emit_signal("data_pushed", data=data)
+    return step
+
+
+async def _nothing(data):
+    pass
+
+
+def _chain(steps):
+    if not steps:
+        return _nothing
+    if len(steps) == 1:
+        return steps[0]
+    if len(steps) == 2:
+        first, second = steps
+
+        async def plan(data):
+            await first(data)
+            await second(data)
+        return plan
+    steps = tuple(steps)
+
+    async def plan(data):
+        for step in steps:
+            await step(data)
+    return plan
+
+
+def compile_port(port, _active=None):
+    """Compile `port` and every port its pushes reach; returns its plan."""
+    version = vp_port.graph_version()
+    if port._plan is not None and port._plan_version == version:
+        return port._plan
+    active = set() if _active is None else _active
+    active.add(port)  # ports on the current path are pushed late, so cycles terminate
+    steps = []
+    if port._chain_callback is not None:
+        steps.append(_callback_step(port, port._chain_callback, active))
+    for target in port._targets:
+        if _is_plain(target) and target not in active:
+            steps.append(compile_port(target, active))
+        else:
+            steps.append(_late_push(target))
+    if port._signals.get("data_pushed"):
+        steps.append(_signal_step(port))
+    active.discard(port)
+
+    plan = _chain(steps)
+    port._plan, port._plan_version = plan, version
+    return plan
+
+
+def graph_ports(capsule):
+    """Every port of `capsule` and of the capsules nested in it."""
+    yield from capsule._input_ports.values()
+    yield from capsule._output_ports.values()
+    for child in getattr(capsule, "_capsules", ()):
+        yield from graph_ports(child)
+
+
+def reset_graph(capsule):
+    """Drop the plans of every port under `capsule`, back to hop-by-hop pushes."""
+    for port in graph_ports(capsule):
+        port._plan = None
+        port._plan_version = -1
+
+
+def compile_graph(capsule):
+    """(Re)compile every port under `capsule`. Returns the number of ports."""
+    ports = list(dict.fromkeys(graph_ports(capsule)))
+    reset_graph(capsule)
+    for port in ports:
+        compile_port(port)
+    return len(ports)
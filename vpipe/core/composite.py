@@ -1,6 +1,8 @@
 import asyncio
-from vpipe.core.capsule import VpCapsule
+from vpipe.core.capsule import VpCapsule, VpState
 from vpipe.core.bus import VpBus
+from vpipe.core.clock import distribute_clock
+from vpipe.core.compiler import graph_ports
 
 class VpComposite(VpCapsule):
     def __init__(self, name=None):
@@ -8,6 +10,7 @@ class VpComposite(VpCapsule):
         self._capsules = []
         self._input_ports = {}
         self._output_ports = {}
+        self._retiring = set()  # strong references to replace() teardowns
         self._sbus = VpBus(self.name + "-sbus" if name else None)
         self._sbus.add_watch(self._sbus_message_handler)
 
@@ -26,9 +29,93 @@ class VpComposite(VpCapsule):
                 return capsule
         return None
 
+    async def set_prop(self, prop, value):
+        # "child/prop" addresses a property of a child capsule
+        name, sep, child_prop = prop.partition("/")
+        capsule = self.get_capsule(name) if sep else None
+        if capsule is None:
+            raise ValueError(f"Unknown property: {prop}")
+        await capsule.set_prop(child_prop, value)
+
     def remove(self, capsule):
         if capsule in self._capsules:
             self._capsules.remove(capsule)
+
+    async def replace(self, old, new, grace=2.0):
+        """
+        Swap child `old` for `new` while the graph runs. `new` is brought to
+        PAUSED first (ports active, services acquired), then every link into
+        and out of `old` moves to the same-named ports of `new` between two
+        pushes, and `new` takes over `old`'s state. `old` is paused and keeps
+        its output links for `grace` seconds, so results still in flight
+        reach downstream, then it is shut down in the background.
+        Returns the teardown task; the composite keeps it alive until done.
+
+        The app does not call this: a service reload swaps the service
+        inside each transform (the "service-reload" prop). It is library
+        API for swapping whole capsules, covered by tests/test_hot_swap.py.
+        """
+        if old not in self._capsules:
+            raise ValueError(f"{old.name} is not a child of {self.name}")
+        ancestors = [self]
+        while ancestors[-1].parent is not None:
+            ancestors.append(ancestors[-1].parent)
+        root = ancestors[-1]
+        exposed = {port for composite in ancestors
+                   for port in (*composite._input_ports.values(), *composite._output_ports.values())}
+        try:
+            inputs = {port: new.get_input(name) for name, port in old._input_ports.items()}
+            outputs = {port: new.get_output(name) for name, port in old._output_ports.items()
+                       if port._targets or port._chain_callback or port in exposed}
+        except KeyError as e:
+            raise ValueError(f"{new.name} has no port {e} to take over from {old.name}") from None
+
+        state = old.state
+        new.parent = self
+        new.bus = self._sbus
+        self._capsules[self._capsules.index(old)] = new
+        clock = getattr(root, "clock", None)
+        if clock is not None:
+            distribute_clock(new, clock)
+        await new.set_state(min(state, VpState.PAUSED, key=lambda s: s.value))
+
+        # No await from here to the relinks: no push sees half a swap
+        internal = set(graph_ports(old))
+        for old_out, new_out in outputs.items():
+            for target in old_out._targets:
+                if target not in internal:
+                    new_out.link(target)
+            if old_out._chain_callback is not None and new_out._chain_callback is None:
+                new_out.set_chain_callback(old_out._chain_callback)
+        for port in graph_ports(root):
+            for target in list(port._targets):
+                if target in inputs:
+                    port.relink(target, inputs[target])
+        # Ports exposed by this composite and its ancestors follow the swap
+        moved = {**inputs, **outputs}
+        for composite in ancestors:
+            for ports in (composite._input_ports, composite._output_ports):
+                for name, port in ports.items():
+                    if port in moved:
+                        ports[name] = moved[port]
+
+        await new.set_state(state)
+        if state == VpState.RUNNING:
+            await old.set_state(VpState.PAUSED)
+
+        async def retire():
+            await asyncio.sleep(grace)
+            await old.set_state(VpState.NULL)
+            for old_out in outputs:
+                for target in list(old_out._targets):
+                    if target not in internal:
+                        old_out.unlink(target)
+            old.parent = None
+            self.logger.info(f"Replaced {old.name} with {new.name}")
+        task = asyncio.create_task(retire())
+        self._retiring.add(task)
+        task.add_done_callback(self._retiring.discard)
+        return task
     
     async def change_state(self, transition):
         current_state, next_state = transition.to_states()
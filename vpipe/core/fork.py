@@ -13,6 +13,7 @@ class VpFork(VpCapsule):
         port_name = name or f"out{index}"
         port = self.add_output(port_name)
         self._src_ports.append(port)
+        self._in.forward_credits(*self._src_ports)
         return port
 
     async def _on_data(self, _, data):
@@ -1,9 +1,21 @@
 import asyncio
+from vpipe.core.capsule import VpStateTransition
 from vpipe.core.composite import VpComposite
 from vpipe.core.bus import VpBus
+from vpipe.core.clock import VpClock, distribute_clock
+from vpipe.core.compiler import compile_graph
 
 
 class VpPipeline(VpComposite):
     def __init__(self, name=None):
         super().__init__(name)
         self.bus = VpBus(name + "-bus" if name else None)
+        self.clock = VpClock(name)
+
+    async def change_state(self, transition):
+        # The outermost pipeline compiles push plans for the whole graph
+        # and is the master clock for every device in it
+        if transition == VpStateTransition.READY_TO_PAUSED and self.parent is None:
+            compile_graph(self)
+            distribute_clock(self, self.clock)
+        return await super().change_state(transition)
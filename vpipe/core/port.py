@@ -2,7 +2,21 @@ __author__ = "DuyNV4 <duynv4@fpt.com>"
 
 from .vpobject import VpObject
 from .task import VpTask
+from .probe import VpProbe, VpProbeReturn, VpProbeType
 import asyncio
+import math
+
+# Bumped on every graph edit; compiled push plans older than this are stale
+_graph_version = 0
+
+
+def graph_version():
+    return _graph_version
+
+
+def invalidate_plans():
+    global _graph_version
+    _graph_version += 1
 
 
 class VpPort(VpObject):
@@ -12,11 +26,32 @@ class VpPort(VpObject):
         self._chain_callback = None
         self._task = None
         self._activate_handler = None
+        self._plan = None
+        self._plan_version = -1
+        self._probes = ()
+        self._credit_handler = None
+        self._credit_forward = ()
+        self._credit_event = None
+        self._credit_ports = ()
+        self._credit_version = -1
 
     def set_chain_callback(self, callback):
         self._chain_callback = callback
+        invalidate_plans()
+
+    def connect_signal(self, signal_name, callback):
+        super().connect_signal(signal_name, callback)
+        if signal_name == "data_pushed":
+            invalidate_plans()
 
     async def push(self, data):
+        plan = self._plan
+        if plan is not None:
+            if self._plan_version != _graph_version:
+                from .compiler import compile_port
+                plan = compile_port(self)
+            await plan(data)
+            return
         if self._chain_callback:
             await self._chain_callback(self.name, data)
         for t in self._targets:
@@ -26,9 +61,11 @@ class VpPort(VpObject):
     def link(self, target):
         if isinstance(target, VpPort):
             self._targets.append(target)
+            invalidate_plans()
             self.emit_signal("target_linked", target=target)
         elif hasattr(target, "get_input") and "in" in target._input_ports:
             self._targets.append(target.get_input("in"))
+            invalidate_plans()
             self.emit_signal("target_linked", target=target.get_input("in"))
         else:
             raise ValueError("Target must be a VpPort or an capsule with an input port named 'in'.")
@@ -36,10 +73,20 @@ class VpPort(VpObject):
     def unlink(self, target):
         if target in self._targets:
             self._targets.remove(target)
+            invalidate_plans()
             self.emit_signal("target_unlinked", target=target)
         else:
             raise ValueError("Target not linked to this port.")
     
+    def relink(self, old, new):
+        """Replace target `old` with `new` in place: the next push goes to `new`, no push is split."""
+        if old not in self._targets:
+            raise ValueError("Target not linked to this port.")
+        self._targets[self._targets.index(old)] = new
+        invalidate_plans()
+        self.emit_signal("target_unlinked", target=old)
+        self.emit_signal("target_linked", target=new)
+
     def __rshift__(self, target):
         self.link(target)
         return target
@@ -57,8 +104,113 @@ class VpPort(VpObject):
         self._activate_handler = func
 
     async def activate(self, active=True):
+        if self._probes:
+            await self._run_probes(VpProbeType.EVENT, {"event": "activate" if active else "deactivate"})
         if self._activate_handler:
             if asyncio.iscoroutinefunction(self._activate_handler):
                 await self._activate_handler(active)
             else:
                 self._activate_handler(active)
+
+    def set_credit_handler(self, func):
+        """
+        `func()` returns how many more items this port takes without
+        dropping or blocking, e.g. the free slots of a queue. Call
+        `credits_changed` when that number grows.
+        """
+        self._credit_handler = func
+        invalidate_plans()
+
+    def forward_credits(self, *ports):
+        """Pass-through input: its credits are those of `ports`, e.g. a transform's output."""
+        self._credit_forward = ports
+        invalidate_plans()
+
+    def credits_changed(self):
+        if self._credit_event is not None:
+            self._credit_event.set()
+
+    def _find_credit_ports(self, visited, found):
+        visited.add(self)
+        if self._credit_handler is not None:
+            found.append(self)
+            return found
+        for port in (*self._targets, *self._credit_forward):
+            if port not in visited and isinstance(port, VpPort):
+                port._find_credit_ports(visited, found)
+        return found
+
+    def _limit(self):
+        # (credits, port whose handler limits them); math.inf when nothing does.
+        # The ports with handlers are found once per graph version, so a
+        # check costs one handler call per branch instead of a graph walk
+        if self._credit_version != _graph_version:
+            self._credit_ports = tuple(self._find_credit_ports(set(), []))
+            self._credit_version = _graph_version
+        best, limiting = math.inf, None
+        for port in self._credit_ports:
+            credits = port._credit_handler()
+            if credits < best:
+                best, limiting = credits, port
+        return best, limiting
+
+    def credits(self):
+        """How many more items a push here can carry without a drop or a block downstream."""
+        return self._limit()[0]
+
+    async def wait_credits(self, timeout=None):
+        """Wait until `credits()` is positive; returns it, or 0 after `timeout` seconds."""
+        while True:
+            credits, limiting = self._limit()
+            if credits > 0:
+                return credits
+            if limiting._credit_event is None:
+                limiting._credit_event = asyncio.Event()
+            limiting._credit_event.clear()
+            try:
+                await asyncio.wait_for(limiting._credit_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                return 0
+
+    def add_probe(self, mask, callback, every=1, block=False):
+        """Attach a probe (see vpipe.core.probe); returns it for remove_probe."""
+        probe = VpProbe(mask, callback, every, block)
+        if not self._probes:
+            # Shadow push on this instance only; compiled plans stop inlining the port
+            self.push = self._probed_push
+            invalidate_plans()
+        self._probes = self._probes + (probe,)
+        return probe
+
+    def remove_probe(self, probe):
+        if probe not in self._probes:
+            return
+        self._probes = tuple(p for p in self._probes if p is not probe)
+        probe.release()
+        if not self._probes:
+            del self.push
+            invalidate_plans()
+
+    async def notify_drop(self, data):
+        """Report data dropped at this port to its DROP probes."""
+        if self._probes:
+            await self._run_probes(VpProbeType.DROP, data)
+
+    async def _run_probes(self, probe_type, data):
+        result = VpProbeReturn.OK
+        for probe in self._probes:
+            if not probe.mask & probe_type:
+                continue
+            ret, data = await probe.fire(self, probe_type, data)
+            if ret is VpProbeReturn.REMOVE:
+                self.remove_probe(probe)
+            elif ret is VpProbeReturn.DROP:
+                result = ret
+        return result, data
+
+    async def _probed_push(self, data):
+        result, data = await self._run_probes(VpProbeType.BUFFER, data)
+        if result is VpProbeReturn.DROP:
+            await self._run_probes(VpProbeType.DROP, data)
+            return
+        await VpPort.push(self, data)
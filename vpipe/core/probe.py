@@ -0,0 +1,81 @@
+"""
+Port probes: callbacks attached to a VpPort at run time to watch or steer
+what flows through it, after GStreamer's pad probes.
+
+    def on_buffer(port, info):
+        print(port.name, info.index, info.data.shape)
+
+    probe = port.add_probe(VpProbeType.BUFFER, on_buffer, every=50)
+    ...
+    port.remove_probe(probe)
+
+Probe types:
+    BUFFER  data pushed through the port; the probe may replace
+            `info.data`, or return DROP to stop it here
+    EVENT   the port being activated or deactivated,
+            info.data = {"event": "activate" | "deactivate"}
+    DROP    data dropped at the port, by a BUFFER probe or a leaky queue
+
+Callbacks take (port, info), may be sync or async (async ones are
+awaited, so the push waits for them) and return a VpProbeReturn or None
+for OK. `every=N` calls the probe for every Nth item only. A `block`
+probe holds each push at the port until it is removed, e.g. to swap the
+capsule downstream of it.
+
+A port without probes pays nothing: the probed push is only installed
+on the port instance while it has probes.
+"""
+import asyncio
+from dataclasses import dataclass
+from enum import Enum, Flag
+from typing import Any
+
+
+class VpProbeType(Flag):
+    BUFFER = 1
+    EVENT = 2
+    DROP = 4
+    ALL = BUFFER | EVENT | DROP
+
+
+class VpProbeReturn(Enum):
+    OK = 0
+    DROP = 1
+    REMOVE = 2
+
+
+@dataclass
+class VpProbeInfo:
+    type: VpProbeType
+    data: Any
+    index: int  # 1-based count of items of this type seen by the probe
+
+
+class VpProbe:
+    def __init__(self, mask, callback, every=1, block=False):
+        if every < 1:
+            raise ValueError("every must be >= 1")
+        self.mask = mask
+        self.callback = callback
+        self.every = every
+        self.block = block
+        self.seen = {}
+        self._released = asyncio.Event() if block else None
+
+    def release(self):
+        if self._released is not None:
+            self._released.set()
+
+    async def fire(self, port, probe_type, data):
+        """Returns (VpProbeReturn, data) for one item of `probe_type`."""
+        index = self.seen.get(probe_type, 0) + 1
+        self.seen[probe_type] = index
+        if (index - 1) % self.every:
+            return VpProbeReturn.OK, data
+        info = VpProbeInfo(probe_type, data, index)
+        result = self.callback(port, info)
+        if asyncio.iscoroutine(result):
+            result = await result
+        if self.block and probe_type == VpProbeType.BUFFER and result is not VpProbeReturn.REMOVE:
+            await self._released.wait()
+        return result or VpProbeReturn.OK, info.data
@@ -1,6 +1,9 @@
 import asyncio
+import math
+from collections import deque
 from enum import Enum, auto
 
+from .bus import VpBusMessage
 from .capsule import VpCapsule
 
 
@@ -10,16 +13,67 @@ class DrainPolicy(Enum):
     UPSTREAM = auto()
 
 
+def coalesce_audio(older, newer):
+    """Merge consecutive audio blocks into one."""
+    import numpy as np
+    return np.concatenate((older, newer))
+
+
+# Languages written without spaces between sentences
+UNSPACED_LANGS = {"ja", "zh", "th", "lo", "km", "my"}
+
+
+def coalesce_text(older, newer, lang=None):
+    """Merge consecutive final texts into one request, joined the way `lang` is written."""
+    separator = "" if (lang or "").split("-")[0].lower() in UNSPACED_LANGS else " "
+    return f"{older}{separator}{newer}"
+
+
+def coalesce_interim(older, newer):
+    """(text, is_final) items: a newer result replaces an interim one, finals are kept."""
+    return None if older[1] else newer
+
+
 class VpQueue(VpCapsule):
-    def __init__(self, name=None, maxsize=0, leaky: DrainPolicy = DrainPolicy.NONE):
+    """
+    FIFO between capsules, bounded by `maxsize` items with `leaky` deciding
+    what a full queue drops.
+
+    With `max_latency_ms`, items are also bounded by how long they waited:
+    when the item at the head waited longer, it is dropped in favour of the
+    ones behind it, or, with `coalesce(older, newer)`, merged with them
+    (`coalesce` returns the merged item, or None to pass `older` on
+    unchanged). The newest item is always delivered. Drops, merges and
+    wait times are posted as "queue-latency" messages at most every
+    `report_interval` seconds.
+    """
+    def __init__(self, name=None, maxsize=0, leaky: DrainPolicy = DrainPolicy.NONE,
+                 max_latency_ms=None, coalesce=None, report_interval=1.0):
         super().__init__(name or "queue")
         self._queue = asyncio.Queue(maxsize=maxsize)
         self._maxsize = maxsize
         self._leaky = leaky
+        self.max_latency_ms = max_latency_ms
+        self.coalesce = coalesce
+        self.report_interval = report_interval
+        self._stamps = deque()  # enqueue time of each queued item, in queue order
+        self._window = self._new_window()
+        self._last_report = None
 
         self.add_input("in").set_activate_handler(self._queue_src_active)
+        self.get_input("in").set_credit_handler(self._credits)
         self.add_output("out")
 
+    def _credits(self):
+        return self._maxsize - self._queue.qsize() if self._maxsize > 0 else math.inf
+
+    async def set_prop(self, prop, value):
+        match prop:
+            case "max-latency-ms":
+                self.max_latency_ms = value
+            case _:
+                await super().set_prop(prop, value)
+
     async def _queue_src_active(self, active):
         if active:
             await self.flush()
@@ -29,21 +83,76 @@ class VpQueue(VpCapsule):
 
     async def _process_queue(self, port):
         data = await self._queue.get()
+        stamp = self._stamps.popleft()
+        self.get_input("in").credits_changed()
+        if self.max_latency_ms is not None:
+            data = await self._bound_latency(port, data, stamp)
         await port.push(data)
         self._queue.task_done()
 
+    def _take(self):
+        data = self._queue.get_nowait()
+        self._queue.task_done()
+        return data, self._stamps.popleft()
+
+    async def _bound_latency(self, port, data, stamp):
+        now = asyncio.get_running_loop().time()
+        limit = self.max_latency_ms / 1000
+        window = self._window
+        window["max_wait_ms"] = max(window["max_wait_ms"], (now - stamp) * 1000)
+        while now - stamp > limit and not self._queue.empty():
+            newer, newer_stamp = self._take()
+            if self.coalesce is None:
+                window["dropped"] += 1
+                await self.get_input("in").notify_drop(data)
+                data, stamp = newer, newer_stamp
+                continue
+            merged = self.coalesce(data, newer)
+            if merged is None:
+                await port.push(data)
+                data, stamp = newer, newer_stamp
+            else:
+                window["coalesced"] += 1
+                data = merged
+        self.get_input("in").credits_changed()
+        window["delivered"] += 1
+        self._report(now)
+        return data
+
+    @staticmethod
+    def _new_window():
+        return {"delivered": 0, "dropped": 0, "coalesced": 0, "max_wait_ms": 0.0}
+
+    def _report(self, now):
+        if self._last_report is None:
+            self._last_report = now
+        if now - self._last_report < self.report_interval:
+            return
+        window, self._window = self._window, self._new_window()
+        self._last_report = now
+        if window["dropped"] or window["coalesced"]:
+            window["max_wait_ms"] = round(window["max_wait_ms"], 1)
+            self.post_message(VpBusMessage(
+                msg_type="queue-latency",
+                payload={"max_latency_ms": self.max_latency_ms, **window},
+                source=self
+            ))
+
     async def _handle_input(self, name, data):
         if self._maxsize > 0 and self._queue.full():
             # self.logger.warning(f'{self.name} drop data due to full queue')
             if self._leaky == DrainPolicy.DOWNSTREAM:
                 try:
-                    await self._queue.get()
-                    self._queue.task_done()
+                    dropped, _ = self._take()
+                    await self.get_input(name).notify_drop(dropped)
                 except asyncio.QueueEmpty:
                     pass
             elif self._leaky == DrainPolicy.UPSTREAM:
+                await self.get_input(name).notify_drop(data)
                 return
+        arrived = asyncio.get_running_loop().time()
         await self._queue.put(data)
+        self._stamps.append(arrived)
 
     async def process(self, data):
         pass
@@ -58,4 +167,6 @@ class VpQueue(VpCapsule):
                 items.append(item)
             except asyncio.QueueEmpty:
                 break
+        self._stamps.clear()
+        self.get_input("in").credits_changed()
         return len(items)
\ No newline at end of file
@@ -7,6 +7,7 @@ class VpBaseTransform(VpCapsule):
         self.inp = self.add_input("in")
         self.out = self.add_output("out")
         self.out.set_activate_handler(self._activate)
+        self.inp.forward_credits(self.out)
 
     async def _activate(self, activate):
         if activate:
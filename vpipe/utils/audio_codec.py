@@ -0,0 +1,130 @@
+"""
+Audio decoding without an ffmpeg subprocess per call.
+
+WAV is parsed with the `wave` module and numpy. Compressed formats (mp3,
+ogg, flac) are decoded by libsndfile through `soundfile` on one persistent
+decoder thread; pydub/ffmpeg is only the fallback for formats libsndfile
+can not read. Sample rate conversion uses resampy, like CacheResampler.
+"""
+import asyncio
+import io
+import wave
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from vpipe.core.config import AudioFormat
+
+_decoder = None
+
+
+def _executor():
+    global _decoder
+    if _decoder is None:
+        _decoder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-decoder")
+    return _decoder
+
+
+def _pcm_to_float(raw, sampwidth):
+    match sampwidth:
+        case 1:
+            return (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+        case 2:
+            return np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+        case 3:
+            b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+            ints = (b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8)
+                    | (b[:, 2].astype(np.int8).astype(np.int32) << 16))
+            return ints.astype(np.float32) / 8388608
+        case 4:
+            return np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2147483648
+        case _:
+            raise ValueError(f"Unsupported sample width: {sampwidth}")
+
+
+def decode_wav(data: bytes):
+    """
+    Returns: (samples, rate), samples float32 in [-1, 1] shaped (frames, channels)
+    """
+    with wave.open(io.BytesIO(data), "rb") as wf:
+        channels = wf.getnchannels()
+        samples = _pcm_to_float(wf.readframes(wf.getnframes()), wf.getsampwidth())
+        return samples.reshape(-1, channels), wf.getframerate()
+
+
+def _decode_sndfile(source):
+    import soundfile as sf
+    samples, rate = sf.read(source, dtype="float32", always_2d=True)
+    return samples, rate
+
+
+def _decode_pydub(source, format=None):
+    from pydub import AudioSegment
+    seg = AudioSegment.from_file(source, format=format)
+    samples = _pcm_to_float(seg.raw_data, seg.sample_width)
+    return samples.reshape(-1, seg.channels), seg.frame_rate
+
+
+def decode(data: bytes, format=None):
+    """
+    Decode an encoded audio buffer.
+    Returns: (samples, rate), samples float32 in [-1, 1] shaped (frames, channels)
+    """
+    if format in (None, "wav") and data[:4] == b"RIFF":
+        try:
+            return decode_wav(data)
+        except (wave.Error, ValueError):
+            pass  # e.g. float or extensible WAV, libsndfile handles those
+    try:
+        return _decode_sndfile(io.BytesIO(data))
+    except Exception:
+        return _decode_pydub(io.BytesIO(data), format)
+
+
+def load(path: str):
+    """ Decode an audio file. Returns: (samples, rate) like `decode`. """
+    try:
+        return _decode_sndfile(path)
+    except Exception:
+        return _decode_pydub(path)
+
+
+def resample(samples: np.ndarray, sr_in: int, sr_out: int) -> np.ndarray:
+    """ Resample float samples shaped (frames, channels) along the frame axis. """
+    if sr_in == sr_out or len(samples) == 0:
+        return samples
+    import resampy
+    return resampy.resample(samples, sr_orig=sr_in, sr_new=sr_out, axis=0, filter="kaiser_fast")
+
+
+def convert(samples: np.ndarray, rate: int, fmt: AudioFormat) -> np.ndarray:
+    """
+    Convert float samples to `fmt`: channel count, sample rate and dtype.
+    Returns: np.ndarray shaped (frames, fmt.channels)
+    """
+    if samples.ndim == 1:
+        samples = samples[:, None]
+    if samples.shape[1] != fmt.channels:
+        mono = samples.mean(axis=1, keepdims=True)
+        samples = np.repeat(mono, fmt.channels, axis=1)
+    samples = resample(samples, rate, fmt.rate)
+
+    if np.issubdtype(fmt.dtype, np.integer):
+        info = np.iinfo(fmt.dtype)
+        scaled = np.clip(samples * (info.max + 1), info.min, info.max)
+        return np.ascontiguousarray(scaled, dtype=fmt.dtype)
+    return np.ascontiguousarray(samples, dtype=fmt.dtype)
+
+
+def decode_to(data: bytes, fmt: AudioFormat, format=None) -> np.ndarray:
+    samples, rate = decode(data, format)
+    return convert(samples, rate, fmt)
+
+
+async def run_on_decoder(func, *args):
+    """ Run `func(*args)` on the persistent decoder thread, off the event loop. """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor(), func, *args)
+
+
+async def decode_to_async(data: bytes, fmt: AudioFormat, format=None) -> np.ndarray:
+    """ `decode_to` on the persistent decoder thread. """
+    return await run_on_decoder(decode_to, data, fmt, format)
@@ -1,12 +1,26 @@
-import sounddevice as sd
-
 """
-todo: fix device query is not updated when devices are added/removed
+Audio device lookup through a process-wide DeviceRegistry: PortAudio is
+queried once and devices are indexed by name and direction. A watcher
+thread picks up hotplugged devices.
 """
+import importlib
+import logging
+import os
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def _sd():
+    # sounddevice loads PortAudio on import, defer it to the first query
+    return importlib.import_module("sounddevice")
+
+
 def default_input_filter(name, dev):
     ingore_keys = ['virtual audio', 'sound mapper']
     return (
-        dev.get('hostapi', -1) == sd.default.hostapi
+        dev.get('hostapi', -1) == _sd().default.hostapi
         and dev.get('max_input_channels', 0) > 0
         and (not any(k in name.lower() for k in ingore_keys))
     )
@@ -15,25 +29,237 @@ def default_input_filter(name, dev):
 def default_output_filter(name, dev):
     ingore_keys = ['virtual audio', 'sound mapper']
     return (
-        dev.get('hostapi', -1) == sd.default.hostapi
+        dev.get('hostapi', -1) == _sd().default.hostapi
         and dev.get('max_output_channels', 0) > 0
         and (not any(k in name.lower() for k in ingore_keys))
     )
 
 
+class DeviceRegistry:
+    """
+    Cached PortAudio device list, indexed by (name, direction).
+
+    PortAudio only sees hotplugged devices after it is re-initialized, which
+    is unsafe while a stream is open or being built. Capsules build their
+    streams through `open_stream` and report them closed with
+    `stream_closed`; `refresh` re-initializes only when none is open, and
+    otherwise keeps the cached list. It runs on demand (a `find` miss, the
+    settings dialog) and from the watcher, which only refreshes when the
+    OS reports a change in the attached devices.
+    Subscribers are called with the registry after every change, from the
+    thread that noticed it.
+    """
+    def __init__(self, query=None, reinit=None, input_filter=None, output_filter=None):
+        self._query = query or (lambda: _sd().query_devices())
+        self._reinit = reinit or _reinit_portaudio
+        self._input_filter = input_filter or default_input_filter
+        self._output_filter = output_filter or default_output_filter
+        self._lock = threading.RLock()
+        self._devices = None
+        self._inputs = []
+        self._outputs = []
+        self._index = {}
+        self._open_streams = 0
+        self._subscribers = []
+        self._watcher = None
+        self._stop_watcher = threading.Event()
+
+    def _load(self):
+        devices = [dict(dev) for dev in self._query()]
+        inputs, outputs, index = [], [], {}
+        for idx, dev in enumerate(devices):
+            name = dev['name']
+            if self._input_filter(name, dev):
+                inputs.append((idx, name))
+                index.setdefault((name, True), idx)
+            if self._output_filter(name, dev):
+                outputs.append((idx, name))
+                index.setdefault((name, False), idx)
+            index.setdefault((name, None), idx)
+        return devices, inputs, outputs, index
+
+    def _ensure_loaded(self):
+        with self._lock:
+            if self._devices is None:
+                self._devices, self._inputs, self._outputs, self._index = self._load()
+
+    def refresh(self):
+        """
+        Re-query the devices. Returns True if the list changed, None if
+        open streams kept the cached list.
+        """
+        with self._lock:
+            if self._open_streams == 0:
+                self._reinit()
+            elif self._devices is not None:
+                # Re-initializing would break the open streams, the cached list stays
+                return None
+            loaded = self._load()
+            changed = loaded[0] != self._devices
+            self._devices, self._inputs, self._outputs, self._index = loaded
+            subscribers = list(self._subscribers)
+        if changed:
+            for callback in subscribers:
+                try:
+                    callback(self)
+                except Exception:
+                    logger.exception("Device change subscriber failed")
+        return changed
+
+    @property
+    def devices(self):
+        self._ensure_loaded()
+        return self._devices
+
+    def inputs(self):
+        """Returns: List[Tuple[index, name]] of input devices"""
+        self._ensure_loaded()
+        return list(self._inputs)
+
+    def outputs(self):
+        """Returns: List[Tuple[index, name]] of output devices"""
+        self._ensure_loaded()
+        return list(self._outputs)
+
+    def find(self, name, is_input=None):
+        """
+        Index of the device named `name`; is_input True/False restricts the
+        search to input/output devices. Refreshes once on a miss, in case
+        the device was just plugged in.
+        """
+        self._ensure_loaded()
+        key = (name, is_input)
+        if key not in self._index:
+            self.refresh()
+        try:
+            return self._index[key]
+        except KeyError:
+            raise ValueError(f"Device named '{name}' not found.") from None
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def stream_opened(self):
+        with self._lock:
+            self._open_streams += 1
+
+    def open_stream(self, build):
+        """
+        Count a stream as open, then build it with `build()`; a refresh can
+        not re-initialize PortAudio under it. The count is given back if
+        `build` fails.
+        """
+        self.stream_opened()
+        try:
+            return build()
+        except BaseException:
+            self.stream_closed()
+            raise
+
+    def stream_closed(self):
+        with self._lock:
+            self._open_streams = max(0, self._open_streams - 1)
+
+    def start_watcher(self, interval=2.0, detect=None):
+        """
+        Poll `detect()` every `interval` seconds on a daemon thread, until
+        stop_watcher, and refresh when its value changes. `detect` is a
+        cheap fingerprint of the attached devices that does not touch
+        PortAudio, by default the OS one; without one there is no watcher.
+        """
+        detect = detect or _os_device_fingerprint()
+        if detect is None:
+            logger.info("No device change detection on this platform, devices refresh on demand")
+            return
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._stop_watcher.clear()
+            self._watcher = threading.Thread(target=self._watch, args=(interval, detect),
+                                             name="audio-device-watcher", daemon=True)
+            self._watcher.start()
+
+    def stop_watcher(self):
+        with self._lock:
+            watcher, self._watcher = self._watcher, None
+        if watcher is not None:
+            self._stop_watcher.set()
+            watcher.join()
+
+    def _watch(self, interval, detect):
+        last = None
+        while not self._stop_watcher.wait(interval):
+            try:
+                fingerprint = detect()
+                if last is None:
+                    last = fingerprint
+                    continue
+                if fingerprint == last or self.refresh() is None:
+                    continue  # blocked by open streams: retried on the next poll
+                last = fingerprint
+            except Exception:
+                logger.exception("Audio device refresh failed")
+
+
+def _os_device_fingerprint():
+    """A callable returning a snapshot of the OS audio endpoints, or None if unsupported."""
+    if sys.platform == "win32":
+        import winreg
+        root = r"SOFTWARE\Microsoft\Windows\CurrentVersion\MMDevices\Audio"
+
+        def endpoints():
+            found = []
+            for flow in ("Capture", "Render"):
+                with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, rf"{root}\{flow}") as key:
+                    for i in range(winreg.QueryInfoKey(key)[0]):
+                        name = winreg.EnumKey(key, i)
+                        with winreg.OpenKey(key, name) as endpoint:
+                            found.append((name, winreg.QueryValueEx(endpoint, "DeviceState")[0]))
+            return sorted(found)
+        return endpoints
+    if os.path.isdir("/dev/snd"):
+        return lambda: sorted(os.listdir("/dev/snd"))
+    return None
+
+
+def _reinit_portaudio():
+    sd = _sd()
+    sd._terminate()
+    sd._initialize()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def device_registry():
+    """The process-wide DeviceRegistry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = DeviceRegistry()
+        return _registry
+
+
+def _filtered(filter):
+    return [(idx, dev['name']) for idx, dev in enumerate(device_registry().devices)
+            if filter(dev['name'], dev)]
+
+
 def list_input_devices(filter=None):
     """
     Returns: List[Tuple[index, name]]
     filter: callback(name:str, dev:dict)->bool, if provided, will be used to filter devices
     """
     if filter is None:
-        filter = default_input_filter
-    devices = sd.query_devices()
-    result = []
-    for idx, dev in enumerate(devices):
-        if filter is None or filter(dev['name'], dev):
-            result.append((idx, dev['name']))
-    return result
+        return device_registry().inputs()
+    return _filtered(filter)
 
 
 def list_output_devices(filter=None):
@@ -42,13 +268,8 @@ def list_output_devices(filter=None):
     filter: callback(name:str, dev:dict)->bool, if provided, will be used to filter devices
     """
     if filter is None:
-        filter = default_output_filter
-    devices = sd.query_devices()
-    result = []
-    for idx, dev in enumerate(devices):
-        if filter is None or filter(dev['name'], dev):
-            result.append((idx, dev['name']))
-    return result
+        return device_registry().outputs()
+    return _filtered(filter)
 
 
 def find_device_index(name, is_input=None, filter=None):
@@ -59,15 +280,10 @@ def find_device_index(name, is_input=None, filter=None):
     If is_input = None: search all devices.
     filter: callback(name:str, dev:dict)->bool, if provided, will be used to filter devices
     """
-    if is_input is True and filter is None:
-        filter = default_input_filter
-    if is_input is False and filter is None:
-        filter = default_output_filter
-    devices = sd.query_devices()
-    for idx, dev in enumerate(devices):
-        if filter is not None and not filter(dev['name'], dev):
-            continue
-        if dev['name'] == name:
+    if filter is None:
+        return device_registry().find(name, is_input)
+    for idx, dev_name in _filtered(filter):
+        if dev_name == name:
             return idx
     raise ValueError(f"Device named '{name}' not found.")
 
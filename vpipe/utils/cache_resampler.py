@@ -1,5 +1,33 @@
+import threading
 import numpy as np
-import resampy
+
+_warmup_lock = threading.Lock()
+_warmup_thread = None
+
+
+def _compile_kernels():
+    import resampy
+    # The calls CacheResampler and audio_codec.resample make: loads each
+    # filter table and compiles the numba kernels for those shapes
+    for filter in ("kaiser_best", "kaiser_fast"):
+        resampy.resample(np.zeros(1024, dtype=np.float32), sr_orig=48000, sr_new=16000, filter=filter)
+    resampy.resample(np.zeros((1024, 1), dtype=np.float32), sr_orig=24000, sr_new=16000,
+                     axis=0, filter="kaiser_fast")
+
+
+def warmup(wait=True):
+    """
+    Import resampy and compile its kernels on a background thread, once
+    per process. With `wait`, block until they are ready.
+    """
+    global _warmup_thread
+    with _warmup_lock:
+        if _warmup_thread is None:
+            _warmup_thread = threading.Thread(target=_compile_kernels, name="resampler-warmup", daemon=True)
+            _warmup_thread.start()
+    if wait:
+        _warmup_thread.join()
+
 
 class CacheResampler:
     def __init__(self, sr_in, sr_out, cache_size, filter='kaiser_best'):
@@ -10,9 +38,10 @@ class CacheResampler:
         self.cache = np.zeros(cache_size, dtype=np.float32)
 
     def warmup(self):
-        resampy.resample(np.zeros(1024), sr_orig=self.sr_in, sr_new=self.sr_out)
+        warmup()
 
     def process(self, input_buf: np.ndarray) -> np.ndarray:
+        import resampy
         assert input_buf.dtype == np.float32
         padded = np.concatenate([self.cache, input_buf])
 